@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from typing import Dict, Any, Optional
 from app.services.helm_service import helm_service
 from app.services.port_manager import port_manager
+from app.services.kube_client import kube_get_json
+from app.services.kube_informer import kube_informers, MONITORING_NAMESPACE
 import subprocess
 
 router = APIRouter()
@@ -60,15 +62,17 @@ async def get_monitoring_status(cluster_name: str, namespace: str = "monitoring"
     try:
         context = f"kind-{cluster_name}"
         
-        # Sprawdź pody w namespace monitoring
-        kubectl_result = subprocess.run([
-            "kubectl", "get", "pods", 
-            "--namespace", namespace,
-            "--context", context,
-            "-o", "json"
-        ], capture_output=True, text=True)
+        # Sprawdź pody w namespace monitoring (z pamięci informera, jeśli to domyślny namespace)
+        if namespace == MONITORING_NAMESPACE:
+            pods = await kube_informers.monitoring_pods(context, timeout=30)
+        else:
+            pods_data = await kube_get_json(
+                context, f"/api/v1/namespaces/{namespace}/pods",
+                ["get", "pods", "--namespace", namespace], timeout=30
+            )
+            pods = pods_data.get("items", []) if pods_data is not None else None
         
-        if kubectl_result.returncode != 0:
+        if pods is None:
             return {
                 "cluster_name": cluster_name,
                 "namespace": namespace,
@@ -76,13 +80,10 @@ async def get_monitoring_status(cluster_name: str, namespace: str = "monitoring"
                 "message": "Namespace monitoring nie istnieje"
             }
         
-        import json
-        pods_data = json.loads(kubectl_result.stdout)
-        
         prometheus_pods = []
         grafana_pods = []
         
-        for pod in pods_data.get("items", []):
+        for pod in pods:
             pod_name = pod["metadata"]["name"]
             pod_status = pod["status"]["phase"]
             
@@ -106,17 +107,18 @@ async def get_monitoring_status(cluster_name: str, namespace: str = "monitoring"
                 })
         
         # Sprawdź serwisy
-        services_result = subprocess.run([
-            "kubectl", "get", "svc",
-            "--namespace", namespace,
-            "--context", context,
-            "-o", "json"
-        ], capture_output=True, text=True)
+        if namespace == MONITORING_NAMESPACE:
+            services = await kube_informers.monitoring_services(context, timeout=30)
+        else:
+            services_data = await kube_get_json(
+                context, f"/api/v1/namespaces/{namespace}/services",
+                ["get", "svc", "--namespace", namespace], timeout=30
+            )
+            services = services_data.get("items", []) if services_data is not None else None
         
         services_info = {}
-        if services_result.returncode == 0:
-            services_data = json.loads(services_result.stdout)
-            for svc in services_data.get("items", []):
+        if services is not None:
+            for svc in services:
                 svc_name = svc["metadata"]["name"]
                 svc_type = svc["spec"]["type"]
                 ports = svc["spec"].get("ports", [])
@@ -0,0 +1,111 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .kube_client import kube_get_json_sync
+
+
+def parse_resources(group: str, version: str, resource_list: Dict) -> List[Dict]:
+    """Zasoby z APIResourceList, które da się wylistować (bez podzasobów typu pods/log)"""
+    group_version = f"{group}/{version}" if group else version
+    resources = []
+    for resource in resource_list.get("resources", []):
+        if "/" in resource["name"] or "list" not in resource.get("verbs", []):
+            continue
+        resources.append({
+            "name": resource["name"],
+            "group": group,
+            "version": version,
+            "api_version": group_version,
+            "kind": resource.get("kind"),
+            "namespaced": bool(resource.get("namespaced")),
+            "api_path": f"/apis/{group_version}/{resource['name']}" if group else f"/api/{version}/{resource['name']}"
+        })
+    return resources
+
+
+def is_builtin_group(group: str) -> bool:
+    """
+    Grupy wbudowane w Kubernetes (core, apps, *.k8s.io) - ich zasoby zmieniają się
+    tylko z wersją serwera. Grupy CRD muszą mieć kropkę w nazwie i zwykle nie kończą się na .k8s.io.
+    """
+    return "." not in group or group.endswith(".k8s.io")
+
+
+class ApiDiscovery:
+    """
+    Odkrywanie typów zasobów serwowanych przez klaster (w tym CRD).
+
+    Listy zasobów grup wbudowanych są cache'owane per kontekst i wersja serwera -
+    przy kolejnych wywołaniach pobierana jest lista grup (/apis) i szczegóły tylko
+    grup CRD, bo nowy CRD może dołączyć do już znanej grupy/wersji.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._cache: Dict[Tuple[str, str, str], List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def listable_resources(self, context: str) -> Optional[List[Dict]]:
+        """Wszystkie listowalne zasoby w preferowanych wersjach grup (None, gdy API niedostępne)"""
+        version = self._get(context, "/version")
+        groups = self._get(context, "/apis")
+        if version is None or groups is None:
+            return None
+        server_version = version.get("gitVersion", "")
+
+        group_versions = [("", "v1")] + [
+            (group["name"], group["preferredVersion"]["version"])
+            for group in groups.get("groups", [])
+            if group.get("preferredVersion")
+        ]
+
+        with self._lock:
+            missing = [
+                gv for gv in group_versions
+                if not is_builtin_group(gv[0]) or (context, server_version, *gv) not in self._cache
+            ]
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                fetched = list(executor.map(lambda gv: self._fetch_group(context, *gv), missing))
+            with self._lock:
+                for gv, resources in zip(missing, fetched):
+                    # Grupa niedostępna (np. agregowane API bez backendu) - zostaje ostatnia znana
+                    # lista, spróbujemy następnym razem
+                    if resources is not None:
+                        self._cache[(context, server_version, *gv)] = resources
+
+        with self._lock:
+            return [
+                resource
+                for gv in group_versions
+                for resource in self._cache.get((context, server_version, *gv), [])
+            ]
+
+    def invalidate(self, context: str):
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == context]:
+                del self._cache[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "cached_group_versions": len(self._cache),
+                "contexts": sorted({key[0] for key in self._cache})
+            }
+
+    def _fetch_group(self, context: str, group: str, version: str) -> Optional[List[Dict]]:
+        path = f"/apis/{group}/{version}" if group else f"/api/{version}"
+        resource_list = self._get(context, path)
+        if resource_list is None:
+            return None
+        return parse_resources(group, version, resource_list)
+
+    @staticmethod
+    def _get(context: str, path: str) -> Optional[Dict]:
+        return kube_get_json_sync(context, path, ["get", "--raw", path], timeout=30)
+
+
+# Singleton instance
+api_discovery = ApiDiscovery()
@@ -0,0 +1,296 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .kube_informer import kube_informers
+from .metrics_history import metrics_history
+from .scale_planner import is_control_plane
+
+# Domyślna polityka - pola jak w DeploymentCreate (enable_autoscaling, min_nodes, max_nodes)
+DEFAULT_POLICY = {
+    "enabled": False,
+    "min_nodes": 1,                 # liczba workerów
+    "max_nodes": 3,
+    "scale_up_cpu_percent": 75.0,   # średnie CPU workerów powyżej -> +1 węzeł
+    "scale_down_cpu_percent": 25.0, # poniżej (i pamięć poniżej progu) -> -1 węzeł
+    "scale_up_memory_percent": 80.0,
+    "scale_down_memory_percent": 40.0,
+    "sustain_seconds": 60,          # tak długo warunek musi trwać (średnia z historii)
+    "scale_up_cooldown": 60,        # minimalny odstęp po dowolnym skalowaniu
+    "scale_down_cooldown": 300
+}
+
+# Ile ostatnich decyzji trzymać per klaster
+MAX_DECISIONS = 50
+
+# Tekstowe wartości pól logicznych (formularze, query string)
+TRUE_VALUES = ("true", "1", "yes", "on")
+FALSE_VALUES = ("false", "0", "no", "off", "")
+
+
+def _coerce(key: str, value):
+    """Wartość pola w typie z DEFAULT_POLICY; bool("false") byłoby True, więc logiczne osobno"""
+    if isinstance(DEFAULT_POLICY[key], bool):
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError(f"Pole {key} musi mieć wartość true/false")
+    return type(DEFAULT_POLICY[key])(value)
+
+
+def normalize_policy(values: Dict, current: Optional[Dict] = None) -> Dict:
+    """Połącz zmiany z obecną polityką i sprawdź zakresy (ValueError przy błędzie)"""
+    policy = {**DEFAULT_POLICY, **(current or {})}
+    for key, value in values.items():
+        if key not in DEFAULT_POLICY or value is None:
+            continue
+        policy[key] = _coerce(key, value)
+
+    if policy["min_nodes"] < 0 or policy["max_nodes"] < policy["min_nodes"]:
+        raise ValueError("Wymagane 0 <= min_nodes <= max_nodes")
+    if policy["scale_down_cpu_percent"] >= policy["scale_up_cpu_percent"]:
+        raise ValueError("Próg scale_down_cpu_percent musi być niższy niż scale_up_cpu_percent")
+    if policy["scale_down_memory_percent"] >= policy["scale_up_memory_percent"]:
+        raise ValueError("Próg scale_down_memory_percent musi być niższy niż scale_up_memory_percent")
+    return policy
+
+
+def unschedulable_pods(pods: List[Dict]) -> List[str]:
+    """Pody Pending, których scheduler nie może nigdzie umieścić"""
+    return [
+        f"{pod['metadata'].get('namespace')}/{pod['metadata']['name']}"
+        for pod in pods
+        if pod.get("status", {}).get("phase") == "Pending"
+        and any(
+            c.get("type") == "PodScheduled" and c.get("status") == "False" and c.get("reason") == "Unschedulable"
+            for c in pod.get("status", {}).get("conditions", [])
+        )
+    ]
+
+
+def decide(policy: Dict, workers: int, pending: int, cpu_percent: Optional[float],
+           memory_percent: Optional[float], since_last_scale: float) -> Tuple[Optional[int], str]:
+    """
+    Docelowa liczba workerów (None = bez zmian) i powód.
+
+    Histereza: osobne progi w górę i w dół, warunek uśredniony z okna
+    `sustain_seconds` oraz osobne okresy wyciszenia po skalowaniu.
+    """
+    if workers < policy["min_nodes"]:
+        return policy["min_nodes"], f"below min_nodes ({workers} < {policy['min_nodes']})"
+    if workers > policy["max_nodes"]:
+        return policy["max_nodes"], f"above max_nodes ({workers} > {policy['max_nodes']})"
+
+    wants_up = pending > 0 or (
+        cpu_percent is not None and cpu_percent >= policy["scale_up_cpu_percent"]
+    ) or (
+        memory_percent is not None and memory_percent >= policy["scale_up_memory_percent"]
+    )
+    if wants_up:
+        if workers >= policy["max_nodes"]:
+            return None, "at max_nodes"
+        if since_last_scale < policy["scale_up_cooldown"]:
+            return None, "scale-up cooldown"
+        if pending:
+            return workers + 1, f"{pending} unschedulable pod(s)"
+        return workers + 1, f"high load (cpu {cpu_percent}%, memory {memory_percent}%)"
+
+    wants_down = (
+        cpu_percent is not None and cpu_percent <= policy["scale_down_cpu_percent"]
+        and memory_percent is not None and memory_percent <= policy["scale_down_memory_percent"]
+    )
+    if wants_down:
+        if workers <= policy["min_nodes"]:
+            return None, "at min_nodes"
+        if since_last_scale < policy["scale_down_cooldown"]:
+            return None, "scale-down cooldown"
+        return workers - 1, f"low load (cpu {cpu_percent}%, memory {memory_percent}%)"
+
+    return None, "within thresholds"
+
+
+def _average(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 1) if values else None
+
+
+class Autoscaler:
+    """
+    Pętla w tle, która dopasowuje liczbę workerów klastrów lokalnych do obciążenia.
+
+    Sygnały pochodzą z pamięci: niemożliwe do umieszczenia pody z indeksu podów
+    (informer) i CPU/RAM węzłów z historii docker stats. Skalowanie wykonuje
+    przekazana funkcja (ścieżka live scaling k3d/kind).
+    """
+
+    def __init__(self, state_file_path: str = "autoscaling_policies.json", interval: float = 15):
+        self.state_file_path = Path(state_file_path)
+        self.interval = interval
+        self._policies: Dict[str, Dict] = self._load_policies()
+        self._last_scale: Dict[str, float] = {}
+        self._decisions: Dict[str, Deque[Dict]] = {}
+        self._scaling: set = set()
+        self._scale: Optional[Callable[[str, int], Awaitable[Dict]]] = None
+        self._provider: Optional[Callable[[str], Awaitable[Optional[str]]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def configure(self, scale: Callable[[str, int], Awaitable[Dict]],
+                  provider: Callable[[str], Awaitable[Optional[str]]]):
+        """Ustaw funkcje skalowania (cluster, workery) i wykrywania providera"""
+        self._scale = scale
+        self._provider = provider
+
+    # ===== Polityki =====
+
+    def get_policy(self, cluster_name: str) -> Dict:
+        return {**DEFAULT_POLICY, **self._policies.get(cluster_name, {})}
+
+    def set_policy(self, cluster_name: str, values: Dict) -> Dict:
+        """Zmień politykę klastra (ValueError przy niepoprawnych wartościach)"""
+        policy = normalize_policy(values, self._policies.get(cluster_name))
+        self._policies[cluster_name] = policy
+        self._save_policies()
+        return policy
+
+    def drop_cluster(self, cluster_name: str):
+        """Usuń politykę i historię decyzji (po usunięciu klastra)"""
+        self._last_scale.pop(cluster_name, None)
+        self._decisions.pop(cluster_name, None)
+        if self._policies.pop(cluster_name, None) is not None:
+            self._save_policies()
+
+    def status(self, cluster_name: str) -> Dict:
+        return {
+            "policy": self.get_policy(cluster_name),
+            "scaling": cluster_name in self._scaling,
+            "seconds_since_last_scale": (
+                round(time.monotonic() - self._last_scale[cluster_name], 1)
+                if cluster_name in self._last_scale else None
+            ),
+            "decisions": list(self._decisions.get(cluster_name, ()))
+        }
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval": self.interval,
+            "enabled_clusters": sorted(name for name, p in self._policies.items() if p.get("enabled"))
+        }
+
+    # ===== Cykl życia =====
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            started = time.monotonic()
+            for cluster_name, policy in list(self._policies.items()):
+                if not policy.get("enabled") or cluster_name in self._scaling:
+                    continue
+                try:
+                    await self.evaluate(cluster_name)
+                except Exception as e:
+                    print(f"Autoscaler error for {cluster_name}: {e}")
+            await asyncio.sleep(max(1.0, self.interval - (time.monotonic() - started)))
+
+    # ===== Decyzje =====
+
+    async def evaluate(self, cluster_name: str) -> Optional[Dict]:
+        """Sprawdź sygnały klastra i w razie potrzeby przeskaluj go"""
+        if self._scale is None or self._provider is None:
+            return None
+        provider = await self._provider(cluster_name)
+        if provider is None:
+            return None
+
+        context = f"{provider}-{cluster_name}"
+        nodes, pods = await asyncio.gather(
+            kube_informers.nodes(context), kube_informers.pods(context)
+        )
+        if nodes is None or pods is None:
+            return None
+
+        workers = [node["metadata"]["name"] for node in nodes if not is_control_plane(node)]
+        pending = unschedulable_pods(pods)
+        policy = self.get_policy(cluster_name)
+        cpu_percent, memory_percent = self._load(cluster_name, workers, policy["sustain_seconds"])
+
+        since_last_scale = time.monotonic() - self._last_scale.get(cluster_name, float("-inf"))
+        target, reason = decide(policy, len(workers), len(pending), cpu_percent, memory_percent, since_last_scale)
+
+        decision = {
+            "timestamp": time.time(),
+            "workers": len(workers),
+            "pending_pods": len(pending),
+            "cpu_percent": cpu_percent,
+            "memory_percent": memory_percent,
+            "target": target,
+            "reason": reason
+        }
+        if target is not None:
+            self._scaling.add(cluster_name)
+            try:
+                result = await self._scale(cluster_name, target)
+            finally:
+                self._scaling.discard(cluster_name)
+                self._last_scale[cluster_name] = time.monotonic()
+            decision["success"] = bool(result.get("success"))
+            if not result.get("success"):
+                decision["error"] = result.get("error")
+
+        self._decisions.setdefault(cluster_name, deque(maxlen=MAX_DECISIONS)).append(decision)
+        return decision
+
+    @staticmethod
+    def _load(cluster_name: str, workers: List[str], seconds: float) -> Tuple[Optional[float], Optional[float]]:
+        """Średnie CPU i pamięć (%) workerów z ostatnich `seconds` sekund historii docker stats"""
+        history = metrics_history.query(cluster_name, seconds=seconds, resolution="1s")["nodes"]
+        cpu, memory = [], []
+        for node_name in workers:
+            series = history.get(node_name)
+            if not series or not series["timestamps"]:
+                continue
+            cpu.extend(series["cpu_percent"])
+            memory.extend(
+                used / limit * 100
+                for used, limit in zip(series["memory_used_mb"], series["memory_limit_mb"])
+                if limit
+            )
+        return _average(cpu), _average(memory)
+
+    # ===== Zapis =====
+
+    def _load_policies(self) -> Dict[str, Dict]:
+        try:
+            with open(self.state_file_path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+
+    def _save_policies(self):
+        tmp_path = self.state_file_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self._policies, f, indent=2)
+        os.replace(tmp_path, self.state_file_path)
+
+
+# Singleton instance
+autoscaler = Autoscaler(interval=float(os.environ.get("CLUSTERMASTER_AUTOSCALER_INTERVAL", "15")))
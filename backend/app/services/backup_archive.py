@@ -0,0 +1,303 @@
+import lzma
+import os
+import queue
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency - the zstd codec is unavailable without it
+    zstandard = None
+
+# Size of the pieces handed to the writer thread (and compressed independently)
+CHUNK_SIZE = 1024 * 1024
+
+# Threads compressing chunks in parallel
+COMPRESS_WORKERS = int(os.environ.get("CLUSTERMASTER_BACKUP_COMPRESS_WORKERS", str(os.cpu_count() or 2)))
+
+# An LZMA compressor needs ~11x its dictionary in memory - cap the threads
+LZMA_WORKERS = int(os.environ.get("CLUSTERMASTER_BACKUP_LZMA_WORKERS", "4"))
+
+# Layout of the archive entries, recorded in the manifest. Version 1 stored
+# "deflate" as independently compressed .gz frames; since version 2 it is a
+# plain ZIP_DEFLATED entry and the framed layout is the opt-in "gzip" codec.
+ARCHIVE_VERSION = 2
+
+_END_OF_ENTRY = object()
+_DROP_ENTRY = object()
+_CLOSE = object()
+
+
+class Codec:
+    """
+    Compression applied to archive entries.
+
+    Native codecs (store, deflate) use the ZIP's own compression, so the
+    archive opens in any unzip tool. Framed codecs compress every chunk on
+    its own into a complete frame (gzip member, xz stream, zstd frame), so
+    chunks can be compressed on all cores and the concatenated frames still
+    decompress as one stream; such entries are stored in the ZIP under
+    `name + suffix`.
+    """
+
+    def __init__(self, name: str, suffix: str = "",
+                 compress: Optional[Callable[[bytes], bytes]] = None,
+                 decompressor: Optional[Callable[[], object]] = None,
+                 zip_compression: int = zipfile.ZIP_STORED,
+                 max_workers: Optional[int] = None):
+        self.name = name
+        self.suffix = suffix
+        self.compress = compress
+        self.decompressor = decompressor
+        self.zip_compression = zip_compression
+        self.max_workers = max_workers
+
+    def decompress_stream(self, source: BinaryIO, target: BinaryIO):
+        """Decompress concatenated frames from `source` into `target`"""
+        decompressor = self.decompressor()
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            while chunk:
+                target.write(decompressor.decompress(chunk))
+                if not decompressor.eof:
+                    break
+                # Next frame starts right after the previous one
+                chunk = decompressor.unused_data
+                decompressor = self.decompressor()
+
+
+def _gzip_chunk(chunk: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress(chunk) + compressor.flush()
+
+
+# A dictionary larger than one chunk is never filled - preset 6 would
+# allocate ~94 MiB per compressor for nothing
+_LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 6, "dict_size": CHUNK_SIZE}]
+
+
+def _lzma_chunk(chunk: bytes) -> bytes:
+    return lzma.compress(chunk, format=lzma.FORMAT_XZ, filters=_LZMA_FILTERS)
+
+
+def _zstd_chunk(chunk: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(chunk)
+
+
+CODECS: Dict[str, Codec] = {
+    "store": Codec("store"),
+    "deflate": Codec("deflate", zip_compression=zipfile.ZIP_DEFLATED),
+    "gzip": Codec("gzip", ".gz", _gzip_chunk, lambda: zlib.decompressobj(31)),
+    "lzma": Codec("lzma", ".xz", _lzma_chunk, lzma.LZMADecompressor, max_workers=LZMA_WORKERS),
+}
+if zstandard is not None:
+    CODECS["zstd"] = Codec(
+        "zstd", ".zst", _zstd_chunk, lambda: zstandard.ZstdDecompressor().decompressobj()
+    )
+
+
+def get_codec(name: str) -> Codec:
+    """Codec by name (ValueError for unknown or unavailable codecs)"""
+    codec = CODECS.get(name)
+    if codec is None:
+        if name == "zstd":
+            raise ValueError("Codec zstd requires the 'zstandard' package")
+        raise ValueError(f"Unknown codec: {name} (available: {', '.join(CODECS)})")
+    return codec
+
+
+def extract_archive(archive_path: Path, target_dir: Path, codec_name: Optional[str] = None,
+                    archive_version: int = ARCHIVE_VERSION):
+    """
+    Extract a backup archive, decompressing entries written with `codec_name`.
+    Archives without a codec (plain ZIP entries) are extracted as they are.
+    """
+    if codec_name == "deflate" and archive_version < 2:
+        codec_name = "gzip"
+    codec = get_codec(codec_name) if codec_name else None
+    with zipfile.ZipFile(archive_path, 'r') as zipf:
+        for info in zipf.infolist():
+            if codec and codec.suffix and info.filename.endswith(codec.suffix):
+                name = Path(info.filename[:-len(codec.suffix)]).name
+                with zipf.open(info) as source, open(Path(target_dir) / name, 'wb') as target:
+                    codec.decompress_stream(source, target)
+            else:
+                zipf.extract(info, target_dir)
+
+
+class ZipStreamSink:
+    """
+    Backup entries streamed straight into a ZIP archive.
+
+    Producers hand over data in chunks through a bounded queue; chunks are
+    compressed by a thread pool (see `Codec`) and a dedicated writer thread
+    owns the ZipFile and appends them in order, so exporting and compressing
+    overlap and nothing is staged on disk. The archive is written next to its
+    final path and renamed into place only by `commit()`.
+
+    Entries must be written one at a time (from a single producer thread).
+    """
+
+    def __init__(self, output_path: Path, codec: str = "deflate", workers: int = COMPRESS_WORKERS):
+        self.output_path = Path(output_path)
+        self.partial_path = self.output_path.with_name(self.output_path.name + ".partial")
+        self.codec = get_codec(codec)
+        if self.codec.max_workers:
+            workers = min(workers, self.codec.max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backup-compress") \
+            if self.codec.compress else None
+        # Compression type is chosen per entry (see _zip_info)
+        self._zipf = zipfile.ZipFile(self.partial_path, 'w', zipfile.ZIP_STORED)
+        # Enough chunks in flight to keep every compression thread busy
+        self._queue: queue.Queue = queue.Queue(maxsize=max(32, workers * 2))
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name="backup-archive-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def write_text(self, name: str, text: str, compress: bool = True):
+        self.write_bytes(name, text.encode('utf-8'), compress)
+
+    def write_bytes(self, name: str, data: bytes, compress: bool = True):
+        name = self._entry_name(name, compress)
+        for start in range(0, len(data), CHUNK_SIZE):
+            self._put_chunk(name, data[start:start + CHUNK_SIZE], compress)
+        self._put((name, _END_OF_ENTRY, compress))
+
+    def write_stream(self, name: str, stream: BinaryIO, compress: bool = True,
+                     keep: Optional[Callable[[int], bool]] = None) -> int:
+        """
+        Copy a binary stream (e.g. a subprocess stdout) into one entry; returns the byte count.
+
+        `keep` is called with the byte count once the stream ends (e.g. to check
+        the exit code of the producing process). If it returns False, or reading
+        fails, the entry is dropped from the archive and 0 is returned.
+        """
+        name = self._entry_name(name, compress)
+        total = 0
+        try:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                self._put_chunk(name, chunk, compress)
+            kept = keep is None or keep(total)
+        except BaseException:
+            self._put((name, _DROP_ENTRY, compress))
+            raise
+        self._put((name, _END_OF_ENTRY if kept else _DROP_ENTRY, compress))
+        return total if kept else 0
+
+    def _entry_name(self, name: str, compress: bool) -> str:
+        return name + self.codec.suffix if compress and self._executor else name
+
+    def _put_chunk(self, name: str, chunk: bytes, compress: bool):
+        if compress and self._executor:
+            self._put((name, self._executor.submit(self.codec.compress, chunk), compress))
+        else:
+            self._put((name, chunk, compress))
+
+    def _zip_info(self, name: str, compress: bool) -> zipfile.ZipInfo:
+        """Native codecs compress in the ZIP itself; framed chunks are stored as they are"""
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = self.codec.zip_compression if compress else zipfile.ZIP_STORED
+        return info
+
+    def commit(self):
+        """Finish the archive and atomically move it to its final path"""
+        self._finish()
+        if self._error is not None:
+            self._remove_partial()
+            raise self._error
+        os.replace(self.partial_path, self.output_path)
+
+    def abort(self):
+        """Drop the partially written archive"""
+        self._finish()
+        self._remove_partial()
+
+    def _put(self, item):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(item)
+
+    def _finish(self):
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_CLOSE)
+            self._thread.join()
+            if self._executor:
+                self._executor.shutdown(cancel_futures=True)
+
+    def _remove_partial(self):
+        try:
+            self.partial_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _drop_last_entry(self):
+        """Cut the entry just written off the end of the archive"""
+        info = self._zipf.filelist.pop()
+        self._zipf.NameToInfo.pop(info.filename, None)
+        self._zipf.fp.seek(info.header_offset)
+        self._zipf.fp.truncate()
+        # The central directory is written from here on close()
+        self._zipf.start_dir = info.header_offset
+
+    def _writer(self):
+        entry = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _CLOSE:
+                    break
+                name, chunk, compress = item
+                if isinstance(chunk, Future):
+                    chunk = chunk.result()
+                if chunk is _DROP_ENTRY:
+                    if entry is not None:
+                        entry.close()
+                        entry = None
+                        self._drop_last_entry()
+                    continue
+                if chunk is _END_OF_ENTRY:
+                    if entry is None:
+                        # Empty entry
+                        self._zipf.writestr(self._zip_info(name, compress), b"")
+                    else:
+                        entry.close()
+                        entry = None
+                    continue
+                if entry is None:
+                    # Size is not known up front - allow entries over 2 GiB
+                    entry = self._zipf.open(self._zip_info(name, compress), 'w', force_zip64=True)
+                entry.write(chunk)
+        except BaseException as e:
+            self._error = e
+            # Keep draining so producers blocked on the queue can notice the error
+            while self._queue.get() is not _CLOSE:
+                pass
+        finally:
+            try:
+                if entry is not None:
+                    entry.close()
+                self._zipf.close()
+            except Exception as e:
+                self._error = self._error or e
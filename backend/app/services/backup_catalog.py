@@ -0,0 +1,188 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Columns the listing may be sorted by
+SORT_COLUMNS = {
+    "created_at": "created_at",
+    "backup_name": "name",
+    "cluster_name": "cluster_name",
+    "size_mb": "size_bytes",
+}
+
+# Bumped when the tables change; older catalogs are rebuilt from the archives
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    name TEXT PRIMARY KEY,
+    cluster_name TEXT,
+    created_at TEXT,
+    size_bytes INTEGER,
+    mtime_ns INTEGER,
+    chunks_known INTEGER NOT NULL DEFAULT 1,
+    info TEXT
+);
+CREATE INDEX IF NOT EXISTS backups_cluster_created ON backups (cluster_name, created_at);
+CREATE INDEX IF NOT EXISTS backups_created ON backups (created_at);
+CREATE TABLE IF NOT EXISTS backup_chunks (
+    backup TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (backup, digest)
+);
+CREATE INDEX IF NOT EXISTS backup_chunks_digest ON backup_chunks (digest);
+"""
+
+# Digests per IN (...) query - below SQLite's bound parameter limit
+DIGEST_BATCH = 500
+
+# Key of the info dict carrying the chunk digests an archive references
+# (kept in backup_chunks, not in the listing); None when they are unknown
+CHUNKS_KEY = "chunks"
+
+
+class BackupCatalog:
+    """
+    SQLite index of the backup archives in a directory.
+
+    Listing reads the index instead of opening every zip. The index is kept
+    up to date on create/delete and reconciled with the filesystem: when the
+    directory mtime changes, archives are stat'ed and only new or modified
+    ones (by size and mtime) have their manifest read again.
+
+    It also records which chunk-store chunks each archive references, so
+    deleting a backup knows which chunks it leaves unreferenced.
+    """
+
+    def __init__(self, backup_dir: Path, db_name: str = ".catalog/backups.sqlite3"):
+        self.backup_dir = Path(backup_dir)
+        # In a subdirectory - SQLite journal files must not bump the mtime of backup_dir
+        self.db_path = self.backup_dir / db_name
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._dir_mtime_ns: Optional[int] = None
+        with closing(self._connect()) as db, db:
+            if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                db.executescript("DROP TABLE IF EXISTS backups; DROP TABLE IF EXISTS backup_chunks;")
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def upsert(self, backup_file: Path, info: Dict[str, Any]):
+        """Record (or refresh) one archive"""
+        stat = backup_file.stat()
+        with closing(self._connect()) as db, db:
+            self._upsert(db, backup_file.stem, stat, info)
+
+    def remove(self, name: str) -> Optional[List[str]]:
+        """
+        Drop one archive; returns the chunks no other archive references any
+        more (None when some archive's chunks are unknown - nothing is safe to delete)
+        """
+        with self._lock, closing(self._connect()) as db, db:
+            unknown = db.execute(
+                "SELECT COUNT(*) FROM backups WHERE name != ? AND chunks_known = 0", (name,)
+            ).fetchone()[0]
+            orphaned = [digest for (digest,) in db.execute(
+                "SELECT digest FROM backup_chunks WHERE backup = ? AND digest NOT IN "
+                "(SELECT digest FROM backup_chunks WHERE backup != ?)", (name, name)
+            )]
+            db.execute("DELETE FROM backup_chunks WHERE backup = ?", (name,))
+            db.execute("DELETE FROM backups WHERE name = ?", (name,))
+        return None if unknown else orphaned
+
+    def unreferenced(self, digests: Iterable[str]) -> List[str]:
+        """
+        The given chunks no archive references (none when some archive's chunks
+        are unknown); re-checks orphans against archives indexed in the meantime
+        """
+        digests = sorted(set(digests))
+        with self._lock, closing(self._connect()) as db:
+            if db.execute("SELECT COUNT(*) FROM backups WHERE chunks_known = 0").fetchone()[0]:
+                return []
+            referenced = set()
+            for start in range(0, len(digests), DIGEST_BATCH):
+                batch = digests[start:start + DIGEST_BATCH]
+                referenced.update(digest for (digest,) in db.execute(
+                    f"SELECT DISTINCT digest FROM backup_chunks WHERE digest IN ({', '.join('?' * len(batch))})", batch
+                ))
+        return [digest for digest in digests if digest not in referenced]
+
+    def reconcile(self, read_info: Callable[[Path], Dict[str, Any]], force: bool = False) -> bool:
+        """
+        Bring the index in line with the archives on disk. `read_info` is only
+        called for archives that are new or changed. Returns False when the
+        directory has not changed since the previous pass.
+        """
+        with self._lock:
+            dir_mtime_ns = os.stat(self.backup_dir).st_mtime_ns
+            if not force and dir_mtime_ns == self._dir_mtime_ns:
+                return False
+
+            on_disk = {}
+            with os.scandir(self.backup_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".zip") and entry.is_file():
+                        on_disk[entry.name[:-len(".zip")]] = entry.stat()
+
+            with closing(self._connect()) as db, db:
+                indexed = {
+                    name: (size_bytes, mtime_ns)
+                    for name, size_bytes, mtime_ns in db.execute("SELECT name, size_bytes, mtime_ns FROM backups")
+                }
+                gone = [(name,) for name in indexed if name not in on_disk]
+                db.executemany("DELETE FROM backups WHERE name = ?", gone)
+                db.executemany("DELETE FROM backup_chunks WHERE backup = ?", gone)
+
+                for name, stat in on_disk.items():
+                    if indexed.get(name) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    self._upsert(db, name, stat, read_info(self.backup_dir / f"{name}.zip"))
+
+            self._dir_mtime_ns = dir_mtime_ns
+            return True
+
+    def query(self, cluster_name: Optional[str] = None, sort_by: str = "created_at",
+              descending: bool = True, limit: Optional[int] = None, offset: int = 0) -> Dict[str, Any]:
+        """One page of backups and the total number matching the filter"""
+        column = SORT_COLUMNS.get(sort_by)
+        if column is None:
+            raise ValueError(f"Cannot sort by {sort_by} (allowed: {', '.join(SORT_COLUMNS)})")
+
+        where, params = ("WHERE cluster_name = ?", [cluster_name]) if cluster_name else ("", [])
+        direction = "DESC" if descending else "ASC"
+        with closing(self._connect()) as db:
+            total = db.execute(f"SELECT COUNT(*) FROM backups {where}", params).fetchone()[0]
+            rows = db.execute(
+                f"SELECT info FROM backups {where} ORDER BY {column} {direction}, name {direction} "
+                f"LIMIT ? OFFSET ?",
+                params + [limit if limit is not None else -1, max(offset, 0)]
+            ).fetchall()
+        return {"backups": [json.loads(info) for (info,) in rows], "total_count": total}
+
+    def summary(self) -> Dict[str, Any]:
+        with closing(self._connect()) as db:
+            count, size_bytes = db.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM backups").fetchone()
+        return {"total_backups": count, "total_size_mb": size_bytes / (1024 * 1024)}
+
+    @staticmethod
+    def _upsert(db: sqlite3.Connection, name: str, stat: os.stat_result, info: Dict[str, Any]):
+        info = dict(info)
+        chunks = info.pop(CHUNKS_KEY, None)
+        db.execute(
+            "INSERT OR REPLACE INTO backups (name, cluster_name, created_at, size_bytes, mtime_ns, chunks_known, info) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (name, info.get("cluster_name"), info.get("created_at"), stat.st_size, stat.st_mtime_ns,
+             chunks is not None, json.dumps(info, ensure_ascii=False))
+        )
+        db.execute("DELETE FROM backup_chunks WHERE backup = ?", (name,))
+        db.executemany(
+            "INSERT OR IGNORE INTO backup_chunks (backup, digest) VALUES (?, ?)",
+            [(name, digest) for digest in chunks or []]
+        )
@@ -1,13 +1,96 @@
 import subprocess
 import json
+import contextlib
 import os
 import tempfile
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 import yaml
 
+from .api_discovery import api_discovery
+from .backup_archive import ARCHIVE_VERSION, ZipStreamSink, extract_archive, get_codec
+from .backup_catalog import CHUNKS_KEY, BackupCatalog
+from .chunk_store import ChunkStore
+from .kube_client import kube_get_json_sync
+from .restore_engine import RestoreEngine, load_objects
+from .warm_pool import warm_pool
+
+# libyaml's emitter releases no GIL either, but is several times faster than the
+# pure-Python one, which dominates the export time of large clusters
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Common Kubernetes resource types, backed up when API discovery is unavailable
+BACKUP_RESOURCE_TYPES = [
+    "deployments",
+    "services",
+    "configmaps",
+    "secrets",
+    "persistentvolumeclaims",
+    "ingresses",
+    "networkpolicies",
+    "serviceaccounts",
+    "roles",
+    "rolebindings",
+    "clusterroles",
+    "clusterrolebindings",
+    "persistentvolumes",
+    "statefulsets",
+    "daemonsets",
+    "jobs",
+    "cronjobs",
+    "horizontalpodautoscalers",
+]
+
+CLUSTER_SCOPED_TYPES = {"clusterroles", "clusterrolebindings", "persistentvolumes"}
+
+# Discovered types that are not backed up: recreated by their controllers,
+# runtime state of the cluster itself, or read-only views
+SKIPPED_RESOURCES = {
+    "pods",
+    "endpoints",
+    "events",
+    "nodes",
+    "componentstatuses",
+    "replicasets.apps",
+    "controllerrevisions.apps",
+    "endpointslices.discovery.k8s.io",
+    "events.events.k8s.io",
+    "leases.coordination.k8s.io",
+    "csinodes.storage.k8s.io",
+    "volumeattachments.storage.k8s.io",
+    "certificatesigningrequests.certificates.k8s.io",
+}
+SKIPPED_GROUPS = {"metrics.k8s.io"}
+
+# Resource types fetched and cleaned at the same time
+EXPORT_WORKERS = int(os.environ.get("CLUSTERMASTER_BACKUP_WORKERS", "8"))
+
+# API group/version serving each backed-up resource type
+RESOURCE_API_PATHS = {
+    "deployments": "/apis/apps/v1",
+    "services": "/api/v1",
+    "configmaps": "/api/v1",
+    "secrets": "/api/v1",
+    "persistentvolumeclaims": "/api/v1",
+    "persistentvolumes": "/api/v1",
+    "serviceaccounts": "/api/v1",
+    "ingresses": "/apis/networking.k8s.io/v1",
+    "networkpolicies": "/apis/networking.k8s.io/v1",
+    "roles": "/apis/rbac.authorization.k8s.io/v1",
+    "rolebindings": "/apis/rbac.authorization.k8s.io/v1",
+    "clusterroles": "/apis/rbac.authorization.k8s.io/v1",
+    "clusterrolebindings": "/apis/rbac.authorization.k8s.io/v1",
+    "statefulsets": "/apis/apps/v1",
+    "daemonsets": "/apis/apps/v1",
+    "jobs": "/apis/batch/v1",
+    "cronjobs": "/apis/batch/v1",
+    "horizontalpodautoscalers": "/apis/autoscaling/v2",
+}
+
 
 class BackupService:
     """Service for creating and managing Kubernetes cluster backups"""
@@ -28,15 +111,27 @@ class BackupService:
         # Create backup directory if it doesn't exist
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         print(f"📁 Backup directory: {self.backup_dir}")
+        
+        # Guards chunk puts, indexing of incremental backups and chunk deletion.
+        # Chunks put by backups that are not indexed yet are never deleted
+        self._chunk_lock = threading.Lock()
+        self._pending_chunks: Dict[str, Set[str]] = {}
+        
+        # Index of the archives - listing does not open every zip
+        self.catalog = BackupCatalog(self.backup_dir)
+        
+        # Chunks shared by incremental backups, kept next to the archives
+        self.chunk_store = ChunkStore(self.backup_dir / "chunks")
     
     def get_backup_directory_info(self) -> Dict[str, Any]:
         """Get information about backup directory"""
+        self.catalog.reconcile(self._read_backup_info)
         return {
             "backup_directory": str(self.backup_dir),
             "exists": self.backup_dir.exists(),
             "is_writable": os.access(self.backup_dir, os.W_OK),
-            "total_backups": len(list(self.backup_dir.glob("*.zip"))),
-            "total_size_mb": sum(f.stat().st_size for f in self.backup_dir.glob("*.zip")) / (1024 * 1024)
+            **self.catalog.summary(),
+            "chunk_store": self.chunk_store.stats()
         }
     
     def change_backup_directory(self, new_directory: str) -> Dict[str, Any]:
@@ -59,9 +154,12 @@ class BackupService:
                     "message": f"Nie można zapisywać w katalogu {new_directory}"
                 }
             
-            # Update backup directory
+            # Update backup directory and index the archives already there
             old_directory = str(self.backup_dir)
             self.backup_dir = new_path
+            self.catalog = BackupCatalog(new_path)
+            self.chunk_store = ChunkStore(new_path / "chunks")
+            self.catalog.reconcile(self._read_backup_info, force=True)
             
             return {
                 "success": True,
@@ -77,8 +175,26 @@ class BackupService:
                 "message": f"Błąd podczas zmiany katalogu: {str(e)}"
             }
     
-    def create_cluster_backup(self, cluster_name: str, backup_name: Optional[str] = None) -> Dict[str, Any]:
-        """Create a comprehensive backup of a Kubernetes cluster using etcd snapshot"""
+    def create_cluster_backup(self, cluster_name: str, backup_name: Optional[str] = None,
+                              codec: str = "deflate", incremental: bool = False) -> Dict[str, Any]:
+        """
+        Create a comprehensive backup of a Kubernetes cluster using etcd snapshot.
+        `codec` compresses the entries: deflate (plain ZIP), or the parallel framed
+        gzip, lzma and zstd (if installed), or store.
+        
+        Incremental backups store every object once in the shared chunk store and
+        the archive only holds the manifest referencing the chunks. The etcd
+        snapshot is skipped - it changes on every write and would be stored
+        again in full each time.
+        """
+        try:
+            get_codec(codec)
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"Nieobsługiwany kodek kompresji: {codec}"
+            }
         
         if not backup_name:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -86,19 +202,23 @@ class BackupService:
         
         backup_path = self.backup_dir / f"{backup_name}.zip"
         
+        pending_chunks = None
+        if incremental:
+            with self._chunk_lock:
+                pending_chunks = self._pending_chunks[backup_name] = set()
+        
         try:
-            # Create temporary directory for backup files
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_path = Path(temp_dir)
-                
+            # Every exporter writes straight into the archive; it only appears
+            # under its final name once complete
+            with ZipStreamSink(backup_path, codec) as sink:
                 # 1. Try to create ETCD snapshot (primary backup method)
-                etcd_success = self._backup_etcd_snapshot(cluster_name, temp_path)
+                etcd_success = False if incremental else self._backup_etcd_snapshot(cluster_name, sink)
                 
                 # 2. Backup Kubernetes resources as fallback/supplement
-                resources_backed_up = self._backup_kubernetes_resources(cluster_name, temp_path)
+                resources_backed_up = self._backup_kubernetes_resources(cluster_name, sink, pending_chunks)
                 
                 # 3. Backup cluster info
-                cluster_info = self._backup_cluster_info(cluster_name, temp_path)
+                cluster_info = self._backup_cluster_info(cluster_name, sink)
                 
                 # 4. Create backup manifest
                 manifest = {
@@ -108,43 +228,67 @@ class BackupService:
                     "etcd_snapshot": etcd_success,
                     "resources": resources_backed_up,
                     "cluster_info": cluster_info,
-                    "backup_type": "etcd_snapshot" if etcd_success else "resources_only"
-                }
-                
-                manifest_path = temp_path / "backup_manifest.json"
-                with open(manifest_path, 'w', encoding='utf-8') as f:
-                    json.dump(manifest, f, indent=2, ensure_ascii=False)
-                
-                # 5. Create ZIP archive
-                self._create_zip_archive(temp_path, backup_path)
-                
-                backup_type = "ETCD snapshot + zasoby" if etcd_success else "Tylko zasoby K8s"
-                
-                return {
-                    "success": True,
-                    "backup_name": backup_name,
-                    "backup_path": str(backup_path),
-                    "size_mb": round(backup_path.stat().st_size / (1024 * 1024), 2),
-                    "resources_count": len(resources_backed_up),
-                    "created_at": manifest["created_at"],
-                    "backup_type": backup_type,
-                    "etcd_snapshot": etcd_success,
-                    "message": f"Backup klastra {cluster_name} utworzony pomyślnie ({backup_type})"
+                    "backup_type": "etcd_snapshot" if etcd_success else "resources_only",
+                    "backup_mode": "incremental" if incremental else "full",
+                    "codec": codec,
+                    "archive_version": ARCHIVE_VERSION
                 }
+                if incremental:
+                    manifest["chunk_stats"] = {
+                        "objects": sum(r["count"] for r in resources_backed_up),
+                        "new_chunks": sum(r["new_chunks"] for r in resources_backed_up)
+                    }
+                # Left uncompressed - listing reads it without knowing the codec
+                sink.write_text("backup_manifest.json", json.dumps(manifest, indent=2, ensure_ascii=False), compress=False)
+            
+            # Indexed before its chunks stop being pending - a concurrent deletion
+            # must see which chunks this backup references
+            with self._chunk_lock if incremental else contextlib.nullcontext():
+                try:
+                    self.catalog.upsert(backup_path, {
+                        **self._backup_info(backup_path, manifest),
+                        CHUNKS_KEY: self._manifest_chunks(manifest)
+                    })
+                except Exception as e:
+                    # The next listing picks the archive up from the filesystem
+                    print(f"Warning: Could not index backup {backup_name}: {e}")
+                self._pending_chunks.pop(backup_name, None)
+            
+            backup_type = "ETCD snapshot + zasoby" if etcd_success else "Tylko zasoby K8s"
+            if incremental:
+                backup_type = "Przyrostowy (zasoby K8s)"
+            
+            return {
+                "success": True,
+                "backup_name": backup_name,
+                "backup_path": str(backup_path),
+                "size_mb": round(backup_path.stat().st_size / (1024 * 1024), 2),
+                "resources_count": len(resources_backed_up),
+                "created_at": manifest["created_at"],
+                "backup_type": backup_type,
+                "etcd_snapshot": etcd_success,
+                "codec": codec,
+                "backup_mode": manifest["backup_mode"],
+                "chunk_stats": manifest.get("chunk_stats"),
+                "message": f"Backup klastra {cluster_name} utworzony pomyślnie ({backup_type})"
+            }
                 
         except Exception as e:
+            if incremental:
+                with self._chunk_lock:
+                    self._pending_chunks.pop(backup_name, None)
             return {
                 "success": False,
                 "error": str(e),
                 "message": f"Błąd podczas tworzenia backupu: {str(e)}"
             }
     
-    def _backup_etcd_snapshot(self, cluster_name: str, backup_path: Path) -> bool:
+    def _backup_etcd_snapshot(self, cluster_name: str, sink) -> bool:
         """Create ETCD snapshot backup for Kind cluster"""
         try:
             # For Kind clusters, we need to access etcd inside the control-plane container
-            control_plane_container = f"{cluster_name}-control-plane"
-            snapshot_file = backup_path / f"etcd_snapshot_{cluster_name}.db"
+            # Clusters handed out by the warm pool keep their pool name in Docker
+            control_plane_container = f"{warm_pool.resolve(cluster_name)}-control-plane"
             
             # Method 1: Try to use etcdctl directly in the Kind container
             etcdctl_cmd = [
@@ -159,80 +303,79 @@ class BackupService:
             result = subprocess.run(etcdctl_cmd, capture_output=True, text=True, timeout=60)
             
             if result.returncode == 0:
-                # Copy the snapshot from container to host
-                copy_cmd = [
-                    "docker", "cp", 
-                    f"{control_plane_container}:/tmp/etcd_backup.db",
-                    str(snapshot_file)
-                ]
-                
-                copy_result = subprocess.run(copy_cmd, capture_output=True, text=True, timeout=30)
-                
-                if copy_result.returncode == 0 and snapshot_file.exists():
+                # Stream the snapshot from the container into the archive
+                try:
+                    streamed = self._stream_from_container(
+                        control_plane_container, ["cat", "/tmp/etcd_backup.db"],
+                        sink, f"etcd_snapshot_{cluster_name}.db"
+                    )
+                finally:
                     # Clean up temporary file in container
                     subprocess.run([
                         "docker", "exec", control_plane_container,
                         "rm", "-f", "/tmp/etcd_backup.db"
                     ], capture_output=True, timeout=10)
-                    
-                    print(f"ETCD snapshot created successfully: {snapshot_file}")
+                
+                if streamed:
+                    print(f"ETCD snapshot created successfully for {cluster_name}")
                     return True
-                else:
-                    print(f"Failed to copy ETCD snapshot: {copy_result.stderr}")
+                print("Failed to copy ETCD snapshot")
             else:
                 print(f"ETCD snapshot failed: {result.stderr}")
                 
-                # Method 2: Fallback - try alternative etcd backup approach
-                return self._backup_etcd_alternative(cluster_name, backup_path)
-                
         except subprocess.TimeoutExpired:
             print("ETCD snapshot timed out")
         except Exception as e:
             print(f"ETCD snapshot error: {e}")
         
-        return False
+        # Method 2: Fallback - try alternative etcd backup approach
+        return self._backup_etcd_alternative(cluster_name, sink)
     
-    def _backup_etcd_alternative(self, cluster_name: str, backup_path: Path) -> bool:
-        """Alternative ETCD backup method using kubectl"""
+    def _backup_etcd_alternative(self, cluster_name: str, sink) -> bool:
+        """Alternative ETCD backup method: archive of the etcd data directory"""
         try:
-            # Try to backup etcd data directory directly
-            control_plane_container = f"{cluster_name}-control-plane"
-            etcd_data_backup = backup_path / f"etcd_data_{cluster_name}.tar.gz"
+            # Clusters handed out by the warm pool keep their pool name in Docker
+            control_plane_container = f"{warm_pool.resolve(cluster_name)}-control-plane"
             
-            # Create tar archive of etcd data directory
-            tar_cmd = [
-                "docker", "exec", control_plane_container,
-                "tar", "-czf", "/tmp/etcd_data_backup.tar.gz",
-                "-C", "/var/lib/etcd", "."
-            ]
-            
-            result = subprocess.run(tar_cmd, capture_output=True, text=True, timeout=60)
-            
-            if result.returncode == 0:
-                # Copy the archive from container to host
-                copy_cmd = [
-                    "docker", "cp",
-                    f"{control_plane_container}:/tmp/etcd_data_backup.tar.gz",
-                    str(etcd_data_backup)
-                ]
-                
-                copy_result = subprocess.run(copy_cmd, capture_output=True, text=True, timeout=30)
-                
-                if copy_result.returncode == 0 and etcd_data_backup.exists():
-                    # Clean up temporary file
-                    subprocess.run([
-                        "docker", "exec", control_plane_container,
-                        "rm", "-f", "/tmp/etcd_data_backup.tar.gz"
-                    ], capture_output=True, timeout=10)
-                    
-                    print(f"ETCD data backup created: {etcd_data_backup}")
-                    return True
+            # tar writes to stdout - no copy left inside the container; already gzipped
+            if self._stream_from_container(
+                control_plane_container, ["tar", "-czf", "-", "-C", "/var/lib/etcd", "."],
+                sink, f"etcd_data_{cluster_name}.tar.gz", compress=False
+            ):
+                print(f"ETCD data backup created for {cluster_name}")
+                return True
                     
         except Exception as e:
             print(f"Alternative ETCD backup failed: {e}")
         
         return False
     
+    def _stream_from_container(self, container: str, command: List[str], sink, entry_name: str,
+                               compress: bool = True, timeout: int = 120) -> bool:
+        """
+        Pipe the stdout of a command run in a container into one archive entry.
+        The entry is kept only if the command exits cleanly with some output.
+        """
+        process = subprocess.Popen(
+            ["docker", "exec", container] + command,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        # Kill a hung docker exec; reading stdout then ends and the wait fails
+        watchdog = threading.Timer(timeout, process.kill)
+        watchdog.start()
+        try:
+            streamed = sink.write_stream(
+                entry_name, process.stdout, compress,
+                keep=lambda total: process.wait() == 0 and total > 0
+            )
+        finally:
+            watchdog.cancel()
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        return streamed > 0
+    
     def restore_cluster_backup(self, backup_name: str, new_cluster_name: Optional[str] = None) -> Dict[str, Any]:
         """Restore a cluster from backup"""
         backup_file = self.backup_dir / f"{backup_name}.zip"
@@ -248,20 +391,19 @@ class BackupService:
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_path = Path(temp_dir)
                 
-                # Extract backup
-                with zipfile.ZipFile(backup_file, 'r') as zipf:
-                    zipf.extractall(temp_path)
-                
                 # Read manifest
-                manifest_file = temp_path / "backup_manifest.json"
-                if not manifest_file.exists():
-                    return {
-                        "success": False,
-                        "error": "Invalid backup file - missing manifest"
-                    }
+                with zipfile.ZipFile(backup_file, 'r') as zipf:
+                    if 'backup_manifest.json' not in zipf.namelist():
+                        return {
+                            "success": False,
+                            "error": "Invalid backup file - missing manifest"
+                        }
+                    manifest = json.loads(zipf.read('backup_manifest.json').decode('utf-8'))
                 
-                with open(manifest_file, 'r', encoding='utf-8') as f:
-                    manifest = json.load(f)
+                # Extract backup (backups made before codecs were added have none)
+                extract_archive(backup_file, temp_path, manifest.get("codec"), manifest.get("archive_version", 1))
+                if manifest.get("backup_mode") == "incremental":
+                    self._materialize_chunks(manifest, temp_path)
                 
                 original_cluster = manifest.get("cluster_name")
                 target_cluster = new_cluster_name or f"{original_cluster}_restored"
@@ -347,26 +489,22 @@ nodes:
                     "message": f"Nie udało się utworzyć klastra {target_cluster}"
                 }
             
-            # Apply resources
-            restored_resources = []
-            for yaml_file in backup_path.glob("*.yaml"):
-                if yaml_file.name != "cluster_info.yaml":
-                    apply_result = subprocess.run([
-                        "kubectl", "apply", "-f", str(yaml_file),
-                        "--context", f"kind-{target_cluster}"
-                    ], capture_output=True, text=True, timeout=60)
-                    
-                    if apply_result.returncode == 0:
-                        restored_resources.append(yaml_file.name)
-                    else:
-                        print(f"Warning: Could not restore {yaml_file.name}: {apply_result.stderr}")
+            # Apply resources: parsed up front, applied tier by tier in dependency
+            # order (namespaces/CRDs, RBAC, config, workloads), each tier concurrently
+            restore = RestoreEngine(f"kind-{target_cluster}").restore(load_objects(backup_path))
+            for failure in restore["failures"]:
+                print(f"Warning: Could not restore {failure['kind']} {failure['name']}: {failure['error']}")
             
             return {
                 "success": True,
                 "message": f"Klaster {target_cluster} został przywrócony z backupu",
                 "cluster_name": target_cluster,
-                "restored_resources": restored_resources,
-                "resources_count": len(restored_resources)
+                "restored_resources": restore["restored_files"],
+                "resources_count": len(restore["restored_files"]),
+                "objects_applied": restore["objects_applied"],
+                "objects_failed": restore["objects_failed"],
+                "tiers": restore["tiers"],
+                "failures": restore["failures"]
             }
             
         except Exception as e:
@@ -376,124 +514,179 @@ nodes:
                 "message": f"Błąd przywracania z zasobów: {str(e)}"
             }
     
-    def _backup_kubernetes_resources(self, cluster_name: str, backup_path: Path) -> List[Dict[str, Any]]:
-        """Backup all Kubernetes resources"""
+    def _backup_kubernetes_resources(self, cluster_name: str, sink,
+                                     pending_chunks: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Backup all Kubernetes resources: one list call per resource type across
+        all namespaces, fetched and cleaned concurrently. Files are written to
+        the sink as soon as each type completes, from this thread only.
+        Incremental backups pass `pending_chunks`, which collects the chunks put.
+        """
         resources_backed_up = []
         
-        # Common Kubernetes resource types to backup
-        resource_types = [
-            "deployments",
-            "services", 
-            "configmaps",
-            "secrets",
-            "persistentvolumeclaims",
-            "ingresses",
-            "networkpolicies",
-            "serviceaccounts",
-            "roles",
-            "rolebindings",
-            "clusterroles", 
-            "clusterrolebindings",
-            "statefulsets",
-            "daemonsets",
-            "jobs",
-            "cronjobs",
-            "horizontalpodautoscalers"
-        ]
+        with ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as executor:
+            futures = {
+                executor.submit(self._export_resource_type, cluster_name, resource, pending_chunks): resource
+                for resource in self._backup_resource_types(cluster_name)
+            }
+            for future in as_completed(futures):
+                try:
+                    exported = future.result()
+                except Exception as e:
+                    print(f"Warning: Could not backup {futures[future]['type']}: {e}")
+                    continue
+                
+                for file_name, content, record in exported:
+                    # Incremental exports already went to the chunk store
+                    if content is not None:
+                        sink.write_text(file_name, content)
+                    resources_backed_up.append(record)
         
-        # Get all namespaces first
-        namespaces = self._get_namespaces(cluster_name)
+        # Stable manifest order regardless of completion order
+        resources_backed_up.sort(key=lambda r: (r["type"], r["namespace"] or ""))
+        return resources_backed_up
+    
+    def _backup_resource_types(self, cluster_name: str) -> List[Dict[str, Any]]:
+        """
+        Every listable type served by the cluster, CRDs included (discovery is
+        cached per server version). Falls back to the common built-in types.
+        """
+        discovered = api_discovery.listable_resources(f"kind-{cluster_name}")
+        if discovered is None:
+            resources = []
+            for name in BACKUP_RESOURCE_TYPES:
+                api_prefix = RESOURCE_API_PATHS.get(name)
+                resources.append({
+                    "type": name,
+                    "kubectl_name": name,
+                    "namespaced": name not in CLUSTER_SCOPED_TYPES,
+                    # Unknown types have no API path - kubectl resolves them
+                    "api_path": f"{api_prefix}/{name}" if api_prefix else None
+                })
+            return resources
         
-        for resource_type in resource_types:
-            try:
-                # Backup cluster-wide resources
-                if resource_type in ["clusterroles", "clusterrolebindings", "persistentvolumes"]:
-                    self._backup_resource_type(cluster_name, resource_type, None, backup_path)
-                    resources_backed_up.append({
-                        "type": resource_type,
-                        "namespace": None,
-                        "scope": "cluster"
-                    })
-                else:
-                    # Backup namespaced resources
-                    for namespace in namespaces:
-                        if self._backup_resource_type(cluster_name, resource_type, namespace, backup_path):
-                            resources_backed_up.append({
-                                "type": resource_type,
-                                "namespace": namespace,
-                                "scope": "namespaced"
-                            })
-            except Exception as e:
-                print(f"Warning: Could not backup {resource_type}: {e}")
+        resources = []
+        for resource in discovered:
+            qualified_name = f"{resource['name']}.{resource['group']}" if resource["group"] else resource["name"]
+            if qualified_name in SKIPPED_RESOURCES or resource["group"] in SKIPPED_GROUPS:
+                continue
+            resources.append({**resource, "type": resource["name"], "kubectl_name": qualified_name})
         
-        return resources_backed_up
+        # Keep the short name (and file names) of built-in types; only types
+        # served by several groups are told apart by their group
+        counts: Dict[str, int] = {}
+        for resource in resources:
+            counts[resource["type"]] = counts.get(resource["type"], 0) + 1
+        for resource in resources:
+            if counts[resource["type"]] > 1:
+                resource["type"] = resource["kubectl_name"]
+        return resources
     
-    def _get_namespaces(self, cluster_name: str) -> List[str]:
-        """Get all namespaces in the cluster"""
-        try:
-            result = subprocess.run([
-                "kubectl", "get", "namespaces",
-                "--context", f"kind-{cluster_name}",
-                "-o", "jsonpath={.items[*].metadata.name}"
-            ], capture_output=True, text=True, encoding='utf-8')
-            
-            if result.returncode == 0:
-                return result.stdout.strip().split()
-            return ["default", "kube-system", "kube-public"]
-        except:
-            return ["default", "kube-system", "kube-public"]
+    def _export_resource_type(self, cluster_name: str, resource: Dict[str, Any],
+                              pending_chunks: Optional[Set[str]] = None) -> List[tuple]:
+        """
+        List one resource type in all namespaces (pooled API connection, kubectl
+        as fallback) and return (file name, YAML, manifest record) per namespace.
+        Types with no objects produce nothing. Incremental exports put each object
+        into the chunk store and return the chunk digests in the record instead.
+        """
+        resource_type = resource["type"]
+        kubectl_args = ["get", resource["kubectl_name"]]
+        if resource["namespaced"]:
+            kubectl_args.append("--all-namespaces")
+        
+        resource_list = kube_get_json_sync(f"kind-{cluster_name}", resource["api_path"], kubectl_args)
+        if not resource_list or not resource_list.get("items"):
+            return []
+        
+        by_namespace: Dict[Optional[str], List[Dict[str, Any]]] = {}
+        for item in self._list_items(resource_list):
+            namespace = item.get("metadata", {}).get("namespace") if resource["namespaced"] else None
+            by_namespace.setdefault(namespace, []).append(item)
+        
+        exported = []
+        for namespace, items in sorted(by_namespace.items(), key=lambda entry: entry[0] or ""):
+            file_name = f"{namespace}_{resource_type}.yaml" if namespace else f"cluster_{resource_type}.yaml"
+            record = {
+                "type": resource_type,
+                "namespace": namespace,
+                "scope": "namespaced" if namespace else "cluster",
+                "count": len(items)
+            }
+            if resource.get("api_version"):
+                record["api_version"] = resource["api_version"]
+            if pending_chunks is not None:
+                record["file"] = file_name
+                record["chunks"] = []
+                record["new_chunks"] = 0
+                documents = [self._clean_kubernetes_objects([item]).encode('utf-8') for item in items]
+                # Marked pending together with the put - a deletion running meanwhile keeps them
+                with self._chunk_lock:
+                    for data in documents:
+                        digest, added = self.chunk_store.put(data)
+                        pending_chunks.add(digest)
+                        record["chunks"].append(digest)
+                        record["new_chunks"] += 1 if added else 0
+                exported.append((file_name, None, record))
+                continue
+            exported.append((
+                file_name,
+                # Clean up the objects (remove runtime fields)
+                self._clean_kubernetes_objects(items),
+                record
+            ))
+        return exported
     
-    def _backup_resource_type(self, cluster_name: str, resource_type: str, namespace: Optional[str], backup_path: Path) -> bool:
-        """Backup specific resource type"""
-        try:
-            cmd = ["kubectl", "get", resource_type, "--context", f"kind-{cluster_name}", "-o", "yaml"]
-            
-            if namespace:
-                cmd.extend(["-n", namespace])
-                output_file = backup_path / f"{namespace}_{resource_type}.yaml"
-            else:
-                output_file = backup_path / f"cluster_{resource_type}.yaml"
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-            
-            if result.returncode == 0 and result.stdout.strip():
-                # Clean up the YAML (remove runtime fields)
-                cleaned_yaml = self._clean_kubernetes_yaml(result.stdout)
-                
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(cleaned_yaml)
-                return True
-            return False
-        except Exception:
-            return False
+    def _materialize_chunks(self, manifest: Dict[str, Any], backup_path: Path):
+        """Rebuild the YAML files of an incremental backup from the chunk store"""
+        for record in manifest.get("resources", []):
+            if "chunks" not in record:
+                continue
+            documents = [self.chunk_store.get(digest).decode('utf-8') for digest in record["chunks"]]
+            with open(backup_path / Path(record["file"]).name, 'w', encoding='utf-8') as f:
+                f.write("---\n".join(documents))
     
-    def _clean_kubernetes_yaml(self, yaml_content: str) -> str:
-        """Clean up Kubernetes YAML by removing runtime/generated fields"""
-        try:
-            docs = list(yaml.safe_load_all(yaml_content))
-            cleaned_docs = []
+    @staticmethod
+    def _manifest_chunks(manifest: Dict[str, Any]) -> List[str]:
+        """Chunk digests an archive references (none for full backups)"""
+        return sorted({digest for record in manifest.get("resources", []) for digest in record.get("chunks", [])})
+    
+    def _list_items(self, resource_list: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Expand a List object; the API omits kind/apiVersion on the items"""
+        list_kind = resource_list.get("kind", "")
+        item_kind = list_kind[:-len("List")] if list_kind.endswith("List") and list_kind != "List" else None
+        items = []
+        for item in resource_list.get("items", []):
+            if item_kind and "kind" not in item:
+                item["kind"] = item_kind
+            if "apiVersion" not in item and resource_list.get("apiVersion"):
+                item["apiVersion"] = resource_list["apiVersion"]
+            items.append(item)
+        return items
+    
+    def _clean_kubernetes_objects(self, objects: List[Dict[str, Any]]) -> str:
+        """Remove runtime/generated fields and dump objects as multi-document YAML"""
+        cleaned_docs = []
+        
+        for doc in objects:
+            if not doc:
+                continue
+            # Remove runtime fields
+            if 'metadata' in doc:
+                metadata = doc['metadata']
+                # Remove runtime metadata
+                for field in ['resourceVersion', 'uid', 'generation', 'managedFields', 'creationTimestamp']:
+                    metadata.pop(field, None)
             
-            for doc in docs:
-                if doc and doc.get('kind') != 'List':
-                    # Remove runtime fields
-                    if 'metadata' in doc:
-                        metadata = doc['metadata']
-                        # Remove runtime metadata
-                        for field in ['resourceVersion', 'uid', 'generation', 'managedFields', 'creationTimestamp']:
-                            metadata.pop(field, None)
-                    
-                    # Remove status section
-                    doc.pop('status', None)
-                    
-                    cleaned_docs.append(doc)
+            # Remove status section
+            doc.pop('status', None)
             
-            # Convert back to YAML
-            return yaml.dump_all(cleaned_docs, default_flow_style=False, allow_unicode=True)
-        except:
-            # If parsing fails, return original content
-            return yaml_content
+            cleaned_docs.append(doc)
+        
+        # Convert back to YAML
+        return yaml.dump_all(cleaned_docs, Dumper=YAML_DUMPER, default_flow_style=False, allow_unicode=True)
     
-    def _backup_cluster_info(self, cluster_name: str, backup_path: Path) -> Dict[str, Any]:
+    def _backup_cluster_info(self, cluster_name: str, sink) -> Dict[str, Any]:
         """Backup cluster information"""
         cluster_info = {
             "cluster_name": cluster_name,
@@ -525,58 +718,55 @@ nodes:
             pass
         
         # Save cluster info
-        info_file = backup_path / "cluster_info.json"
-        with open(info_file, 'w', encoding='utf-8') as f:
-            json.dump(cluster_info, f, indent=2, ensure_ascii=False)
+        sink.write_text("cluster_info.json", json.dumps(cluster_info, indent=2, ensure_ascii=False))
         
         return cluster_info
     
-    def _create_zip_archive(self, source_dir: Path, output_path: Path):
-        """Create ZIP archive from directory"""
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in source_dir.rglob('*'):
-                if file_path.is_file():
-                    arcname = file_path.relative_to(source_dir)
-                    zipf.write(file_path, arcname)
+    def list_backups(self, cluster_name: Optional[str] = None, sort_by: str = "created_at",
+                     descending: bool = True, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """List available backups (newest first by default)"""
+        return self.query_backups(cluster_name, sort_by, descending, limit, offset)["backups"]
     
-    def list_backups(self) -> List[Dict[str, Any]]:
-        """List all available backups"""
-        backups = []
-        
-        for backup_file in self.backup_dir.glob("*.zip"):
-            try:
-                # Extract backup manifest to get metadata
-                with zipfile.ZipFile(backup_file, 'r') as zipf:
-                    if 'backup_manifest.json' in zipf.namelist():
-                        manifest_content = zipf.read('backup_manifest.json').decode('utf-8')
-                        manifest = json.loads(manifest_content)
-                        
-                        backup_info = {
-                            "backup_name": manifest.get("backup_name", backup_file.stem),
-                            "cluster_name": manifest.get("cluster_name", "unknown"),
-                            "created_at": manifest.get("created_at", "unknown"),
-                            "size_mb": round(backup_file.stat().st_size / (1024 * 1024), 2),
-                            "resources_count": len(manifest.get("resources", [])),
-                            "backup_type": manifest.get("backup_type", "unknown"),
-                            "file_path": str(backup_file)
-                        }
-                        backups.append(backup_info)
-            except Exception as e:
-                # If we can't read manifest, add basic info
-                backups.append({
-                    "backup_name": backup_file.stem,
-                    "cluster_name": "unknown",
-                    "created_at": datetime.fromtimestamp(backup_file.stat().st_mtime).isoformat(),
-                    "size_mb": round(backup_file.stat().st_size / (1024 * 1024), 2),
-                    "resources_count": 0,
-                    "backup_type": "unknown",
-                    "file_path": str(backup_file),
-                    "error": f"Could not read manifest: {str(e)}"
-                })
-        
-        # Sort by creation time (newest first)
-        backups.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-        return backups
+    def query_backups(self, cluster_name: Optional[str] = None, sort_by: str = "created_at",
+                      descending: bool = True, limit: Optional[int] = None, offset: int = 0) -> Dict[str, Any]:
+        """
+        One page of backups from the catalog plus the total count matching the
+        filter. Raises ValueError for an unknown sort column.
+        """
+        self.catalog.reconcile(self._read_backup_info)
+        return self.catalog.query(cluster_name, sort_by, descending, limit, offset)
+    
+    def _read_backup_info(self, backup_file: Path) -> Dict[str, Any]:
+        """Listing entry of an archive, read from its manifest"""
+        try:
+            # Extract backup manifest to get metadata
+            with zipfile.ZipFile(backup_file, 'r') as zipf:
+                manifest = json.loads(zipf.read('backup_manifest.json').decode('utf-8'))
+            return {**self._backup_info(backup_file, manifest), CHUNKS_KEY: self._manifest_chunks(manifest)}
+        except Exception as e:
+            # If we can't read manifest, add basic info (its chunks stay unknown)
+            return {
+                "backup_name": backup_file.stem,
+                "cluster_name": "unknown",
+                "created_at": datetime.fromtimestamp(backup_file.stat().st_mtime).isoformat(),
+                "size_mb": round(backup_file.stat().st_size / (1024 * 1024), 2),
+                "resources_count": 0,
+                "backup_type": "unknown",
+                "file_path": str(backup_file),
+                "error": f"Could not read manifest: {str(e)}"
+            }
+    
+    def _backup_info(self, backup_file: Path, manifest: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "backup_name": manifest.get("backup_name", backup_file.stem),
+            "cluster_name": manifest.get("cluster_name", "unknown"),
+            "created_at": manifest.get("created_at", "unknown"),
+            "size_mb": round(backup_file.stat().st_size / (1024 * 1024), 2),
+            "resources_count": len(manifest.get("resources", [])),
+            "backup_type": manifest.get("backup_type", "unknown"),
+            "codec": manifest.get("codec"),
+            "file_path": str(backup_file)
+        }
     
     def delete_backup(self, backup_name: str) -> Dict[str, Any]:
         """Delete a backup file"""
@@ -590,10 +780,23 @@ nodes:
             }
         
         try:
+            # Archives added behind the catalog's back must count as references too
+            self.catalog.reconcile(self._read_backup_info)
             backup_file.unlink()
+            orphaned = self.catalog.remove(backup_name)
+            chunk_gc = None
+            if orphaned:
+                # Only chunks that this (incremental) backup alone referenced, minus those
+                # a backup indexed or started meanwhile uses
+                with self._chunk_lock:
+                    self.catalog.reconcile(self._read_backup_info)
+                    in_use = set().union(*self._pending_chunks.values())
+                    orphaned = [digest for digest in self.catalog.unreferenced(orphaned) if digest not in in_use]
+                    chunk_gc = self.chunk_store.remove(orphaned)
             return {
                 "success": True,
-                "message": f"Backup {backup_name} został usunięty pomyślnie"
+                "message": f"Backup {backup_name} został usunięty pomyślnie",
+                "chunk_gc": chunk_gc
             }
         except Exception as e:
             return {
@@ -0,0 +1,98 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class ChunkStore:
+    """
+    Content-addressed store of backup chunks (one cleaned Kubernetes object each).
+
+    A chunk lives at `<root>/<first two hex chars>/<sha256>` compressed with
+    zlib; identical objects are stored once no matter how many backups
+    reference them. Writes are atomic (temp file + rename), so concurrent
+    writers of the same chunk are harmless.
+
+    The chunk count and size are counted once (temp files excluded) and then
+    kept up to date by put/remove, so stats() does not walk the store.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._totals: Optional[List[int]] = None
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> Tuple[str, int]:
+        """Store data; returns its digest and the bytes added to disk (0 if already present)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if path.exists():
+            return digest, 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = zlib.compress(data, 6)
+        tmp_path = path.with_name(f"{digest}.{os.getpid()}.{time.monotonic_ns()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        with self._lock:
+            existed = path.exists()
+            os.replace(tmp_path, path)
+            if existed:
+                return digest, 0
+            self._count(1, len(compressed))
+        return digest, len(compressed)
+
+    def get(self, digest: str) -> bytes:
+        """Read a chunk (FileNotFoundError if it is missing)"""
+        with open(self.path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def remove(self, digests: Iterable[str]) -> Dict[str, Any]:
+        """Remove the given chunks (those no backup references any more)"""
+        removed = 0
+        freed_bytes = 0
+        with self._lock:
+            for digest in set(digests):
+                path = self.path(digest)
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                removed += 1
+                freed_bytes += size
+            self._count(-removed, -freed_bytes)
+        return {"removed_chunks": removed, "freed_mb": round(freed_bytes / (1024 * 1024), 2)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._totals is None:
+                self._totals = self._scan()
+            chunks, size_bytes = self._totals
+        return {"chunks": chunks, "size_mb": round(size_bytes / (1024 * 1024), 2)}
+
+    def _count(self, chunks: int, size_bytes: int):
+        if self._totals is not None:
+            self._totals[0] += chunks
+            self._totals[1] += size_bytes
+
+    def _scan(self) -> List[int]:
+        """Count the chunks on disk, skipping temp files of unfinished writes"""
+        chunks = size_bytes = 0
+        if not self.root.exists():
+            return [0, 0]
+        for path in self.root.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                size_bytes += path.stat().st_size
+            except FileNotFoundError:
+                continue
+            chunks += 1
+        return [chunks, size_bytes]
@@ -0,0 +1,315 @@
+import asyncio
+import json
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .command_runner import command_runner
+
+# Labelki, którymi kind i k3d oznaczają kontenery węzłów
+KIND_CLUSTER_LABEL = "io.x-k8s.kind.cluster"
+KIND_ROLE_LABEL = "io.x-k8s.kind.role"
+K3D_CLUSTER_LABELS = ("k3d.cluster", "k3d.cluster.name")
+K3D_ROLE_LABEL = "k3d.role"
+
+# Zdarzenia Dockera, które zmieniają stan kontenera
+CONTAINER_STATES = {
+    "create": "created",
+    "start": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+    "kill": "exited",
+}
+
+
+class ClusterInventory:
+    """
+    Indeks klastrów kind/k3d w pamięci: nazwa -> provider, kontekst, kontenery.
+
+    Stan jest budowany raz z `docker ps -a`, a potem aktualizowany
+    z jednego strumienia `docker events`, więc endpointy nie muszą
+    wywoływać `kind get clusters` / `k3d cluster list` przy każdym żądaniu.
+    """
+
+    def __init__(self):
+        self._clusters: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._removed_listeners: List[Callable[[str], None]] = []
+        # nazwa z labelki -> nazwa widoczna dla użytkownika (klastry z puli)
+        self._aliases: Dict[str, str] = {}
+        self._hidden: set = set()
+        self.ready = False
+        self.last_refresh: Optional[float] = None
+        self.last_event: Optional[float] = None
+
+    # ===== Odczyt =====
+
+    def get(self, cluster_name: str) -> Optional[Dict]:
+        """Zwróć wpis klastra lub None"""
+        return self._clusters.get(cluster_name)
+
+    def find_container(self, container_name: str) -> Optional[str]:
+        """Nazwa klastra, do którego należy kontener (None = nie jest węzłem klastra)"""
+        for cluster_name, cluster in self._clusters.items():
+            if container_name in cluster["containers"]:
+                return cluster_name
+        return None
+
+    def list_names(self, provider: Optional[str] = None) -> List[str]:
+        """Lista nazw klastrów (opcjonalnie tylko dla danego providera)"""
+        return sorted(
+            name for name, cluster in self._clusters.items()
+            if (provider is None or cluster["provider"] == provider) and name not in self._hidden
+        )
+
+    def snapshot(self) -> Dict:
+        """Pełny stan indeksu (do debugowania)"""
+        return {
+            "ready": self.ready,
+            "watching": self._task is not None and not self._task.done(),
+            "last_refresh": self.last_refresh,
+            "last_event": self.last_event,
+            "clusters": {
+                name: {**cluster, "containers": list(cluster["containers"].values())}
+                for name, cluster in self._clusters.items()
+            }
+        }
+
+    # ===== Aktualizacje wywoływane przez endpointy =====
+
+    def mark_created(self, cluster_name: str, provider: str):
+        """Dodaj klaster od razu po utworzeniu (zdarzenia Dockera dotrą za chwilę)"""
+        label_name = next((label for label, alias in self._aliases.items() if alias == cluster_name), None)
+        self._ensure_cluster(cluster_name, provider, label_name)
+
+    def mark_deleted(self, cluster_name: str):
+        """Usuń klaster z indeksu od razu po usunięciu"""
+        self._remove_cluster(cluster_name)
+
+    def set_aliases(self, aliases: Dict[str, str], hidden: Iterable[str] = ()):
+        """
+        Ustaw nazwy widoczne dla klastrów, których labelki mają inną nazwę
+        (nazwa z labelki -> nazwa dla użytkownika) oraz klastry ukryte na listach.
+        """
+        self._aliases = dict(aliases)
+        self._hidden = set(hidden)
+
+        clusters = {}
+        for cluster in self._clusters.values():
+            name = self._aliases.get(cluster["label_name"], cluster["label_name"])
+            if name != cluster["name"]:
+                cluster["name"] = name
+                cluster["context"] = f"{cluster['provider']}-{name}"
+            clusters[name] = cluster
+        self._clusters = clusters
+
+    def on_removed(self, callback: Callable[[str], None]):
+        """Zarejestruj funkcję wywoływaną, gdy klaster znika z indeksu"""
+        self._removed_listeners.append(callback)
+
+    # ===== Cykl życia =====
+
+    async def start(self):
+        """Uruchom obserwowanie zdarzeń Dockera w tle"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch_loop())
+
+    async def stop(self):
+        """Zatrzymaj obserwowanie"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self.ready = False
+
+    async def refresh(self) -> bool:
+        """Przebuduj indeks z `docker ps -a`"""
+        result = await command_runner.run([
+            "docker", "ps", "-a", "--no-trunc", "--format",
+            "{{json .}}"
+        ], timeout=15)
+
+        if result["returncode"] != 0:
+            return False
+
+        clusters: Dict[str, Dict] = {}
+        for line in result["stdout"].splitlines():
+            if not line.strip():
+                continue
+            try:
+                container = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            labels = self._parse_labels(container.get("Labels", ""))
+            identity = self._identify(labels)
+            if not identity:
+                continue
+
+            label_name, provider, role = identity
+            cluster_name = self._aliases.get(label_name, label_name)
+            cluster = clusters.setdefault(cluster_name, self._new_cluster(cluster_name, provider, label_name))
+            cluster["containers"][container.get("Names", "")] = {
+                "name": container.get("Names", ""),
+                "role": role,
+                "state": container.get("State", "unknown"),
+                "image": container.get("Image", "")
+            }
+
+        for cluster_name in set(self._clusters) - set(clusters):
+            self._notify_removed(cluster_name)
+
+        self._clusters = clusters
+        self.last_refresh = time.time()
+        return True
+
+    async def _watch_loop(self):
+        """Utrzymuj strumień `docker events`, wznawiając go po błędach"""
+        backoff = 1
+        while True:
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    "docker", "events", "--format", "{{json .}}",
+                    "--filter", "type=container",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+
+                # Strumień jest już otwarty, więc żadne zdarzenie nie zginie między skanem a odczytem
+                self.ready = await self.refresh()
+
+                while True:
+                    line = await self._process.stdout.readline()
+                    if not line:
+                        break
+                    backoff = 1
+                    self._handle_event(line.decode('utf-8', errors='replace'))
+
+                await self._process.wait()
+            except asyncio.CancelledError:
+                self._terminate()
+                raise
+            except FileNotFoundError:
+                # Brak Dockera - endpointy użyją CLI
+                self.ready = False
+                return
+            except Exception as e:
+                print(f"Cluster inventory watcher error: {e}")
+
+            self._terminate()
+            self.ready = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _terminate(self):
+        if self._process and self._process.returncode is None:
+            try:
+                self._process.kill()
+            except ProcessLookupError:
+                pass
+        self._process = None
+
+    # ===== Przetwarzanie zdarzeń =====
+
+    def _handle_event(self, line: str):
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            return
+
+        attributes = event.get("Actor", {}).get("Attributes", {})
+        identity = self._identify(attributes)
+        if not identity:
+            return
+
+        label_name, provider, role = identity
+        cluster_name = self._aliases.get(label_name, label_name)
+        container_name = attributes.get("name", "")
+        action = event.get("Action") or event.get("status", "")
+        self.last_event = time.time()
+
+        if action == "destroy":
+            cluster = self._clusters.get(cluster_name)
+            if cluster:
+                cluster["containers"].pop(container_name, None)
+                if not cluster["containers"]:
+                    self._remove_cluster(cluster_name)
+            return
+
+        if action == "rename":
+            old_name = attributes.get("oldName", "").lstrip("/")
+            cluster = self._clusters.get(cluster_name)
+            if cluster and old_name in cluster["containers"]:
+                cluster["containers"][container_name] = cluster["containers"].pop(old_name)
+                cluster["containers"][container_name]["name"] = container_name
+            return
+
+        state = CONTAINER_STATES.get(action)
+        if state is None:
+            return
+
+        cluster = self._ensure_cluster(cluster_name, provider, label_name)
+        container = cluster["containers"].setdefault(container_name, {
+            "name": container_name,
+            "role": role,
+            "state": state,
+            "image": attributes.get("image", "")
+        })
+        container["state"] = state
+
+    def _remove_cluster(self, cluster_name: str):
+        if self._clusters.pop(cluster_name, None) is not None:
+            self._notify_removed(cluster_name)
+
+    def _notify_removed(self, cluster_name: str):
+        for callback in self._removed_listeners:
+            try:
+                callback(cluster_name)
+            except Exception as e:
+                print(f"Cluster inventory listener error: {e}")
+
+    def _ensure_cluster(self, cluster_name: str, provider: str, label_name: Optional[str] = None) -> Dict:
+        cluster = self._clusters.get(cluster_name)
+        if cluster is None:
+            cluster = self._new_cluster(cluster_name, provider, label_name)
+            self._clusters[cluster_name] = cluster
+        return cluster
+
+    @staticmethod
+    def _new_cluster(cluster_name: str, provider: str, label_name: Optional[str] = None) -> Dict:
+        return {
+            "name": cluster_name,
+            "label_name": label_name or cluster_name,
+            "provider": provider,
+            "context": f"{provider}-{cluster_name}",
+            "containers": {}
+        }
+
+    @staticmethod
+    def _identify(labels: Dict[str, str]):
+        """Zwróć (nazwa klastra, provider, rola) na podstawie labelek kontenera"""
+        if labels.get(KIND_CLUSTER_LABEL):
+            return labels[KIND_CLUSTER_LABEL], "kind", labels.get(KIND_ROLE_LABEL, "unknown")
+        for label in K3D_CLUSTER_LABELS:
+            if labels.get(label):
+                return labels[label], "k3d", labels.get(K3D_ROLE_LABEL, "unknown")
+        return None
+
+    @staticmethod
+    def _parse_labels(raw: str) -> Dict[str, str]:
+        """Labelki z `docker ps --format json` mają postać "k1=v1,k2=v2" """
+        labels = {}
+        for item in raw.split(","):
+            if "=" in item:
+                key, value = item.split("=", 1)
+                labels[key.strip()] = value.strip()
+        return labels
+
+
+# Singleton instance
+cluster_inventory = ClusterInventory()
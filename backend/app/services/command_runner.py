@@ -0,0 +1,373 @@
+import asyncio
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# Flagi, po których rozpoznajemy klaster, którego dotyczy komenda
+CLUSTER_FLAGS = ("--context", "--kube-context", "--name")
+
+# Prefiksy kontekstów kubeconfig tworzonych przez kind i k3d
+CONTEXT_PREFIXES = ("kind-", "k3d-")
+
+
+class CommandRunner:
+    """
+    Asynchroniczne uruchamianie komend CLI (kubectl, kind, docker, k3d) bez blokowania event loop.
+
+    Liczba równoczesnych procesów jest ograniczona globalnie i per klaster,
+    a blokujące wywołania serwisów trafiają do jednej puli wątków na cały czas życia aplikacji.
+
+    Długie operacje (tworzenie klastrów, uzupełnianie warm poola, skalowanie, backupy)
+    mają osobny limit i osobną pulę wątków - kilka minutowych `kind create` nie zajmuje
+    miejsc krótkim odczytom (kubectl get, docker ps).
+    """
+
+    def __init__(self, max_concurrency: int = 16, max_per_cluster: int = 4, max_blocking: int = 16,
+                 max_long_running: int = 8):
+        self.max_concurrency = max_concurrency
+        self.max_per_cluster = max_per_cluster
+        self.max_blocking = max_blocking
+        self.max_long_running = max_long_running
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._long_semaphore: Optional[asyncio.Semaphore] = None
+        self._cluster_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._long_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "commands": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "queued": 0,
+            "in_flight": 0,
+            "peak_queued": 0,
+            "peak_in_flight": 0,
+            "wait_seconds_total": 0.0,
+            "blocking_calls": 0,
+            "blocking_queued": 0,
+            "blocking_in_flight": 0,
+            "blocking_peak_queued": 0,
+            "long_running_commands": 0,
+            "long_running_queued": 0,
+            "long_running_in_flight": 0,
+            "long_running_blocking_calls": 0
+        }
+        self._cluster_stats: Dict[str, Dict[str, int]] = {}
+
+    def _get_semaphore(self, cluster: Optional[str], long_running: bool = False) -> List[asyncio.Semaphore]:
+        """Semafory są tworzone leniwie dla aktualnej pętli zdarzeń"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._long_semaphore = asyncio.Semaphore(self.max_long_running)
+            self._cluster_semaphores = {}
+            self._loop = loop
+
+        if long_running:
+            # Własny budżet - nie zajmuje miejsc klastra ani globalnych
+            return [self._long_semaphore]
+        if cluster is None:
+            return [self._semaphore]
+        semaphore = self._cluster_semaphores.get(cluster)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_cluster)
+            self._cluster_semaphores[cluster] = semaphore
+        # Najpierw limit klastra, żeby jeden klaster nie zajmował globalnych miejsc w kolejce
+        return [semaphore, self._semaphore]
+
+    @staticmethod
+    def cluster_of(args: List[str]) -> Optional[str]:
+        """Nazwa klastra z argumentów komendy, np. `--context kind-dev` -> `dev`"""
+        for flag in CLUSTER_FLAGS:
+            if flag in args:
+                index = args.index(flag)
+                if index + 1 < len(args):
+                    value = args[index + 1]
+                    if flag != "--name":
+                        for prefix in CONTEXT_PREFIXES:
+                            if value.startswith(prefix):
+                                return value[len(prefix):]
+                    return value
+        return None
+
+    @asynccontextmanager
+    async def _slot(self, cluster: Optional[str], long_running: bool = False):
+        """Zajmij miejsce w limitach, licząc czas i głębokość kolejki"""
+        if long_running:
+            async with self._long_slot():
+                yield
+            return
+
+        cluster_stats = self._cluster_stats.setdefault(cluster, {"queued": 0, "in_flight": 0, "commands": 0}) \
+            if cluster else None
+        semaphores = self._get_semaphore(cluster)
+
+        self._stats["queued"] += 1
+        self._stats["peak_queued"] = max(self._stats["peak_queued"], self._stats["queued"])
+        if cluster_stats:
+            cluster_stats["queued"] += 1
+        started = time.monotonic()
+        acquired = []
+        try:
+            for semaphore in semaphores:
+                await semaphore.acquire()
+                acquired.append(semaphore)
+        except BaseException:
+            for semaphore in acquired:
+                semaphore.release()
+            raise
+        finally:
+            self._stats["queued"] -= 1
+            if cluster_stats:
+                cluster_stats["queued"] -= 1
+
+        self._stats["wait_seconds_total"] += time.monotonic() - started
+        self._stats["in_flight"] += 1
+        self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._stats["in_flight"])
+        self._stats["commands"] += 1
+        if cluster_stats:
+            cluster_stats["in_flight"] += 1
+            cluster_stats["commands"] += 1
+        try:
+            yield
+        finally:
+            self._stats["in_flight"] -= 1
+            if cluster_stats:
+                cluster_stats["in_flight"] -= 1
+            for semaphore in acquired:
+                semaphore.release()
+
+    @asynccontextmanager
+    async def _long_slot(self):
+        semaphore = self._get_semaphore(None, long_running=True)[0]
+        self._stats["long_running_queued"] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self._stats["long_running_queued"] -= 1
+        self._stats["long_running_in_flight"] += 1
+        self._stats["long_running_commands"] += 1
+        try:
+            yield
+        finally:
+            self._stats["long_running_in_flight"] -= 1
+            semaphore.release()
+
+    async def run(
+        self,
+        args: List[str],
+        timeout: Optional[float] = 30,
+        input: Optional[str] = None,
+        cwd: Optional[str] = None,
+        cluster: Optional[str] = None,
+        long_running: bool = False,
+        on_line: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """
+        Uruchom komendę i zwróć wynik w formacie {"returncode", "stdout", "stderr"}
+
+        Przy przekroczeniu limitu czasu lub anulowaniu żądania proces jest zabijany.
+        Klaster (do limitu per klaster) jest brany z `cluster` albo z `--context`/`--name`.
+        `long_running` - komenda trwająca minuty, liczona w osobnym limicie.
+        `on_line` - wołane dla każdej linii stdout/stderr w trakcie działania procesu
+        (np. log zadania); pełne wyjście i tak trafia do wyniku.
+        """
+        async with self._slot(cluster or self.cluster_of(args), long_running):
+            result = await self._execute(args, timeout, input, cwd, on_line)
+            if result["returncode"] != 0:
+                self._stats["failed"] += 1
+            return result
+
+    async def _execute(self, args: List[str], timeout: Optional[float],
+                       input: Optional[str], cwd: Optional[str],
+                       on_line: Optional[Callable[[str], None]] = None) -> Dict:
+        try:
+            kwargs = {}
+            if os.name == 'nt':
+                kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                **kwargs
+            )
+        except FileNotFoundError:
+            return {
+                "returncode": 1,
+                "stdout": "",
+                "stderr": f"Nie znaleziono programu: {args[0]}"
+            }
+        except Exception as e:
+            return {"returncode": 1, "stdout": "", "stderr": str(e)}
+
+        try:
+            if on_line is None:
+                communicate = process.communicate(input.encode('utf-8') if input is not None else None)
+            else:
+                communicate = self._communicate_lines(process, input, on_line)
+            stdout, stderr = await asyncio.wait_for(communicate, timeout=timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            self._stats["timeouts"] += 1
+            return {
+                "returncode": 1,
+                "stdout": "",
+                "stderr": f"Komenda przekroczyła limit czasu ({timeout}s)"
+            }
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+
+        return {
+            "returncode": process.returncode,
+            "stdout": stdout.decode('utf-8', errors='replace'),
+            "stderr": stderr.decode('utf-8', errors='replace')
+        }
+
+    @staticmethod
+    async def _communicate_lines(process: asyncio.subprocess.Process, input: Optional[str],
+                                 on_line: Callable[[str], None]):
+        """Jak communicate(), ale przekazuje linie wyjścia na bieżąco"""
+        async def pump(stream: asyncio.StreamReader) -> bytes:
+            collected = []
+            while True:
+                line = await stream.readline()
+                if not line:
+                    return b"".join(collected)
+                collected.append(line)
+                text = line.decode('utf-8', errors='replace').rstrip()
+                if text:
+                    on_line(text)
+
+        if input is not None:
+            process.stdin.write(input.encode('utf-8'))
+            await process.stdin.drain()
+            process.stdin.close()
+        stdout, stderr = await asyncio.gather(pump(process.stdout), pump(process.stderr))
+        await process.wait()
+        return stdout, stderr
+
+    async def run_checked(self, args: List[str], timeout: Optional[float] = 30, input: Optional[str] = None,
+                          cluster: Optional[str] = None, long_running: bool = False) -> str:
+        """Jak run(), ale rzuca CalledProcessError przy niezerowym kodzie wyjścia"""
+        result = await self.run(args, timeout=timeout, input=input, cluster=cluster, long_running=long_running)
+        if result["returncode"] != 0:
+            raise subprocess.CalledProcessError(
+                result["returncode"], args, output=result["stdout"], stderr=result["stderr"]
+            )
+        return result["stdout"]
+
+    async def run_blocking(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Wykonaj blokującą funkcję (np. metodę serwisu wołającą subprocess.run)
+        we wspólnej puli wątków, zamiast tworzyć nowe wątki per żądanie.
+        """
+        loop = asyncio.get_running_loop()
+        with self._stats_lock:
+            self._stats["blocking_calls"] += 1
+            self._stats["blocking_queued"] += 1
+            self._stats["blocking_peak_queued"] = max(
+                self._stats["blocking_peak_queued"], self._stats["blocking_queued"]
+            )
+
+        def call():
+            with self._stats_lock:
+                self._stats["blocking_queued"] -= 1
+                self._stats["blocking_in_flight"] += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._stats_lock:
+                    self._stats["blocking_in_flight"] -= 1
+
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    async def run_blocking_long(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Jak run_blocking(), ale dla operacji trwających minuty (tworzenie/skalowanie klastra,
+        backup, instalacja chartów) - osobna pula wątków, która nie blokuje krótkich wywołań.
+        """
+        loop = asyncio.get_running_loop()
+        with self._stats_lock:
+            self._stats["long_running_blocking_calls"] += 1
+        return await loop.run_in_executor(self._get_long_executor(), lambda: func(*args, **kwargs))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_blocking, thread_name_prefix="clustermaster-blocking"
+                )
+            return self._executor
+
+    def _get_long_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._long_executor is None:
+                self._long_executor = ThreadPoolExecutor(
+                    max_workers=self.max_long_running, thread_name_prefix="clustermaster-long"
+                )
+            return self._long_executor
+
+    def shutdown(self):
+        """Zamknij pule wątków (przy zamykaniu aplikacji)"""
+        with self._executor_lock:
+            for executor in (self._executor, self._long_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._long_executor = None
+
+    def forget_cluster(self, cluster_name: str):
+        """
+        Usuń semafor i statystyki usuniętego klastra. Trwające komendy trzymają
+        własne referencje i zwalniają je normalnie.
+        """
+        self._cluster_semaphores.pop(cluster_name, None)
+        self._cluster_stats.pop(cluster_name, None)
+
+    def stats(self) -> Dict:
+        """Metryki kolejki i wykonywanych komend"""
+        commands = self._stats["commands"]
+        return {
+            **self._stats,
+            "wait_seconds_total": round(self._stats["wait_seconds_total"], 3),
+            "avg_wait_ms": round(self._stats["wait_seconds_total"] / commands * 1000, 2) if commands else 0.0,
+            "limits": {
+                "max_concurrency": self.max_concurrency,
+                "max_per_cluster": self.max_per_cluster,
+                "max_blocking": self.max_blocking,
+                "max_long_running": self.max_long_running
+            },
+            "clusters": {
+                cluster: dict(values) for cluster, values in self._cluster_stats.items()
+            }
+        }
+
+    async def _kill(self, process: asyncio.subprocess.Process):
+        """Zabij proces i poczekaj na jego zakończenie"""
+        try:
+            process.kill()
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except Exception:
+            pass
+
+
+# Singleton instance
+command_runner = CommandRunner(
+    max_concurrency=int(os.environ.get("CLUSTERMASTER_MAX_COMMANDS", "16")),
+    max_per_cluster=int(os.environ.get("CLUSTERMASTER_MAX_COMMANDS_PER_CLUSTER", "4")),
+    max_blocking=int(os.environ.get("CLUSTERMASTER_MAX_BLOCKING", "16")),
+    max_long_running=int(os.environ.get("CLUSTERMASTER_MAX_LONG_RUNNING", "8"))
+)
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import re
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .command_runner import command_runner
+
+# `docker stats` czyści ekran przed każdym odświeżeniem
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+# Próbki starsze niż to (kontener zatrzymany lub usunięty) nie są już zwracane
+STALE_AFTER = 10
+
+MEMORY_UNITS_MB = {
+    "B": 1 / (1024 * 1024),
+    "KiB": 1 / 1024,
+    "MiB": 1,
+    "GiB": 1024,
+    "TiB": 1024 * 1024,
+    "kB": 1000 / (1024 * 1024),
+    "MB": 1000 * 1000 / (1024 * 1024),
+    "GB": 1000 * 1000 * 1000 / (1024 * 1024),
+}
+
+
+def parse_memory_mb(value: str) -> float:
+    """Zamień np. "450.5MiB" na megabajty (MiB)"""
+    match = re.match(r"^\s*([0-9.]+)\s*([A-Za-z]+)\s*$", value or "")
+    if not match:
+        return 0.0
+    number, unit = match.groups()
+    return float(number) * MEMORY_UNITS_MB.get(unit, 0)
+
+
+def parse_mem_usage(mem_usage: str) -> Tuple[float, float]:
+    """Rozbij "450.5MiB / 8GiB" na (użyte MB, limit MB)"""
+    if '/' not in (mem_usage or ""):
+        return 0.0, 0.0
+    used, limit = mem_usage.split('/', 1)
+    return parse_memory_mb(used), parse_memory_mb(limit)
+
+
+def parse_percent(value: str) -> float:
+    try:
+        return float((value or "").replace('%', '').strip())
+    except ValueError:
+        return 0.0
+
+
+def parse_stats_line(line: str) -> Optional[Dict]:
+    """Zamień linię `docker stats --format {{json .}}` na próbkę"""
+    line = ANSI_ESCAPE.sub("", line).strip()
+    if not line:
+        return None
+    try:
+        raw = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
+    name = raw.get("Name", "")
+    if not name or name == "--":
+        return None
+
+    memory_used_mb, memory_limit_mb = parse_mem_usage(raw.get("MemUsage", ""))
+    return {
+        "name": name,
+        "timestamp": time.time(),
+        "cpu_percent": parse_percent(raw.get("CPUPerc", "")),
+        "memory_used_mb": round(memory_used_mb, 2),
+        "memory_limit_mb": round(memory_limit_mb, 2),
+        "memory_percent": parse_percent(raw.get("MemPerc", "")),
+        "cpu": raw.get("CPUPerc", ""),
+        "memory": raw.get("MemUsage", ""),
+        "memory_percent_raw": raw.get("MemPerc", "")
+    }
+
+
+class DockerStatsCollector:
+    """
+    Jeden długotrwały strumień `docker stats` dla wszystkich kontenerów.
+
+    Dla każdego kontenera trzymany jest krótki bufor ostatnich próbek,
+    więc endpointy zasobów odpowiadają od razu, zamiast czekać ~2 s
+    na `docker stats --no-stream` przy każdym żądaniu.
+    """
+
+    def __init__(self, history_size: int = 60):
+        self.history_size = history_size
+        self._samples: Dict[str, Deque[Dict]] = {}
+        self._sample_listeners: List[Callable[[Dict], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self.ready = False
+        self.last_sample: Optional[float] = None
+        self._last_prune = 0.0
+
+    # ===== Odczyt =====
+
+    def latest(self, container_name: str) -> Optional[Dict]:
+        """Najnowsza próbka kontenera (None, jeśli brak lub jest przestarzała)"""
+        samples = self._samples.get(container_name)
+        if not samples:
+            return None
+        sample = samples[-1]
+        if time.time() - sample["timestamp"] > STALE_AFTER:
+            return None
+        return sample
+
+    def history(self, container_name: str) -> List[Dict]:
+        """Bufor ostatnich próbek kontenera (od najstarszej)"""
+        return list(self._samples.get(container_name, ()))
+
+    def container_names(self) -> List[str]:
+        """Kontenery z aktualnymi próbkami"""
+        return [name for name in self._samples if self.latest(name) is not None]
+
+    async def latest_many(self, container_names: List[str]) -> Dict[str, Dict]:
+        """
+        Najnowsze próbki dla listy kontenerów.
+        Gdy strumień nie działa (np. tuż po starcie), wykonaj jednorazowy odczyt.
+        """
+        if self.ready:
+            samples = {}
+            for name in container_names:
+                sample = self.latest(name)
+                if sample is not None:
+                    samples[name] = sample
+            return samples
+
+        if not container_names:
+            return {}
+        return await self.read_once(container_names)
+
+    async def read_once(self, container_names: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Jednorazowy `docker stats --no-stream` (ścieżka zapasowa)"""
+        result = await command_runner.run(
+            ["docker", "stats", "--no-stream", "--format", "{{json .}}"] + (container_names or []),
+            timeout=10
+        )
+        if result["returncode"] != 0:
+            return {}
+
+        samples = {}
+        for line in result["stdout"].splitlines():
+            sample = parse_stats_line(line)
+            if sample:
+                samples[sample["name"]] = sample
+        return samples
+
+    def on_sample(self, callback: Callable[[Dict], None]):
+        """Zarejestruj funkcję wywoływaną dla każdej nowej próbki ze strumienia"""
+        self._sample_listeners.append(callback)
+
+    def stats(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "running": self._task is not None and not self._task.done(),
+            "containers": len(self.container_names()),
+            "last_sample": self.last_sample,
+            "history_size": self.history_size
+        }
+
+    # ===== Cykl życia =====
+
+    async def start(self):
+        """Uruchom strumień `docker stats` w tle"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._stream_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self.ready = False
+
+    async def _stream_loop(self):
+        """Czytaj strumień `docker stats`, wznawiając go po błędach"""
+        backoff = 1
+        while True:
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    "docker", "stats", "--format", "{{json .}}",
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+
+                while True:
+                    line = await self._process.stdout.readline()
+                    if not line:
+                        break
+                    sample = parse_stats_line(line.decode('utf-8', errors='replace'))
+                    if sample is None:
+                        continue
+                    backoff = 1
+                    self._record(sample)
+
+                await self._process.wait()
+            except asyncio.CancelledError:
+                self._terminate()
+                raise
+            except FileNotFoundError:
+                # Brak Dockera - endpointy użyją odczytu jednorazowego
+                self.ready = False
+                return
+            except Exception as e:
+                print(f"Docker stats collector error: {e}")
+
+            self._terminate()
+            self.ready = False
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def _record(self, sample: Dict):
+        samples = self._samples.get(sample["name"])
+        if samples is None:
+            samples = deque(maxlen=self.history_size)
+            self._samples[sample["name"]] = samples
+        samples.append(sample)
+        self.last_sample = sample["timestamp"]
+        self.ready = True
+
+        for callback in self._sample_listeners:
+            try:
+                callback(sample)
+            except Exception as e:
+                print(f"Docker stats listener error: {e}")
+
+        # Usuń bufory kontenerów, które zniknęły ze strumienia (najwyżej raz na STALE_AFTER)
+        if sample["timestamp"] - self._last_prune > STALE_AFTER:
+            self._last_prune = sample["timestamp"]
+            cutoff = sample["timestamp"] - STALE_AFTER * 6
+            for name in [n for n, s in self._samples.items() if s[-1]["timestamp"] < cutoff]:
+                del self._samples[name]
+
+    def _terminate(self):
+        if self._process and self._process.returncode is None:
+            try:
+                self._process.kill()
+            except ProcessLookupError:
+                pass
+        self._process = None
+
+
+# Singleton instance
+docker_stats = DockerStatsCollector()
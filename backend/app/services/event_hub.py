@@ -0,0 +1,134 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+# Klient, który nie nadąża z odbiorem, zostaje rozłączony (po ponownym połączeniu dostanie snapshot)
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Komentarz SSE wysyłany, gdy nic się nie zmienia (utrzymuje połączenie przez proxy)
+KEEPALIVE_SECONDS = 15
+
+
+class EventHub:
+    """
+    Wspólne źródło zdarzeń dla wszystkich podłączonych klientów (SSE).
+
+    Jedna pętla zbiera stan ze źródeł co `interval` sekund i rozsyła tylko
+    różnice; działa wyłącznie wtedy, gdy ktoś subskrybuje - N kart przeglądarki
+    nie oznacza N pętli odpytywania.
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._sources: Dict[str, Callable[[], Awaitable[Optional[Dict]]]] = {}
+        self._state: Dict[str, Dict] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.events_sent = 0
+        self.dropped_subscribers = 0
+
+    def add_source(self, name: str, collect: Callable[[], Awaitable[Optional[Dict]]]):
+        """Zarejestruj źródło zwracające słownik klucz -> wartość (None - stan jeszcze niedostępny)"""
+        self._sources[name] = collect
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        """Strumień zdarzeń SSE: najpierw pełny stan, potem różnice"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        self._ensure_running()
+
+        try:
+            if self._state:
+                yield self._format("snapshot", {"sources": self._state})
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    # Kolejka przepełniona - zakończ, klient połączy się ponownie
+                    return
+                yield message
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats(self) -> Dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "running": self._task is not None and not self._task.done(),
+            "sources": sorted(self._sources),
+            "events_sent": self.events_sent,
+            "dropped_subscribers": self.dropped_subscribers
+        }
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    # ===== Wewnętrzne =====
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._produce_loop())
+
+    async def _produce_loop(self):
+        """Zbieraj stan dopóki są subskrybenci"""
+        try:
+            while self._subscribers:
+                started = time.monotonic()
+                for name, collect in self._sources.items():
+                    try:
+                        current = await collect()
+                    except Exception as e:
+                        print(f"Event source {name} failed: {e}")
+                        continue
+                    if current is None:
+                        continue
+                    self._publish_diff(name, current)
+
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+        finally:
+            # Bez subskrybentów stan się zestarzeje - kolejny klient zacznie od świeżego
+            self._state = {}
+
+    def _publish_diff(self, source: str, current: Dict):
+        previous = self._state.get(source)
+        self._state[source] = current
+
+        if previous is None:
+            self._broadcast(self._format(source, {"changed": current, "removed": []}))
+            return
+
+        changed = {key: value for key, value in current.items() if previous.get(key) != value}
+        removed = [key for key in previous if key not in current]
+        if changed or removed:
+            self._broadcast(self._format(source, {"changed": changed, "removed": removed}))
+
+    def _broadcast(self, message: str):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._subscribers.discard(queue)
+                self.dropped_subscribers += 1
+                # Zwolnij miejsce na sygnał zakończenia
+                queue.get_nowait()
+                queue.put_nowait(None)
+        self.events_sent += 1
+
+    @staticmethod
+    def _format(event: str, data: Dict) -> str:
+        payload = {"type": event, "timestamp": time.time(), **data}
+        return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+# Singleton instance
+event_hub = EventHub()
@@ -5,8 +5,8 @@ import yaml
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 import threading
-import time
 from .port_manager import port_manager
+from .readiness import wait_for_endpoints_sync
 
 class HelmService:
     def __init__(self):
@@ -245,9 +245,10 @@ class HelmService:
         def run_port_forward():
             context = f"kind-{cluster_name}"
             
-            # Czekaj na gotowość podów
+            # Czekaj aż serwisy monitoringu będą miały gotowe pody (zamiast stałego opóźnienia)
             print(f"Waiting for monitoring pods in {cluster_name}...")
-            time.sleep(45)  # Daj więcej czasu na startup
+            if not wait_for_endpoints_sync(context, namespace, ["prometheus-server", "grafana"], timeout=300):
+                print(f"⚠️ Monitoring pods in {cluster_name} not ready after 300s, starting port-forward anyway")
             
             try:
                 # Uruchom Prometheus port-forward z dynamicznym portem
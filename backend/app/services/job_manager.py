@@ -0,0 +1,262 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+# Ile zakończonych zadań trzymać w pamięci
+MAX_FINISHED_JOBS = 200
+
+# Ile ostatnich linii logu trzymać per zadanie
+MAX_LOG_LINES = 500
+
+FINISHED_STATES = ("succeeded", "failed", "cancelled")
+
+
+class JobProgress:
+    """Raportowanie postępu z wnętrza pipeline'u - wersja bez zadania (no-op)"""
+
+    @asynccontextmanager
+    async def step(self, name: str):
+        yield
+
+    def log(self, message: str):
+        pass
+
+
+class Job(JobProgress):
+    """Zadanie w tle: kroki, logi i wynik"""
+
+    def __init__(self, job_type: str, params: Dict, runner: Callable[["Job"], Awaitable[Dict]]):
+        self.id = uuid.uuid4().hex[:12]
+        self.type = job_type
+        self.params = params
+        self.status = "queued"
+        self.steps: List[Dict] = []
+        self.logs: Deque[Dict] = deque(maxlen=MAX_LOG_LINES)
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._runner = runner
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[asyncio.Queue] = []
+
+    # ===== Raportowanie z pipeline'u =====
+
+    @asynccontextmanager
+    async def step(self, name: str):
+        """Oznacz krok jako trwający, a po wyjściu jako zakończony lub nieudany"""
+        step = {"name": name, "status": "running", "started_at": time.time(), "finished_at": None}
+        self.steps.append(step)
+        self._emit("step", step)
+        try:
+            yield
+        except BaseException as e:
+            step["status"] = "failed"
+            step["error"] = str(e) or e.__class__.__name__
+            raise
+        else:
+            step["status"] = "succeeded"
+        finally:
+            step["finished_at"] = time.time()
+            self._emit("step", step)
+
+    def log(self, message: str):
+        entry = {"timestamp": time.time(), "message": message}
+        self.logs.append(entry)
+        self._emit("log", entry)
+
+    # ===== Stan =====
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def summary(self) -> Dict:
+        current = next((s["name"] for s in reversed(self.steps) if s["status"] == "running"), None)
+        return {
+            "job_id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "current_step": current,
+            "steps_done": len([s for s in self.steps if s["status"] == "succeeded"]),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            **self.summary(),
+            "params": self.params,
+            "steps": self.steps,
+            "logs": list(self.logs),
+            "result": self.result
+        }
+
+    # ===== Strumień zdarzeń =====
+
+    async def events(self) -> AsyncIterator[str]:
+        """Zdarzenia SSE: aktualny stan, potem kroki i logi aż do zakończenia"""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._listeners.append(queue)
+        try:
+            yield self._format("state", self.to_dict())
+            while not self.finished:
+                try:
+                    message = await asyncio.wait_for(queue.get(), 15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield message
+            # Zdarzenia, które przyszły razem z zakończeniem
+            while not queue.empty():
+                yield queue.get_nowait()
+        finally:
+            self._listeners.remove(queue)
+
+    def _emit(self, event: str, data: Dict):
+        message = self._format(event, {"job_id": self.id, **data})
+        for queue in self._listeners:
+            queue.put_nowait(message)
+
+    @staticmethod
+    def _format(event: str, data: Dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class JobManager:
+    """
+    Kolejka długotrwałych operacji (np. tworzenie klastra) z ograniczoną pulą workerów.
+
+    Endpoint od razu zwraca job_id, a postęp można odpytywać lub strumieniować.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def submit(self, job_type: str, params: Dict, runner: Callable[[Job], Awaitable[Dict]]) -> Job:
+        """Dodaj zadanie do kolejki; runner dostaje Job do raportowania postępu"""
+        self._ensure_workers()
+        job = Job(job_type, params, runner)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        job.log(f"Zadanie {job_type} dodane do kolejki")
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list(self, status: Optional[str] = None) -> List[Dict]:
+        return [
+            job.summary() for job in reversed(self._jobs.values())
+            if status is None or job.status == status
+        ]
+
+    def cancel(self, job_id: str) -> bool:
+        """Anuluj zadanie oczekujące lub trwające"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        if job._task is not None:
+            job._task.cancel()
+        else:
+            self._finish(job, "cancelled", error="Anulowane przed uruchomieniem")
+        return True
+
+    def stats(self) -> Dict:
+        statuses: Dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "max_workers": self.max_workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": statuses
+        }
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._workers = []
+        self._queue = None
+
+    # ===== Wewnętrzne =====
+
+    def _ensure_workers(self):
+        if self._queue is None or not any(not w.done() for w in self._workers):
+            self._queue = asyncio.Queue()
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.max_workers)
+            ]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job.finished:
+                continue
+            task = asyncio.create_task(self._execute(job))
+            job._task = task
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.done():
+                    # Zatrzymywany worker - anuluj też zadanie
+                    task.cancel()
+                    raise
+            except Exception:
+                pass
+
+    async def _execute(self, job: Job):
+        job.status = "running"
+        job.started_at = time.time()
+        job._emit("status", {"status": job.status})
+        try:
+            result = await job._runner(job)
+        except asyncio.CancelledError:
+            self._finish(job, "cancelled", error="Zadanie anulowane")
+            return
+        except Exception as e:
+            job.log(f"Błąd: {e}")
+            self._finish(job, "failed", error=str(e))
+            return
+
+        # Pipeline'y zwracają słownik z kluczem "error" przy niepowodzeniu (jak endpointy)
+        if isinstance(result, dict) and result.get("error"):
+            self._finish(job, "failed", result=result, error=str(result["error"]))
+        else:
+            self._finish(job, "succeeded", result=result)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job._task = None
+        job._emit("status", {"status": status, "error": error, "result": result})
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+# Singleton instance
+job_manager = JobManager(max_workers=int(os.environ.get("CLUSTERMASTER_MAX_JOBS", "2")))
+
+# Dla wywołań synchronicznych (bez zadania) - postęp jest ignorowany
+no_progress = JobProgress()
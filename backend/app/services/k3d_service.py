@@ -1,6 +1,9 @@
 import subprocess
 import json
-from typing import Dict, List, Optional
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 
 
 class K3dService:
@@ -17,6 +20,30 @@ class K3dService:
         except FileNotFoundError:
             return False
     
+    def create_cluster_command(
+        self,
+        cluster_name: str,
+        agents: int = 2,
+        servers: int = 1,
+        ports: Dict = None
+    ) -> List[str]:
+        """Komenda `k3d cluster create` (do uruchomienia tutaj albo przez command_runner)"""
+        cmd = [
+            'k3d', 'cluster', 'create', cluster_name,
+            '--agents', str(agents),
+            '--servers', str(servers),
+            '--api-port', '127.0.0.1:6550',  # WAŻNE: 127.0.0.1 zamiast 0.0.0.0 dla Windows
+            '--wait'
+        ]
+        
+        # Add port mappings if provided
+        if ports:
+            if 'prometheus' in ports:
+                cmd.extend(['--port', f'{ports["prometheus"]}:{ports["prometheus"]}@loadbalancer'])
+            if 'grafana' in ports:
+                cmd.extend(['--port', f'{ports["grafana"]}:{ports["grafana"]}@loadbalancer'])
+        return cmd
+
     def create_cluster(
         self,
         cluster_name: str,
@@ -26,20 +53,7 @@ class K3dService:
     ) -> Dict:
 
         try:
-            cmd = [
-                'k3d', 'cluster', 'create', cluster_name,
-                '--agents', str(agents),
-                '--servers', str(servers),
-                '--api-port', '127.0.0.1:6550',  # WAŻNE: 127.0.0.1 zamiast 0.0.0.0 dla Windows
-                '--wait'
-            ]
-            
-            # Add port mappings if provided
-            if ports:
-                if 'prometheus' in ports:
-                    cmd.extend(['--port', f'{ports["prometheus"]}:{ports["prometheus"]}@loadbalancer'])
-                if 'grafana' in ports:
-                    cmd.extend(['--port', f'{ports["grafana"]}:{ports["grafana"]}@loadbalancer'])
+            cmd = self.create_cluster_command(cluster_name, agents, servers, ports)
             
             result = subprocess.run(
                 cmd,
@@ -237,52 +251,84 @@ class K3dService:
         except (subprocess.CalledProcessError, json.JSONDecodeError):
             return []
     
-    def scale_cluster(self, cluster_name: str, target_agents: int) -> Dict:
-
+    def list_agent_nodes(self, cluster_name: str) -> List[str]:
+        """Pełne nazwy agentów klastra (jedno wywołanie `k3d node list`)"""
+        try:
+            result = subprocess.run(
+                ['k3d', 'node', 'list', '-o', 'json'],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=30
+            )
+            
+            # Numerycznie (agent-10 po agent-9), żeby "ostatnie agenty" były najnowszymi
+            return sorted(
+                (n['name'] for n in json.loads(result.stdout)
+                 if n.get('role') == 'agent' and cluster_name in (
+                     n.get('cluster'), n.get('runtimeLabels', {}).get('k3d.cluster')
+                 )),
+                key=lambda name: (self._agent_index(name), name)
+            )
+            
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, json.JSONDecodeError):
+            return []
+    
+    def scale_cluster(self, cluster_name: str, target_agents: int, max_parallel: int = 4,
+                      on_progress: Optional[Callable[[Dict], None]] = None,
+                      nodes_to_remove: Optional[List[str]] = None) -> Dict:
+        """
+        Skaluj agentów równolegle (maks. `max_parallel` naraz).
+        Lista węzłów jest pobierana raz, nazwy nowych agentów wyliczane z góry,
+        a wynik każdego węzła raportowany przez `on_progress` i w `nodes`.
+        Przy zmniejszaniu usuwane są `nodes_to_remove` (z planera), a bez nich ostatnie agenty.
+        """
         try:
-            # Pobierz obecną liczbę agentów
-            nodes = self.list_nodes(cluster_name)
-            current_agents = sum(1 for n in nodes if 'agent' in n)
+            agents = self.list_agent_nodes(cluster_name)
+            current_agents = len(agents)
             
             operations = []
+            node_results = []
             
             if target_agents > current_agents:
-                # Dodaj agentów
-                agents_to_add = target_agents - current_agents
-                operations.append(f'Adding {agents_to_add} agent(s)...')
+                names = self._new_agent_names(cluster_name, agents, target_agents - current_agents)
+                operations.append(f'Adding {len(names)} agent(s), {min(max_parallel, len(names))} at a time...')
+                node_results = self._run_parallel(
+                    names, lambda name: self.add_agent(cluster_name, name), 'add', max_parallel, on_progress
+                )
                 
-                for i in range(agents_to_add):
-                    result = self.add_agent(cluster_name)
-                    if result['success']:
-                        operations.append(f"✅ Added {result['node_name']}")
-                    else:
-                        operations.append(f"❌ Failed to add agent: {result.get('error')}")
-                        
             elif target_agents < current_agents:
-                # Usuń agentów
-                agents_to_remove = current_agents - target_agents
-                operations.append(f'Removing {agents_to_remove} agent(s)...')
-                
-                # Usuń ostatnich N agentów
-                agent_nodes = [n for n in nodes if 'agent' in n]
-                for i in range(agents_to_remove):
-                    node_to_remove = agent_nodes[-(i+1)]
-                    # Extract simple name from full k3d name
-                    simple_name = node_to_remove.replace(f'k3d-{cluster_name}-', '')
-                    result = self.delete_node(cluster_name, simple_name)
-                    if result['success']:
-                        operations.append(f"✅ Removed {simple_name}")
-                    else:
-                        operations.append(f"❌ Failed to remove {simple_name}")
+                count = current_agents - target_agents
+                selected = [name for name in (nodes_to_remove or []) if name in agents][:count]
+                # Bez planu (lub gdy plan jest za krótki) usuń ostatnie agenty
+                to_remove = selected + [name for name in reversed(agents) if name not in selected][:count - len(selected)]
+                operations.append(f'Removing {len(to_remove)} agent(s), {min(max_parallel, len(to_remove))} at a time...')
+                node_results = self._run_parallel(
+                    to_remove, self._delete_agent, 'remove', max_parallel, on_progress
+                )
             else:
                 operations.append('No changes needed - cluster already at target size')
             
+            failed = [r for r in node_results if r['status'] != 'succeeded']
+            for r in node_results:
+                if r['status'] == 'succeeded':
+                    operations.append(f"✅ {'Added' if r['action'] == 'add' else 'Removed'} {r['node']} ({r['seconds']}s)")
+                else:
+                    operations.append(f"❌ Failed to {r['action']} {r['node']}: {r.get('error')}")
+            
+            if target_agents >= current_agents:
+                final_agents = current_agents + len(node_results) - len(failed)
+            else:
+                final_agents = current_agents - len(node_results) + len(failed)
+            
             return {
-                'success': True,
-                'message': f'Cluster scaled to {target_agents} agents',
+                'success': not failed,
+                'error': f'{len(failed)} of {len(node_results)} node operations failed' if failed else None,
+                'message': f'Cluster scaled to {final_agents} agents',
                 'operations': operations,
+                'nodes': node_results,
                 'previous_agents': current_agents,
-                'current_agents': target_agents
+                'current_agents': final_agents
             }
             
         except Exception as e:
@@ -291,6 +337,66 @@ class K3dService:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _agent_index(node_name: str) -> int:
+        """Numer agenta z nazwy k3d-<klaster>-agent-<n> (także z sufiksem -0 węzłów dodanych później)"""
+        match = re.search(r'-agent-(\d+)(?:-\d+)?$', node_name)
+        return int(match.group(1)) if match else -1
+
+    def _new_agent_names(self, cluster_name: str, existing: List[str], count: int) -> List[str]:
+        """Wolne nazwy agentów (k3d dodaje prefiks k3d- i sufiks -0)"""
+        names = []
+        index = 0
+        while len(names) < count:
+            name = f'{cluster_name}-agent-{index}'
+            if f'k3d-{name}' not in existing and f'k3d-{name}-0' not in existing:
+                names.append(name)
+            index += 1
+        return names
+    
+    def _delete_agent(self, full_node_name: str) -> Dict:
+        try:
+            subprocess.run(
+                ['k3d', 'node', 'delete', full_node_name],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=120
+            )
+            return {'success': True, 'node_name': full_node_name}
+        except subprocess.CalledProcessError as e:
+            return {'success': False, 'error': f'Failed to delete node: {e.stderr}'}
+        except subprocess.TimeoutExpired:
+            return {'success': False, 'error': f'Deleting node {full_node_name} timed out'}
+    
+    def _run_parallel(self, names: List[str], operation: Callable[[str], Dict], action: str,
+                      max_parallel: int, on_progress: Optional[Callable[[Dict], None]]) -> List[Dict]:
+        """Wykonaj operację dla każdego węzła w puli wątków; wyniki w kolejności `names`"""
+        def run_one(name: str) -> Dict:
+            started = time.monotonic()
+            if on_progress:
+                on_progress({'node': name, 'action': action, 'status': 'running'})
+            try:
+                result = operation(name)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            node_result = {
+                'node': result.get('node_name') or name,
+                'action': action,
+                'status': 'succeeded' if result.get('success') else 'failed',
+                'seconds': round(time.monotonic() - started, 1)
+            }
+            if not result.get('success'):
+                node_result['error'] = result.get('error')
+            if on_progress:
+                on_progress(node_result)
+            return node_result
+        
+        if not names:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(names)))) as executor:
+            return list(executor.map(run_one, names))
+    
     def start_cluster(self, cluster_name: str) -> Dict:
 
         try:
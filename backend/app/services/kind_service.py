@@ -0,0 +1,312 @@
+import subprocess
+import json
+import re
+from typing import Dict, List, Optional
+
+from .readiness import wait_until_sync
+
+# Labelki, którymi kind oznacza kontenery węzłów
+KIND_CLUSTER_LABEL = "io.x-k8s.kind.cluster"
+KIND_ROLE_LABEL = "io.x-k8s.kind.role"
+
+
+class KindService:
+    """
+    Skalowanie klastrów kind na żywo: dodawanie workerów (`docker run` obrazu
+    węzła + `kubeadm join`) i usuwanie nadmiarowych (drain, delete node, docker rm)
+    zamiast odtwarzania całego klastra.
+
+    `kind_name` to nazwa klastra w Dockerze/kind (inna dla klastrów z puli),
+    `cluster_name` - nazwa widoczna dla użytkownika (kontekst kind-<cluster_name>).
+    """
+
+    def list_node_containers(self, kind_name: str, role: Optional[str] = None) -> List[str]:
+        """Kontenery węzłów klastra (opcjonalnie tylko z daną rolą)"""
+        cmd = ['docker', 'ps', '-a', '--filter', f'label={KIND_CLUSTER_LABEL}={kind_name}']
+        if role:
+            cmd.extend(['--filter', f'label={KIND_ROLE_LABEL}={role}'])
+        cmd.extend(['--format', '{{.Names}}'])
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=15)
+            return sorted(name for name in result.stdout.split() if name)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+            return []
+
+    def add_worker(self, cluster_name: str, kind_name: Optional[str] = None,
+                   cpus: Optional[float] = None, memory_mb: Optional[int] = None,
+                   timeout: int = 180) -> Dict:
+        """Dodaj workera: nowy kontener z obrazem węzła dołączony przez `kubeadm join`"""
+        kind_name = kind_name or cluster_name
+        node_name = None
+
+        try:
+            control_plane = self._control_plane_container(kind_name)
+            if not control_plane:
+                return {'success': False, 'error': f'Control-plane container of {kind_name} not found'}
+
+            inspect = json.loads(subprocess.run(
+                ['docker', 'inspect', control_plane],
+                capture_output=True, text=True, check=True, timeout=15
+            ).stdout)[0]
+            image = inspect['Config']['Image']
+            network = next(iter(inspect['NetworkSettings']['Networks']), 'kind')
+
+            node_name = self._next_worker_name(kind_name)
+
+            # Te same opcje, z którymi kind uruchamia węzły
+            cmd = [
+                'docker', 'run', '-d',
+                '--name', node_name, '--hostname', node_name,
+                '--label', f'{KIND_CLUSTER_LABEL}={kind_name}',
+                '--label', f'{KIND_ROLE_LABEL}=worker',
+                '--privileged',
+                '--security-opt', 'seccomp=unconfined',
+                '--security-opt', 'apparmor=unconfined',
+                '--tmpfs', '/tmp', '--tmpfs', '/run',
+                '--volume', '/var',
+                '--volume', '/lib/modules:/lib/modules:ro',
+                '--cgroupns=private',
+                '-e', 'container=docker',
+                '--network', network,
+                '--restart', 'on-failure:1'
+            ]
+            if cpus:
+                cmd.extend(['--cpus', str(cpus)])
+            if memory_mb:
+                cmd.extend(['--memory', f'{int(memory_mb)}m', '--memory-swap', f'{int(memory_mb)}m'])
+            cmd.append(image)
+
+            subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=60)
+
+            if not self._wait_for_systemd(node_name, timeout=60):
+                raise RuntimeError(f'Node container {node_name} did not finish booting')
+
+            join_command = subprocess.run(
+                ['docker', 'exec', control_plane, 'kubeadm', 'token', 'create', '--print-join-command'],
+                capture_output=True, text=True, check=True, timeout=60
+            ).stdout.split()
+
+            subprocess.run(
+                ['docker', 'exec', node_name] + join_command + ['--ignore-preflight-errors=all'],
+                capture_output=True, text=True, check=True, timeout=timeout
+            )
+
+            return {
+                'success': True,
+                'message': f'Worker {node_name} joined cluster {cluster_name}',
+                'node_name': node_name
+            }
+
+        except subprocess.CalledProcessError as e:
+            self._remove_container(node_name)
+            return {'success': False, 'error': f'Failed to add worker: {e.stderr or e}', 'node_name': node_name}
+        except Exception as e:
+            self._remove_container(node_name)
+            return {'success': False, 'error': f'Failed to add worker: {e}', 'node_name': node_name}
+
+    def remove_worker(self, cluster_name: str, node_name: str, drain_timeout: int = 120,
+                      drain: bool = True) -> Dict:
+        """Usuń workera: drain (chyba że już opróżniony), usunięcie węzła z API i kontenera"""
+        context = f'kind-{cluster_name}'
+        operations = []
+
+        if drain:
+            result = subprocess.run(
+                ['kubectl', 'drain', node_name, '--context', context,
+                 '--ignore-daemonsets', '--delete-emptydir-data', '--force',
+                 f'--timeout={drain_timeout}s'],
+                capture_output=True, text=True, timeout=drain_timeout + 30
+            )
+            if result.returncode != 0:
+                # Węzeł i tak zostanie usunięty - pody zostaną odtworzone na pozostałych węzłach
+                operations.append(f'⚠️ Drain of {node_name} incomplete: {result.stderr.strip()[-200:]}')
+
+        try:
+            result = subprocess.run(
+                ['kubectl', 'delete', 'node', node_name, '--context', context, '--ignore-not-found'],
+                capture_output=True, text=True, timeout=60
+            )
+            if result.returncode != 0:
+                # Kontener i tak jest usuwany - w API zostanie węzeł NotReady do ręcznego usunięcia
+                operations.append(f'⚠️ Could not delete node {node_name} from the API: {result.stderr.strip()[-200:]}')
+        except subprocess.TimeoutExpired:
+            operations.append(f'⚠️ Deleting node {node_name} from the API timed out')
+
+        try:
+            subprocess.run(['docker', 'rm', '-f', node_name], capture_output=True, text=True, check=True, timeout=60)
+        except subprocess.CalledProcessError as e:
+            return {'success': False, 'error': f'Failed to remove container: {e.stderr}', 'operations': operations}
+        except subprocess.TimeoutExpired:
+            return {'success': False, 'error': f'Removing container {node_name} timed out', 'operations': operations}
+
+        return {
+            'success': True,
+            'message': f'Worker {node_name} removed from cluster {cluster_name}',
+            'operations': operations
+        }
+
+    def update_resources(self, kind_name: str, cpus: Optional[float] = None,
+                         memory_mb: Optional[int] = None) -> Dict:
+        """
+        Ustaw limity CPU/RAM workerów (`docker update`, bez restartu). None zostawia
+        limit bez zmian, 0 go zdejmuje. Control-plane zostaje bez limitów, a kontenery,
+        które już mają żądane limity, są pomijane.
+        """
+        if cpus is None and memory_mb is None:
+            return {'success': True, 'updated': [], 'unchanged': [], 'failed': {}}
+
+        nano_cpus = int(float(cpus) * 1e9) if cpus is not None else None
+        memory_bytes = int(memory_mb) * 1024 * 1024 if memory_mb is not None else None
+
+        updated, unchanged, failed = [], [], {}
+        for container, host_config in self._host_configs(self.list_node_containers(kind_name, role='worker')).items():
+            args = []
+            if nano_cpus is not None and host_config.get('NanoCpus') != nano_cpus:
+                args.extend(['--cpus', str(cpus)])
+            if memory_bytes is not None and host_config.get('Memory') != memory_bytes:
+                if memory_bytes:
+                    args.extend(['--memory', f'{int(memory_mb)}m', '--memory-swap', f'{int(memory_mb)}m'])
+                else:
+                    # Bez limitu pamięci swap też musi być nieograniczony
+                    args.extend(['--memory', '0', '--memory-swap', '-1'])
+            if not args:
+                unchanged.append(container)
+                continue
+
+            try:
+                result = subprocess.run(['docker', 'update'] + args + [container],
+                                        capture_output=True, text=True, timeout=30)
+            except subprocess.TimeoutExpired:
+                failed[container] = 'docker update timed out'
+                continue
+            if result.returncode == 0:
+                updated.append(container)
+            else:
+                failed[container] = result.stderr.strip()
+
+        return {'success': not failed, 'updated': updated, 'unchanged': unchanged, 'failed': failed}
+
+    def scale_workers(self, cluster_name: str, target_workers: int, kind_name: Optional[str] = None,
+                      cpus: Optional[float] = None, memory_mb: Optional[int] = None,
+                      nodes_to_remove: Optional[List[str]] = None) -> Dict:
+        """
+        Doprowadź liczbę workerów do `target_workers` - zmiana tylko o różnicę węzłów.
+        `nodes_to_remove` to węzły wybrane i już opróżnione przez planer (bez ponownego drain).
+        """
+        kind_name = kind_name or cluster_name
+
+        try:
+            workers = self.list_node_containers(kind_name, role='worker')
+            current_workers = len(workers)
+            operations = []
+            errors = []
+
+            if target_workers > current_workers:
+                operations.append(f'Adding {target_workers - current_workers} worker(s)...')
+                for _ in range(target_workers - current_workers):
+                    result = self.add_worker(cluster_name, kind_name, cpus=cpus, memory_mb=memory_mb)
+                    if result['success']:
+                        operations.append(f"✅ Added {result['node_name']}")
+                    else:
+                        operations.append(f"❌ Failed to add worker: {result.get('error')}")
+                        errors.append(result.get('error'))
+                        break
+
+            elif target_workers < current_workers:
+                operations.append(f'Removing {current_workers - target_workers} worker(s)...')
+                count = current_workers - target_workers
+                selected = [name for name in (nodes_to_remove or []) if name in workers][:count]
+                # Bez planu usuń najnowsze węzły (najwyższe numery)
+                newest = [name for name in sorted(workers, key=self._worker_index, reverse=True) if name not in selected]
+                for node_name in selected + newest[:count - len(selected)]:
+                    result = self.remove_worker(cluster_name, node_name, drain=node_name not in selected)
+                    operations.extend(result.get('operations', []))
+                    if result['success']:
+                        operations.append(f"✅ Removed {node_name}")
+                    else:
+                        operations.append(f"❌ Failed to remove {node_name}: {result.get('error')}")
+                        errors.append(result.get('error'))
+            else:
+                operations.append('No changes needed - cluster already at target size')
+
+            resources = self.update_resources(kind_name, cpus=cpus, memory_mb=memory_mb)
+            if resources['updated']:
+                operations.append(f"⚙️ Updated CPU/RAM limits of {len(resources['updated'])} node(s)")
+            for container, error in resources['failed'].items():
+                operations.append(f"⚠️ Could not update limits of {container}: {error}")
+
+            return {
+                'success': not errors,
+                'error': errors[0] if errors else None,
+                'message': f'Cluster scaled to {target_workers} workers',
+                'operations': operations,
+                'previous_workers': current_workers,
+                'current_workers': len(self.list_node_containers(kind_name, role='worker'))
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    # ===== Wewnętrzne =====
+
+    @staticmethod
+    def _host_configs(containers: List[str]) -> Dict[str, Dict]:
+        """HostConfig kontenerów (jedno `docker inspect` dla wszystkich)"""
+        if not containers:
+            return {}
+        try:
+            result = subprocess.run(['docker', 'inspect'] + containers,
+                                    capture_output=True, text=True, check=True, timeout=30)
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
+            # Bez bieżących wartości - zaktualizuj wszystkie
+            return {container: {} for container in containers}
+        return {
+            info['Name'].lstrip('/'): info.get('HostConfig', {})
+            for info in json.loads(result.stdout)
+        }
+
+    def _control_plane_container(self, kind_name: str) -> Optional[str]:
+        containers = self.list_node_containers(kind_name, role='control-plane')
+        return containers[0] if containers else None
+
+    def _next_worker_name(self, kind_name: str) -> str:
+        """Kolejna wolna nazwa w konwencji kind: <klaster>-worker, -worker2, -worker3..."""
+        existing = set(self.list_node_containers(kind_name))
+        index = 1
+        while True:
+            name = f'{kind_name}-worker' if index == 1 else f'{kind_name}-worker{index}'
+            if name not in existing:
+                return name
+            index += 1
+
+    @staticmethod
+    def _worker_index(container_name: str) -> int:
+        match = re.search(r'-worker(\d*)$', container_name)
+        if not match:
+            return 0
+        return int(match.group(1) or 1)
+
+    def _wait_for_systemd(self, node_name: str, timeout: int) -> bool:
+        """Poczekaj, aż systemd w kontenerze węzła wystartuje (containerd i kubelet gotowe do join)"""
+        def booted():
+            result = subprocess.run(
+                ['docker', 'exec', node_name, 'systemctl', 'is-system-running'],
+                capture_output=True, text=True, timeout=10
+            )
+            return result.stdout.strip() in ('running', 'degraded')
+        return wait_until_sync(booted, timeout)
+
+    def _remove_container(self, node_name: Optional[str]):
+        if node_name:
+            try:
+                subprocess.run(['docker', 'rm', '-f', node_name], capture_output=True, text=True, timeout=60)
+            except subprocess.TimeoutExpired:
+                pass
+
+
+# Singleton instance
+kind_service = KindService()
@@ -0,0 +1,396 @@
+import asyncio
+import base64
+import json
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import yaml
+
+from .command_runner import command_runner
+
+
+class KubeConfigError(Exception):
+    """Kontekstu nie da się obsłużyć bezpośrednio (brak kubeconfig, auth przez exec itp.)"""
+
+
+class KubeApiError(Exception):
+    """Błąd odpowiedzi API serwera Kubernetes"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.status_code = status_code
+
+
+def default_kubeconfig_path() -> Path:
+    """Ścieżka kubeconfig tak jak w kubectl (pierwszy wpis z KUBECONFIG lub ~/.kube/config)"""
+    env_path = os.environ.get("KUBECONFIG")
+    if env_path:
+        return Path(env_path.split(os.pathsep)[0]).expanduser()
+    return Path.home() / ".kube" / "config"
+
+
+class KubeClient:
+    """
+    Klient API serwera dla jednego kontekstu kubeconfig.
+
+    Połączenia (TLS + keep-alive) są utrzymywane w puli httpx,
+    więc kolejne zapytania nie płacą za start kubectl i handshake.
+    """
+
+    def __init__(self, context: str, server: str, verify: Any,
+                 headers: Optional[Dict[str, str]] = None):
+        self.context = context
+        self.server = server.rstrip("/")
+        self._verify = verify
+        self._headers = headers or {}
+        self._limits = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+        # Połączenia są związane z pętlą zdarzeń, w której powstały - osobny klient na pętlę
+        self._async_clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._sync_client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+        # Zapytania w toku - wycofany klient zamyka połączenia dopiero po ostatnim z nich
+        self._busy_sync = 0
+        self._busy_async = 0
+        self._retired = False
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # Połączenia klientów zamkniętych pętli zginęły razem z nimi
+            for closed_loop in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed_loop]
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    base_url=self.server, verify=self._verify, headers=self._headers,
+                    limits=self._limits, timeout=10
+                )
+                self._async_clients[loop] = client
+            return client
+
+    @property
+    def sync_client(self) -> httpx.Client:
+        with self._lock:
+            if self._sync_client is None:
+                self._sync_client = httpx.Client(
+                    base_url=self.server, verify=self._verify, headers=self._headers,
+                    limits=self._limits, timeout=10
+                )
+            return self._sync_client
+
+    @contextmanager
+    def _sync_call(self):
+        with self._lock:
+            self._busy_sync += 1
+        try:
+            yield self.sync_client
+        finally:
+            with self._lock:
+                self._busy_sync -= 1
+                idle = self._retired and self._busy_sync == 0
+            if idle:
+                self.close_sync()
+
+    @asynccontextmanager
+    async def _async_call(self):
+        with self._lock:
+            self._busy_async += 1
+        try:
+            yield self.async_client
+        finally:
+            with self._lock:
+                self._busy_async -= 1
+                idle = self._retired and self._busy_async == 0
+            if idle:
+                self._close_async_clients()
+
+    async def get_json(self, path: str, params: Optional[Dict] = None, timeout: float = 10) -> Dict:
+        async with self._async_call() as client:
+            response = await client.get(path, params=params, timeout=timeout)
+        return self._decode(response)
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, **kwargs):
+        """Odpowiedź strumieniowa (watch) liczona jako zapytanie w toku"""
+        async with self._async_call() as client:
+            async with client.stream(method, path, **kwargs) as response:
+                yield response
+
+    def get_json_sync(self, path: str, params: Optional[Dict] = None, timeout: float = 30) -> Dict:
+        with self._sync_call() as client:
+            response = client.get(path, params=params, timeout=timeout)
+        return self._decode(response)
+
+    def apply_sync(self, path: str, manifest: Dict, field_manager: str, timeout: float = 30) -> Dict:
+        """Server-side apply obiektu (PATCH application/apply-patch+yaml; JSON jest poprawnym YAML)"""
+        with self._sync_call() as client:
+            response = client.patch(
+                path, content=json.dumps(manifest),
+                params={"fieldManager": field_manager, "force": "true"},
+                headers={"Content-Type": "application/apply-patch+yaml"},
+                timeout=timeout
+            )
+        return self._decode(response)
+
+    async def list_nodes(self) -> Dict:
+        return await self.get_json("/api/v1/nodes")
+
+    async def list_pods(self, namespace: Optional[str] = None, label_selector: Optional[str] = None) -> Dict:
+        path = f"/api/v1/namespaces/{namespace}/pods" if namespace else "/api/v1/pods"
+        params = {"labelSelector": label_selector} if label_selector else None
+        return await self.get_json(path, params)
+
+    async def list_services(self, namespace: str) -> Dict:
+        return await self.get_json(f"/api/v1/namespaces/{namespace}/services")
+
+    def retire(self):
+        """
+        Wycofaj klienta (kubeconfig się zmienił): nowe zapytania idą do nowego klienta,
+        a połączenia tego są zamykane, gdy skończą się zapytania w toku.
+        """
+        with self._lock:
+            self._retired = True
+            sync_idle = self._busy_sync == 0
+            async_idle = self._busy_async == 0
+        if sync_idle:
+            self.close_sync()
+        if async_idle:
+            self._close_async_clients()
+
+    async def aclose(self):
+        with self._lock:
+            clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        current = asyncio.get_running_loop()
+        for loop, client in clients:
+            if loop is current:
+                await client.aclose()
+            else:
+                self._schedule_aclose(loop, client)
+        self.close_sync()
+
+    def close_sync(self):
+        with self._lock:
+            if self._sync_client is not None:
+                self._sync_client.close()
+                self._sync_client = None
+
+    def _close_async_clients(self):
+        with self._lock:
+            clients = list(self._async_clients.items())
+            self._async_clients.clear()
+        for loop, client in clients:
+            self._schedule_aclose(loop, client)
+
+    @staticmethod
+    def _schedule_aclose(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+        """Zamknij klienta asynchronicznego w pętli, do której należy"""
+        if loop.is_closed():
+            return
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is loop:
+            loop.create_task(client.aclose())
+        else:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    @staticmethod
+    def _decode(response: httpx.Response) -> Dict:
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.text)
+            except ValueError:
+                message = response.text
+            raise KubeApiError(response.status_code, message)
+        return response.json()
+
+
+class KubeClientPool:
+    """Pula klientów API - jeden na kontekst, przeładowywana gdy zmieni się kubeconfig"""
+
+    def __init__(self, kubeconfig_path: Optional[Path] = None):
+        self._kubeconfig_path = kubeconfig_path
+        self._clients: Dict[str, KubeClient] = {}
+        self._config_mtime: Optional[float] = None
+        self._config: Dict = {}
+        self._lock = threading.Lock()
+
+    @property
+    def kubeconfig_path(self) -> Path:
+        return self._kubeconfig_path or default_kubeconfig_path()
+
+    def get(self, context: str) -> KubeClient:
+        """Zwróć klienta dla kontekstu (rzuca KubeConfigError, jeśli się nie da)"""
+        with self._lock:
+            self._reload_if_changed()
+            client = self._clients.get(context)
+            if client is None:
+                client = self._build_client(context)
+                self._clients[context] = client
+            return client
+
+    def invalidate(self, context: str):
+        """Zapomnij klienta (np. po usunięciu lub odtworzeniu klastra)"""
+        with self._lock:
+            client = self._clients.pop(context, None)
+        if client is not None:
+            client.retire()
+
+    async def aclose_all(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    def _reload_if_changed(self):
+        path = self.kubeconfig_path
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            raise KubeConfigError(f"Brak pliku kubeconfig: {path}")
+
+        if mtime != self._config_mtime:
+            with open(path, "r", encoding="utf-8") as f:
+                self._config = yaml.safe_load(f) or {}
+            self._config_mtime = mtime
+            # Certyfikaty/porty mogły się zmienić (np. klaster odtworzony pod tą samą nazwą);
+            # zapytania w toku w innych wątkach kończą się na starym kliencie
+            for client in self._clients.values():
+                client.retire()
+            self._clients.clear()
+
+    def _build_client(self, context: str) -> KubeClient:
+        contexts = {c["name"]: c.get("context", {}) for c in self._config.get("contexts") or []}
+        clusters = {c["name"]: c.get("cluster", {}) for c in self._config.get("clusters") or []}
+        users = {u["name"]: u.get("user", {}) for u in self._config.get("users") or []}
+
+        if context not in contexts:
+            raise KubeConfigError(f"Kontekst {context} nie istnieje w kubeconfig")
+
+        cluster = clusters.get(contexts[context].get("cluster"), {})
+        user = users.get(contexts[context].get("user"), {}) or {}
+        server = cluster.get("server")
+        if not server:
+            raise KubeConfigError(f"Kontekst {context} nie ma adresu serwera")
+        if "exec" in user or "auth-provider" in user:
+            raise KubeConfigError(f"Kontekst {context} używa zewnętrznego dostawcy uwierzytelniania")
+
+        # Weryfikacja certyfikatu serwera
+        if cluster.get("insecure-skip-tls-verify"):
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+        elif cluster.get("certificate-authority-data"):
+            ca_pem = base64.b64decode(cluster["certificate-authority-data"]).decode("utf-8")
+            ssl_context = ssl.create_default_context(cadata=ca_pem)
+        elif cluster.get("certificate-authority"):
+            ssl_context = ssl.create_default_context(cafile=cluster["certificate-authority"])
+        else:
+            ssl_context = ssl.create_default_context()
+
+        # Certyfikat klienta (kind i k3d używają client-certificate-data)
+        cert_data = user.get("client-certificate-data")
+        key_data = user.get("client-key-data")
+        if cert_data and key_data:
+            self._load_cert_chain_from_data(ssl_context, cert_data, key_data)
+        elif user.get("client-certificate") and user.get("client-key"):
+            ssl_context.load_cert_chain(user["client-certificate"], user["client-key"])
+
+        headers = {"Accept": "application/json"}
+        if user.get("token"):
+            headers["Authorization"] = f"Bearer {user['token']}"
+        elif user.get("username") and user.get("password"):
+            credentials = base64.b64encode(f"{user['username']}:{user['password']}".encode()).decode()
+            headers["Authorization"] = f"Basic {credentials}"
+
+        return KubeClient(context, server, ssl_context, headers=headers)
+
+    @staticmethod
+    def _load_cert_chain_from_data(ssl_context: ssl.SSLContext, cert_data: str, key_data: str):
+        """ssl wymaga plików - zapisz je tymczasowo tylko na czas wczytania"""
+        paths = []
+        try:
+            for data in (cert_data, key_data):
+                fd, path = tempfile.mkstemp(suffix=".pem")
+                paths.append(path)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(base64.b64decode(data))
+            ssl_context.load_cert_chain(paths[0], paths[1])
+        finally:
+            for path in paths:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+
+# Singleton instance
+kube_clients = KubeClientPool()
+
+
+def _output_args(kubectl_args: List[str]) -> List[str]:
+    # `kubectl get --raw` zwraca JSON sam z siebie i nie przyjmuje -o
+    return [] if "--raw" in kubectl_args else ["-o", "json"]
+
+
+async def kube_get_json(context: str, api_path: Optional[str], kubectl_args: List[str],
+                        params: Optional[Dict] = None, timeout: float = 10) -> Optional[Dict]:
+    """
+    Pobierz obiekt/listę z API serwera przez pulę połączeń.
+    Gdy bezpośrednie połączenie nie jest możliwe (lub api_path=None), użyj `kubectl ... -o json`.
+    Zwraca None, jeśli zasobu nie da się pobrać.
+    """
+    if api_path:
+        try:
+            return await kube_clients.get(context).get_json(api_path, params, timeout=timeout)
+        except KubeApiError:
+            return None
+        except (KubeConfigError, httpx.HTTPError, ssl.SSLError, OSError, ValueError):
+            pass
+
+    result = await command_runner.run(
+        ["kubectl"] + kubectl_args + ["--context", context] + _output_args(kubectl_args), timeout=timeout
+    )
+    if result["returncode"] != 0:
+        return None
+    try:
+        return json.loads(result["stdout"])
+    except json.JSONDecodeError:
+        return None
+
+
+def kube_get_json_sync(context: str, api_path: Optional[str], kubectl_args: List[str],
+                       params: Optional[Dict] = None, timeout: float = 60) -> Optional[Dict]:
+    """Synchroniczna wersja kube_get_json (dla serwisów działających w wątkach)"""
+    if api_path:
+        try:
+            return kube_clients.get(context).get_json_sync(api_path, params, timeout=timeout)
+        except KubeApiError:
+            return None
+        except (KubeConfigError, httpx.HTTPError, ssl.SSLError, OSError, ValueError):
+            pass
+
+    try:
+        result = subprocess.run(
+            ["kubectl"] + kubectl_args + ["--context", context] + _output_args(kubectl_args),
+            capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=timeout
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    if result.returncode != 0:
+        return None
+    try:
+        return json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return None
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from .kube_client import KubeApiError, KubeConfigError, kube_clients, kube_get_json
+
+# Namespace, którego pody i serwisy trzymamy w pamięci
+MONITORING_NAMESPACE = "monitoring"
+
+# Po tylu sekundach bez odczytu informer przestaje obserwować klaster
+INFORMER_IDLE_TIMEOUT = 600
+
+# Po błędzie konfiguracji (np. auth przez exec) nie próbuj ponownie przez tyle sekund
+CONFIG_RETRY_AFTER = 60
+
+# Serwer zamyka watch po tym czasie - wtedy wznawiamy od ostatniego resourceVersion
+WATCH_TIMEOUT_SECONDS = 120
+
+
+class ResourceInformer:
+    """
+    Kopia jednej listy zasobów w pamięci: jeden list, potem długotrwały watch.
+
+    Watch jest wznawiany od ostatniego resourceVersion; gdy serwer
+    odpowie 410 Gone (wersja wygasła), lista jest pobierana od nowa.
+    """
+
+    def __init__(self, context: str, path: str):
+        self.context = context
+        self.path = path
+        self._objects: Dict[str, Dict] = {}
+        self._resource_version: Optional[str] = None
+        self._synced = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._unavailable_until = 0.0
+        self.last_sync: Optional[float] = None
+        self.events = 0
+        self.relists = 0
+
+    @property
+    def synced(self) -> bool:
+        return self._synced.is_set()
+
+    def items(self) -> Optional[List[Dict]]:
+        """Aktualne obiekty lub None, jeśli pierwsza lista jeszcze nie dotarła"""
+        if not self._synced.is_set():
+            return None
+        return list(self._objects.values())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, is_idle):
+        if self.running or time.monotonic() < self._unavailable_until:
+            return
+        self._task = asyncio.create_task(self._run(is_idle))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def wait_synced(self, timeout: float) -> bool:
+        """Czekaj na pierwszą listę (krócej, jeśli informer zakończy się wcześniej)"""
+        if self._synced.is_set() or not self.running:
+            return self._synced.is_set()
+        waiter = asyncio.create_task(self._synced.wait())
+        try:
+            await asyncio.wait({waiter, self._task}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        return self._synced.is_set()
+
+    async def _run(self, is_idle):
+        """Pętla list + watch; kończy się, gdy nikt nie czyta (is_idle)"""
+        backoff = 1
+        try:
+            while not is_idle():
+                try:
+                    if self._resource_version is None:
+                        await self._list()
+                    await self._watch()
+                    backoff = 1
+                except KubeConfigError:
+                    # Kontekst nie nadaje się do bezpośredniego połączenia - odczyty użyją kubectl
+                    self._unavailable_until = time.monotonic() + CONFIG_RETRY_AFTER
+                    return
+                except KubeApiError as e:
+                    if e.status_code == 410:
+                        self._resource_version = None
+                        continue
+                    await self._fail(backoff)
+                    backoff = min(backoff * 2, 30)
+                except (httpx.HTTPError, OSError, ValueError):
+                    await self._fail(backoff)
+                    backoff = min(backoff * 2, 30)
+        finally:
+            # Nieobserwowana kopia szybko się starzeje - następny start zaczyna od listy
+            self._synced.clear()
+            self._resource_version = None
+
+    async def _list(self):
+        data = await kube_clients.get(self.context).get_json(self.path, timeout=30)
+        self._objects = {self._key(item): item for item in data.get("items", [])}
+        self._resource_version = data.get("metadata", {}).get("resourceVersion")
+        self.last_sync = time.time()
+        self.relists += 1
+        self._synced.set()
+
+    async def _watch(self):
+        client = kube_clients.get(self.context)
+        params = {
+            "watch": "1",
+            "allowWatchBookmarks": "true",
+            "timeoutSeconds": str(WATCH_TIMEOUT_SECONDS),
+            "resourceVersion": self._resource_version or ""
+        }
+        timeout = httpx.Timeout(10, read=WATCH_TIMEOUT_SECONDS + 30)
+
+        async with client.stream("GET", self.path, params=params, timeout=timeout) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                raise KubeApiError(response.status_code, response.text)
+
+            async for line in response.aiter_lines():
+                if line.strip():
+                    self._apply(json.loads(line))
+
+    def _apply(self, event: Dict):
+        event_type = event.get("type")
+        obj = event.get("object", {})
+
+        if event_type == "ERROR":
+            # Status z kodem 410 oznacza, że resourceVersion jest już za stary
+            raise KubeApiError(obj.get("code", 500), obj.get("message", "watch error"))
+
+        resource_version = obj.get("metadata", {}).get("resourceVersion")
+        if resource_version:
+            self._resource_version = resource_version
+        if event_type == "BOOKMARK":
+            return
+
+        self.events += 1
+        if event_type == "DELETED":
+            self._objects.pop(self._key(obj), None)
+        elif event_type in ("ADDED", "MODIFIED"):
+            self._objects[self._key(obj)] = obj
+
+    async def _fail(self, backoff: float):
+        # Bez działającego watcha dane mogą być nieaktualne - wróć do odczytów wprost
+        self._synced.clear()
+        self._resource_version = None
+        await asyncio.sleep(backoff)
+
+    @staticmethod
+    def _key(obj: Dict) -> str:
+        metadata = obj.get("metadata", {})
+        return f"{metadata.get('namespace', '')}/{metadata.get('name', '')}"
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "synced": self.synced,
+            "objects": len(self._objects),
+            "resource_version": self._resource_version,
+            "last_sync": self.last_sync,
+            "events": self.events,
+            "relists": self.relists
+        }
+
+
+class ClusterInformer:
+    """
+    Węzły oraz pody i serwisy monitoringu jednego klastra (kontekstu).
+    Indeks wszystkich podów jest uruchamiany dopiero przy pierwszym odczycie.
+    """
+
+    def __init__(self, context: str):
+        self.context = context
+        self.nodes = ResourceInformer(context, "/api/v1/nodes")
+        self.monitoring_pods = ResourceInformer(context, f"/api/v1/namespaces/{MONITORING_NAMESPACE}/pods")
+        self.monitoring_services = ResourceInformer(context, f"/api/v1/namespaces/{MONITORING_NAMESPACE}/services")
+        self.pods = ResourceInformer(context, "/api/v1/pods")
+        self.last_access = time.monotonic()
+        self.loop = asyncio.get_running_loop()
+
+    @property
+    def resources(self) -> List[ResourceInformer]:
+        return [self.nodes, self.monitoring_pods, self.monitoring_services, self.pods]
+
+    @property
+    def running(self) -> bool:
+        return any(resource.running for resource in self.resources)
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+    def start(self):
+        for resource in (self.nodes, self.monitoring_pods, self.monitoring_services):
+            resource.start(self._is_idle)
+
+    def start_pods(self):
+        self.pods.start(self._is_idle)
+
+    async def stop(self):
+        for resource in self.resources:
+            await resource.stop()
+
+    def _is_idle(self) -> bool:
+        return time.monotonic() - self.last_access > INFORMER_IDLE_TIMEOUT
+
+    def stats(self) -> Dict:
+        return {
+            "context": self.context,
+            "running": self.running,
+            "nodes": self.nodes.stats(),
+            "monitoring_pods": self.monitoring_pods.stats(),
+            "monitoring_services": self.monitoring_services.stats(),
+            "pods": self.pods.stats()
+        }
+
+
+class KubeInformerRegistry:
+    """Informery uruchamiane leniwie przy pierwszym odczycie danego kontekstu"""
+
+    def __init__(self):
+        self._informers: Dict[str, ClusterInformer] = {}
+
+    def get(self, context: str) -> ClusterInformer:
+        """Zwróć (i w razie potrzeby uruchom) informer kontekstu"""
+        informer = self._informers.get(context)
+        if informer is None or informer.loop is not asyncio.get_running_loop():
+            informer = ClusterInformer(context)
+            self._informers[context] = informer
+        informer.touch()
+        informer.start()
+        return informer
+
+    async def nodes(self, context: str, wait: float = 1, timeout: float = 10) -> Optional[List[Dict]]:
+        """
+        Węzły klastra z pamięci; dopóki informer nie ma danych - pobrane wprost.
+        Zwraca None, jeśli klaster jest niedostępny.
+        """
+        return await self._items(
+            self.get(context).nodes, wait, ["get", "nodes"], timeout
+        )
+
+    async def monitoring_pods(self, context: str, wait: float = 1, timeout: float = 10) -> Optional[List[Dict]]:
+        """Pody z namespace monitoring (jak nodes())"""
+        return await self._items(
+            self.get(context).monitoring_pods, wait,
+            ["get", "pods", "--namespace", MONITORING_NAMESPACE], timeout
+        )
+
+    async def monitoring_services(self, context: str, wait: float = 1, timeout: float = 10) -> Optional[List[Dict]]:
+        """Serwisy z namespace monitoring (jak nodes())"""
+        return await self._items(
+            self.get(context).monitoring_services, wait,
+            ["get", "svc", "--namespace", MONITORING_NAMESPACE], timeout
+        )
+
+    async def pods(self, context: str, wait: float = 1, timeout: float = 10) -> Optional[List[Dict]]:
+        """Pody ze wszystkich namespace'ów (jak nodes(); informer startuje przy pierwszym odczycie)"""
+        informer = self.get(context)
+        informer.start_pods()
+        return await self._items(
+            informer.pods, wait, ["get", "pods", "--all-namespaces"], timeout
+        )
+
+    def discard(self, context: str):
+        """Zatrzymaj informer bez czekania (do wywołań z kodu synchronicznego)"""
+        informer = self._informers.pop(context, None)
+        if informer is not None:
+            for resource in informer.resources:
+                if resource.running:
+                    resource._task.cancel()
+
+    async def remove(self, context: str):
+        """Zatrzymaj informer (np. po usunięciu klastra)"""
+        informer = self._informers.pop(context, None)
+        if informer is not None:
+            await informer.stop()
+
+    async def stop_all(self):
+        for context in list(self._informers):
+            await self.remove(context)
+
+    def stats(self) -> Dict:
+        return {context: informer.stats() for context, informer in self._informers.items()}
+
+    @staticmethod
+    async def _items(resource: ResourceInformer, wait: float,
+                     kubectl_args: List[str], timeout: float) -> Optional[List[Dict]]:
+        if not resource.synced and wait > 0:
+            await resource.wait_synced(wait)
+        items = resource.items()
+        if items is not None:
+            return items
+
+        data = await kube_get_json(resource.context, resource.path, kubectl_args, timeout=timeout)
+        return data.get("items", []) if data is not None else None
+
+
+# Singleton instance
+kube_informers = KubeInformerRegistry()
@@ -0,0 +1,148 @@
+import time
+from array import array
+from typing import Dict, List, Optional
+
+# (nazwa, krok w sekundach, liczba przedziałów) - 10 min co 1 s, 1 h co 10 s, 24 h co minutę
+RESOLUTIONS = (
+    ("1s", 1, 600),
+    ("10s", 10, 360),
+    ("1m", 60, 1440),
+)
+
+COLUMNS = ("cpu_percent", "memory_used_mb", "memory_limit_mb")
+
+
+class RingSeries:
+    """
+    Bufor cykliczny o stałym rozmiarze dla jednej rozdzielczości.
+
+    Kolumny są trzymane w `array('d')`, a próbki trafiające do tego samego
+    przedziału czasu są uśredniane (downsampling w locie).
+    """
+
+    __slots__ = ("step", "capacity", "timestamps", "counts", "columns", "head", "size")
+
+    def __init__(self, step: int, capacity: int):
+        self.step = step
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.counts = array('d', bytes(8 * capacity))
+        self.columns = {name: array('d', bytes(8 * capacity)) for name in COLUMNS}
+        self.head = 0  # indeks następnego zapisu
+        self.size = 0
+
+    def add(self, timestamp: float, values: Dict[str, float]):
+        bucket = timestamp - timestamp % self.step
+        last = (self.head - 1) % self.capacity
+
+        if self.size and self.timestamps[last] == bucket:
+            # Ten sam przedział - średnia krocząca
+            count = self.counts[last] + 1
+            self.counts[last] = count
+            for name in ("cpu_percent", "memory_used_mb"):
+                column = self.columns[name]
+                column[last] += (values[name] - column[last]) / count
+            self.columns["memory_limit_mb"][last] = values["memory_limit_mb"]
+            return
+
+        if self.size and bucket < self.timestamps[last]:
+            # Próbka spóźniona względem ostatniego przedziału - pomiń
+            return
+
+        index = self.head
+        self.timestamps[index] = bucket
+        self.counts[index] = 1
+        for name in COLUMNS:
+            self.columns[name][index] = values[name]
+        self.head = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def range(self, since: float, until: float) -> Dict[str, List[float]]:
+        """Przedziały z [since, until] w kolejności czasu, w układzie kolumnowym"""
+        start = (self.head - self.size) % self.capacity
+        indexes = [
+            i for i in ((start + offset) % self.capacity for offset in range(self.size))
+            if since <= self.timestamps[i] <= until
+        ]
+        result = {"timestamps": [self.timestamps[i] for i in indexes]}
+        for name in COLUMNS:
+            column = self.columns[name]
+            result[name] = [round(column[i], 2) for i in indexes]
+        return result
+
+    @property
+    def retention(self) -> int:
+        return self.step * self.capacity
+
+
+class MetricsHistory:
+    """Historia CPU/RAM węzłów (kontenerów) klastrów w kilku rozdzielczościach"""
+
+    def __init__(self, resolutions=RESOLUTIONS):
+        self.resolutions = resolutions
+        # klaster -> węzeł -> rozdzielczość -> seria
+        self._series: Dict[str, Dict[str, Dict[str, RingSeries]]] = {}
+        self.samples = 0
+
+    def record(self, cluster_name: str, node_name: str, sample: Dict):
+        """Dodaj próbkę (słownik z timestamp i kolumnami z COLUMNS)"""
+        nodes = self._series.setdefault(cluster_name, {})
+        series = nodes.get(node_name)
+        if series is None:
+            series = {name: RingSeries(step, capacity) for name, step, capacity in self.resolutions}
+            nodes[node_name] = series
+
+        timestamp = sample.get("timestamp") or time.time()
+        values = {name: float(sample.get(name) or 0.0) for name in COLUMNS}
+        for ring in series.values():
+            ring.add(timestamp, values)
+        self.samples += 1
+
+    def pick_resolution(self, seconds: float) -> str:
+        """Najdokładniejsza rozdzielczość, która obejmuje cały zakres"""
+        for name, step, capacity in self.resolutions:
+            if step * capacity >= seconds:
+                return name
+        return self.resolutions[-1][0]
+
+    def query(self, cluster_name: str, seconds: float = 600, resolution: Optional[str] = None,
+              until: Optional[float] = None) -> Dict:
+        """Zakres historii wszystkich węzłów klastra w jednej odpowiedzi"""
+        resolution = resolution or self.pick_resolution(seconds)
+        if resolution not in {name for name, _, _ in self.resolutions}:
+            raise ValueError(f"Nieznana rozdzielczość: {resolution}")
+
+        until = until or time.time()
+        since = until - seconds
+        nodes = {
+            node_name: series[resolution].range(since, until)
+            for node_name, series in sorted(self._series.get(cluster_name, {}).items())
+        }
+        step = next(step for name, step, _ in self.resolutions if name == resolution)
+        return {
+            "resolution": resolution,
+            "step_seconds": step,
+            "since": since,
+            "until": until,
+            "columns": ["timestamps", *COLUMNS],
+            "nodes": nodes
+        }
+
+    def drop_cluster(self, cluster_name: str):
+        """Usuń historię klastra (po jego usunięciu)"""
+        self._series.pop(cluster_name, None)
+
+    def stats(self) -> Dict:
+        return {
+            "clusters": len(self._series),
+            "nodes": sum(len(nodes) for nodes in self._series.values()),
+            "samples": self.samples,
+            "resolutions": [
+                {"name": name, "step_seconds": step, "retention_seconds": step * capacity}
+                for name, step, capacity in self.resolutions
+            ]
+        }
+
+
+# Singleton instance
+metrics_history = MetricsHistory()
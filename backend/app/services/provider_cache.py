@@ -0,0 +1,54 @@
+import threading
+from typing import Dict, Optional
+
+
+class ProviderCache:
+    """Pamięć podręczna nazwa klastra -> provider (kind/k3d) z licznikami trafień"""
+
+    def __init__(self):
+        self._providers: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, cluster_name: str) -> Optional[str]:
+        """Zwróć zapamiętanego providera (None = brak wpisu)"""
+        with self._lock:
+            provider = self._providers.get(cluster_name)
+            if provider is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return provider
+
+    def set(self, cluster_name: str, provider: str):
+        """Zapamiętaj providera klastra (przy tworzeniu, przywracaniu lub wykryciu)"""
+        with self._lock:
+            self._providers[cluster_name] = provider
+
+    def invalidate(self, cluster_name: str):
+        """Usuń wpis (przy usuwaniu lub odtwarzaniu klastra)"""
+        with self._lock:
+            if self._providers.pop(cluster_name, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._providers)
+            self._providers.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._providers),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+# Singleton instance
+provider_cache = ProviderCache()
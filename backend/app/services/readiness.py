@@ -0,0 +1,135 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .kube_client import kube_get_json, kube_get_json_sync
+
+# Domyślne odstępy między sprawdzeniami: 0.5 s, 1 s, 2 s, ... maks. 5 s
+INITIAL_DELAY = 0.5
+MAX_DELAY = 5.0
+BACKOFF_FACTOR = 2.0
+
+
+async def wait_until(check: Callable[[], Awaitable[bool]], timeout: float,
+                     initial_delay: float = INITIAL_DELAY, max_delay: float = MAX_DELAY) -> bool:
+    """
+    Sprawdzaj warunek z wykładniczym odstępem aż do spełnienia lub upływu terminu.
+    Zwraca True, gdy warunek został spełniony; wyjątki w check() liczą się jako "jeszcze nie".
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        try:
+            if await check():
+                return True
+        except Exception:
+            pass
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * BACKOFF_FACTOR, max_delay)
+
+
+def wait_until_sync(check: Callable[[], bool], timeout: float,
+                    initial_delay: float = INITIAL_DELAY, max_delay: float = MAX_DELAY) -> bool:
+    """Wersja wait_until dla kodu działającego w wątkach"""
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        try:
+            if check():
+                return True
+        except Exception:
+            pass
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * BACKOFF_FACTOR, max_delay)
+
+
+# ===== Warunki gotowości (na danych z API serwera) =====
+
+def nodes_are_ready(nodes_data: Optional[Dict], expected: Optional[int] = None) -> bool:
+    """Wszystkie węzły mają warunek Ready=True (i jest ich co najmniej `expected`)"""
+    if nodes_data is None:
+        return False
+    nodes = nodes_data.get("items", [])
+    if not nodes or (expected is not None and len(nodes) < expected):
+        return False
+    return all(
+        any(c.get("type") == "Ready" and c.get("status") == "True"
+            for c in node.get("status", {}).get("conditions", []))
+        for node in nodes
+    )
+
+
+def deployment_is_rolled_out(deployment: Optional[Dict]) -> bool:
+    """Rollout zakończony: obserwowana generacja aktualna i wszystkie repliki zaktualizowane i dostępne"""
+    if deployment is None:
+        return False
+    metadata = deployment.get("metadata", {})
+    spec = deployment.get("spec", {})
+    status = deployment.get("status", {})
+    replicas = spec.get("replicas", 1)
+    return (
+        status.get("observedGeneration", 0) >= metadata.get("generation", 0)
+        and status.get("updatedReplicas", 0) >= replicas
+        and status.get("availableReplicas", 0) >= replicas
+    )
+
+
+def endpoints_are_available(endpoints: Optional[Dict]) -> bool:
+    """Serwis ma co najmniej jeden gotowy adres"""
+    if endpoints is None:
+        return False
+    return any(subset.get("addresses") for subset in endpoints.get("subsets") or [])
+
+
+# ===== Oczekiwanie =====
+
+async def wait_for_nodes_ready(context: str, expected: Optional[int] = None, timeout: float = 300) -> bool:
+    """Czekaj, aż węzły klastra będą Ready"""
+    async def check():
+        return nodes_are_ready(await kube_get_json(context, "/api/v1/nodes", ["get", "nodes"]), expected)
+    return await wait_until(check, timeout)
+
+
+async def wait_for_deployment(context: str, namespace: str, name: str, timeout: float = 300) -> bool:
+    """Czekaj na zakończenie rolloutu deploymentu"""
+    async def check():
+        return deployment_is_rolled_out(await kube_get_json(
+            context, f"/apis/apps/v1/namespaces/{namespace}/deployments/{name}",
+            ["get", "deployment", name, "-n", namespace]
+        ))
+    return await wait_until(check, timeout)
+
+
+async def wait_for_endpoints(context: str, namespace: str, services: List[str], timeout: float = 300) -> bool:
+    """Czekaj, aż wszystkie serwisy będą miały gotowe endpointy"""
+    async def check():
+        for service in services:
+            endpoints = await kube_get_json(
+                context, f"/api/v1/namespaces/{namespace}/endpoints/{service}",
+                ["get", "endpoints", service, "-n", namespace]
+            )
+            if not endpoints_are_available(endpoints):
+                return False
+        return True
+    return await wait_until(check, timeout)
+
+
+def wait_for_endpoints_sync(context: str, namespace: str, services: List[str], timeout: float = 300) -> bool:
+    """Synchroniczna wersja wait_for_endpoints (dla serwisów działających w wątkach)"""
+    def check():
+        return all(
+            endpoints_are_available(kube_get_json_sync(
+                context, f"/api/v1/namespaces/{namespace}/endpoints/{service}",
+                ["get", "endpoints", service, "-n", namespace], timeout=10
+            ))
+            for service in services
+        )
+    return wait_until_sync(check, timeout)
@@ -0,0 +1,190 @@
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import yaml
+
+from .api_discovery import api_discovery
+from .kube_client import KubeApiError, KubeConfigError, kube_clients
+
+# Objects applied at the same time
+RESTORE_WORKERS = int(os.environ.get("CLUSTERMASTER_RESTORE_WORKERS", "16"))
+
+FIELD_MANAGER = "clustermaster-restore"
+
+# Restore order - everything in a tier only depends on earlier tiers;
+# kinds not listed (workloads, services, custom resources...) go last
+TIERS = [
+    ("namespaces", {"Namespace", "CustomResourceDefinition", "StorageClass", "PriorityClass"}),
+    ("rbac", {"ServiceAccount", "Role", "ClusterRole", "RoleBinding", "ClusterRoleBinding"}),
+    ("config", {"ConfigMap", "Secret", "PersistentVolume", "PersistentVolumeClaim", "LimitRange", "ResourceQuota"}),
+]
+WORKLOAD_TIER = "workloads"
+
+
+def load_objects(backup_path: Path) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    All objects from the YAML files of an extracted backup as (file name, object);
+    cluster_info.json and the etcd snapshot are not matched by the glob
+    """
+    objects = []
+    for yaml_file in sorted(Path(backup_path).glob("*.yaml")):
+        with open(yaml_file, 'r', encoding='utf-8') as f:
+            for doc in yaml.safe_load_all(f):
+                if not doc:
+                    continue
+                # kind: List wraps its objects
+                for obj in doc.get("items", []) if doc.get("kind") == "List" else [doc]:
+                    if obj and obj.get("kind") and obj.get("metadata", {}).get("name"):
+                        objects.append((yaml_file.name, obj))
+    return objects
+
+
+def tier_of(obj: Dict[str, Any]) -> int:
+    kind = obj.get("kind")
+    for index, (_, kinds) in enumerate(TIERS):
+        if kind in kinds:
+            return index
+    return len(TIERS)
+
+
+def is_owned(obj: Dict[str, Any]) -> bool:
+    """Objects created by a controller (Jobs of a CronJob...) - the owner recreates them"""
+    return any(ref.get("controller") for ref in obj.get("metadata", {}).get("ownerReferences", []))
+
+
+def order_objects(objects: List[Tuple[str, Dict[str, Any]]]) -> List[List[Tuple[str, Dict[str, Any]]]]:
+    """Split objects into dependency tiers, leaving out controller-owned ones"""
+    tiers: List[List[Tuple[str, Dict[str, Any]]]] = [[] for _ in range(len(TIERS) + 1)]
+    for file_name, obj in objects:
+        if not is_owned(obj):
+            tiers[tier_of(obj)].append((file_name, obj))
+    return tiers
+
+
+def tier_name(index: int) -> str:
+    return TIERS[index][0] if index < len(TIERS) else WORKLOAD_TIER
+
+
+class RestoreEngine:
+    """
+    Restores parsed objects tier by tier; objects within a tier are applied
+    concurrently with server-side apply over the pooled API connection
+    (kubectl apply --server-side when the API cannot be reached directly).
+    """
+
+    def __init__(self, context: str, workers: int = RESTORE_WORKERS, field_manager: str = FIELD_MANAGER):
+        self.context = context
+        self.workers = workers
+        self.field_manager = field_manager
+        self._resources: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def restore(self, objects: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        tiers = order_objects(objects)
+        tier_stats = []
+        failed: List[Tuple[str, Dict[str, Any], str]] = []
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for index, tier in enumerate(tiers):
+                if not tier:
+                    continue
+                started = time.monotonic()
+                self._refresh_resources()
+                errors = list(executor.map(lambda item: self._apply(item[1]), tier))
+                tier_failed = [(file_name, obj, error) for (file_name, obj), error in zip(tier, errors) if error]
+                failed.extend(tier_failed)
+                tier_stats.append({
+                    "tier": tier_name(index),
+                    "objects": len(tier),
+                    "failed": len(tier_failed),
+                    "seconds": round(time.monotonic() - started, 2)
+                })
+                if index == 0:
+                    self._wait_for_crds([obj for _, obj in tier if obj["kind"] == "CustomResourceDefinition"])
+
+            # One more pass for objects that raced with something they depend on
+            # (e.g. a webhook or CRD that was not serving yet)
+            if failed:
+                self._refresh_resources()
+                retried = list(executor.map(lambda item: self._apply(item[1]), failed))
+                failed = [(file_name, obj, error) for (file_name, obj, _), error in zip(failed, retried) if error]
+
+        applied = sum(len(tier) for tier in tiers) - len(failed)
+        failed_files = {file_name for file_name, _, _ in failed}
+        return {
+            "objects_applied": applied,
+            "objects_failed": len(failed),
+            "skipped_owned": len(objects) - sum(len(tier) for tier in tiers),
+            "tiers": tier_stats,
+            "restored_files": sorted({file_name for file_name, _ in objects} - failed_files),
+            "failures": [
+                {"file": file_name, "kind": obj["kind"], "name": self._display_name(obj), "error": error}
+                for file_name, obj, error in failed[:50]
+            ]
+        }
+
+    def _apply(self, obj: Dict[str, Any]) -> Optional[str]:
+        """Apply one object; returns the error message or None"""
+        path = self._object_path(obj)
+        if path:
+            try:
+                kube_clients.get(self.context).apply_sync(path, obj, self.field_manager)
+                return None
+            except KubeApiError as e:
+                return str(e)[:500]
+            except (KubeConfigError, httpx.HTTPError, OSError, ValueError):
+                pass
+
+        # kubectl resolves kinds the discovery cache does not know (yet)
+        try:
+            result = subprocess.run(
+                ["kubectl", "apply", "--server-side", "--force-conflicts",
+                 "--field-manager", self.field_manager, "-f", "-", "--context", self.context],
+                input=json.dumps(obj), capture_output=True, text=True, encoding='utf-8', timeout=60
+            )
+        except (subprocess.TimeoutExpired, OSError) as e:
+            return str(e)
+        return None if result.returncode == 0 else result.stderr.strip()[-500:]
+
+    def _object_path(self, obj: Dict[str, Any]) -> Optional[str]:
+        api_version = obj.get("apiVersion", "")
+        group, _, version = api_version.rpartition("/")
+        resource = self._resources.get((group, obj["kind"]))
+        if resource is None or not version:
+            return None
+
+        base = f"/apis/{group}/{version}" if group else f"/api/{version}"
+        name = obj["metadata"]["name"]
+        if resource["namespaced"]:
+            namespace = obj["metadata"].get("namespace") or "default"
+            return f"{base}/namespaces/{namespace}/{resource['name']}/{name}"
+        return f"{base}/{resource['name']}/{name}"
+
+    def _refresh_resources(self):
+        """Map (group, kind) to resource names - new groups appear once their CRDs are served"""
+        discovered = api_discovery.listable_resources(self.context) or []
+        self._resources = {(resource["group"], resource["kind"]): resource for resource in discovered}
+
+    def _wait_for_crds(self, crds: List[Dict[str, Any]], timeout: int = 60):
+        """Custom resources can only be applied once their CRD is established"""
+        if not crds:
+            return
+        names = [f"crd/{crd['metadata']['name']}" for crd in crds]
+        try:
+            subprocess.run(
+                ["kubectl", "wait", "--for=condition=Established", f"--timeout={timeout}s",
+                 "--context", self.context] + names,
+                capture_output=True, text=True, timeout=timeout + 10
+            )
+        except (subprocess.TimeoutExpired, OSError):
+            pass
+
+    @staticmethod
+    def _display_name(obj: Dict[str, Any]) -> str:
+        namespace = obj["metadata"].get("namespace")
+        return f"{namespace}/{obj['metadata']['name']}" if namespace else obj["metadata"]["name"]
@@ -0,0 +1,205 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from .command_runner import command_runner
+from .kube_informer import kube_informers
+from .readiness import wait_until
+
+CONTROL_PLANE_LABELS = ("node-role.kubernetes.io/control-plane", "node-role.kubernetes.io/master")
+
+# Koszt przeniesienia poda w zależności od właściciela
+POD_MOVE_COSTS = {
+    None: 10,              # goły pod - po usunięciu węzła nie wróci
+    "StatefulSet": 5,      # stały identyfikator, wolniejszy restart
+    "Job": 3,              # przerwane zadanie zaczyna od nowa
+    "ReplicaSet": 1,
+    "ReplicationController": 1,
+}
+# Dodatkowy koszt za dane lokalne, które giną przy przeniesieniu
+EMPTY_DIR_COST = 2
+PVC_COST = 3
+
+
+def is_control_plane(node: Dict) -> bool:
+    labels = node.get("metadata", {}).get("labels", {})
+    return any(label in labels for label in CONTROL_PLANE_LABELS)
+
+
+def is_ready(node: Dict) -> bool:
+    return any(
+        c.get("type") == "Ready" and c.get("status") == "True"
+        for c in node.get("status", {}).get("conditions", [])
+    )
+
+
+def pod_move_cost(pod: Dict) -> int:
+    """Koszt przeniesienia poda na inny węzeł (0 = pod nie jest przenoszony)"""
+    metadata = pod.get("metadata", {})
+    if pod.get("status", {}).get("phase") in ("Succeeded", "Failed"):
+        return 0
+    # Pody statyczne (mirror) i DaemonSety nie są przenoszone przez drain
+    if "kubernetes.io/config.mirror" in metadata.get("annotations", {}):
+        return 0
+
+    owner = next((ref.get("kind") for ref in metadata.get("ownerReferences", []) if ref.get("controller")), None)
+    if owner == "DaemonSet":
+        return 0
+
+    cost = POD_MOVE_COSTS.get(owner, 1)
+    for volume in pod.get("spec", {}).get("volumes", []):
+        if "emptyDir" in volume:
+            cost += EMPTY_DIR_COST
+        elif "persistentVolumeClaim" in volume:
+            cost += PVC_COST
+    return cost
+
+
+def rank_nodes_for_removal(nodes: List[Dict], pods: List[Dict]) -> List[Dict]:
+    """
+    Workery od najtańszego do usunięcia: najpierw niegotowe, potem najniższy
+    koszt przeniesienia podów, najmniej podów, a przy remisie najnowszy węzeł.
+    """
+    pods_by_node: Dict[str, List[Dict]] = {}
+    for pod in pods:
+        node_name = pod.get("spec", {}).get("nodeName")
+        if node_name:
+            pods_by_node.setdefault(node_name, []).append(pod)
+
+    candidates = []
+    for node in nodes:
+        if is_control_plane(node):
+            continue
+        name = node["metadata"]["name"]
+        costs = [pod_move_cost(pod) for pod in pods_by_node.get(name, [])]
+        moved = [cost for cost in costs if cost > 0]
+        candidates.append({
+            "node": name,
+            "ready": is_ready(node),
+            "cost": sum(moved),
+            "pods_to_move": len(moved),
+            "created": node["metadata"].get("creationTimestamp", "")
+        })
+
+    # Sortowanie stabilne: najpierw od najnowszego, potem po koszcie
+    candidates.sort(key=lambda c: c["created"], reverse=True)
+    candidates.sort(key=lambda c: (c["ready"], c["cost"], c["pods_to_move"]))
+    return candidates
+
+
+async def plan_scale_down(context: str, count: int) -> Dict:
+    """Wybierz `count` workerów do usunięcia na podstawie indeksu podów"""
+    nodes, pods = await asyncio.gather(
+        kube_informers.nodes(context), kube_informers.pods(context)
+    )
+    if nodes is None or pods is None:
+        return {"success": False, "error": "Cluster API is not reachable", "nodes": [], "candidates": []}
+
+    ranked = rank_nodes_for_removal(nodes, pods)
+    return {"success": True, "nodes": [c["node"] for c in ranked[:count]], "candidates": ranked}
+
+
+async def cordon_and_drain(context: str, node_names: List[str], timeout: int = 120) -> Dict:
+    """
+    Odetnij wszystkie wybrane węzły naraz (pody nie trafią na inny usuwany węzeł),
+    a potem opróżnij je równolegle.
+    """
+    async def kubectl(*args, timeout=30, long_running=False):
+        return await command_runner.run(["kubectl", *args, "--context", context], timeout=timeout,
+                                        long_running=long_running)
+
+    # Zapamiętaj, czyje pody zostaną wyrzucone - po drain czekamy tylko na nie
+    owners = evicted_owners(await kube_informers.pods(context) or [], node_names)
+
+    await asyncio.gather(*[kubectl("cordon", name) for name in node_names])
+
+    started = time.monotonic()
+    results = await asyncio.gather(*[
+        kubectl("drain", name, "--ignore-daemonsets", "--delete-emptydir-data", "--force",
+                f"--timeout={timeout}s", timeout=timeout + 30, long_running=True)
+        for name in node_names
+    ])
+
+    nodes = {}
+    for name, result in zip(node_names, results):
+        nodes[name] = {"drained": result["returncode"] == 0}
+        if result["returncode"] != 0:
+            nodes[name]["error"] = result["stderr"].strip()[-300:]
+    return {
+        "nodes": nodes,
+        "drain_seconds": round(time.monotonic() - started, 1),
+        "started": started,
+        "evicted_owners": owners
+    }
+
+
+async def uncordon_remaining(context: str, node_names: List[str]) -> List[str]:
+    """
+    Przywróć harmonogramowanie na odciętych węzłach, które przetrwały skalowanie
+    (błąd providera albo usunięcie mniejszej liczby węzłów); usunięte węzły
+    zwracają NotFound i są pomijane. Zwraca nazwy węzłów przywróconych.
+    """
+    results = await asyncio.gather(*[
+        command_runner.run(["kubectl", "uncordon", name, "--context", context], timeout=30)
+        for name in node_names
+    ])
+    return [name for name, result in zip(node_names, results) if result["returncode"] == 0]
+
+
+def _controller_uid(pod: Dict) -> Optional[str]:
+    return next(
+        (ref.get("uid") for ref in pod.get("metadata", {}).get("ownerReferences", []) if ref.get("controller")),
+        None
+    )
+
+
+def _is_live(pod: Dict) -> bool:
+    return not pod.get("metadata", {}).get("deletionTimestamp") and \
+        pod.get("status", {}).get("phase") not in ("Succeeded", "Failed")
+
+
+def evicted_owners(pods: List[Dict], node_names: List[str]) -> Dict[str, int]:
+    """
+    Kontrolery podów przenoszonych z `node_names` -> ile ich podów działało przed drain
+    (w całym klastrze). Gołe pody i DaemonSety pomijamy - nikt ich nie odtworzy gdzie indziej.
+    """
+    drained = set(node_names)
+    owners = {
+        _controller_uid(pod) for pod in pods
+        if pod.get("spec", {}).get("nodeName") in drained and pod_move_cost(pod) > 0
+    }
+    owners.discard(None)
+    expected = dict.fromkeys(owners, 0)
+    for pod in pods:
+        uid = _controller_uid(pod)
+        if uid in expected and _is_live(pod):
+            expected[uid] += 1
+    return expected
+
+
+def rescheduled_owners(pods: List[Dict], owners: Dict[str, int], drained_nodes: List[str]) -> List[str]:
+    """Kontrolery, które nie mają jeszcze tylu działających podów poza opróżnionymi węzłami co przed drain"""
+    drained = set(drained_nodes)
+    running = dict.fromkeys(owners, 0)
+    for pod in pods:
+        uid = _controller_uid(pod)
+        if uid in running and _is_live(pod) and pod.get("status", {}).get("phase") == "Running" \
+                and pod.get("spec", {}).get("nodeName") not in drained:
+            running[uid] += 1
+    return [uid for uid, count in owners.items() if running[uid] < count]
+
+
+async def wait_for_rescheduling(context: str, started: float, owners: Dict[str, int],
+                                drained_nodes: List[str], timeout: float = 120) -> Optional[float]:
+    """
+    Czekaj, aż pody wyrzucone z `drained_nodes` znów działają na innych węzłach
+    (Pending pody niezwiązane z drain nie mają znaczenia); zwraca czas
+    od rozpoczęcia drain (None, jeśli nie zdążyły w `timeout`).
+    """
+    async def rescheduled():
+        pods = await kube_informers.pods(context, wait=0)
+        return pods is not None and not rescheduled_owners(pods, owners, drained_nodes)
+
+    if not await wait_until(rescheduled, timeout):
+        return None
+    return round(time.monotonic() - started, 1)
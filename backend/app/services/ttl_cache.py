@@ -0,0 +1,185 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "stale_until", "tags")
+
+    def __init__(self, value: Any, expires_at: float, stale_until: float, tags: Iterable[str]):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.tags = tuple(tags)
+
+
+class TTLCache:
+    """
+    Ograniczony cache LRU z TTL per klucz.
+
+    - get_or_load() łączy równoczesne chybienia w jedno wywołanie loadera (single-flight)
+    - po wygaśnięciu TTL wpis jest jeszcze przez stale_ttl zwracany od razu,
+      a odświeżenie odbywa się w tle (stale-while-revalidate)
+    - wpisy można unieważniać pojedynczo albo po tagu (np. "cluster:<nazwa>")
+    """
+
+    def __init__(self, max_size: int = 256, default_ttl: float = 2.0, stale_ttl: float = 0.0):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        # Ładowanie jako osobne zadanie - anulowanie jednego czekającego nie dotyka pozostałych
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "loads": 0,
+            "load_errors": 0,
+            "evictions": 0,
+            "invalidations": 0
+        }
+
+    # ===== Odczyt / zapis =====
+
+    def get(self, key: str) -> Optional[Any]:
+        """Zwróć świeżą wartość lub None"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry.expires_at:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            stale_ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        """Zapisz wartość (z opcjonalnym TTL i tagami)"""
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        now = time.monotonic()
+
+        self._drop(key)
+        entry = _Entry(value, now + ttl, now + ttl + stale_ttl, tags)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats["evictions"] += 1
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float] = None, stale_ttl: Optional[float] = None,
+                          tags: Iterable[str] = ()) -> Any:
+        """Zwróć wartość z cache albo załaduj ją (jedno wywołanie loadera na klucz naraz)"""
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None and now < entry.expires_at:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
+
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            self._stats["stale_hits"] += 1
+            if key not in self._inflight:
+                task = self._start_load(key, loader, ttl, stale_ttl, tags)
+                self._background.add(task)
+                task.add_done_callback(self._background_done)
+            return entry.value
+
+        self._stats["misses"] += 1
+        return await self._load(key, loader, ttl, stale_ttl, tags)
+
+    # ===== Unieważnianie =====
+
+    def invalidate(self, key: str):
+        """Usuń pojedynczy wpis (trwające ładowanie nie zapisze już wyniku)"""
+        self._inflight.pop(key, None)
+        if self._drop(key):
+            self._stats["invalidations"] += 1
+
+    def invalidate_tag(self, tag: str):
+        """Usuń wszystkie wpisy oznaczone tagiem"""
+        for key in list(self._tags.get(tag, ())):
+            self.invalidate(key)
+
+    def clear(self):
+        for key in list(self._entries):
+            self.invalidate(key)
+        for key in list(self._inflight):
+            self.invalidate(key)
+
+    def stats(self) -> Dict:
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+        served = self._stats["hits"] + self._stats["stale_hits"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "inflight": len(self._inflight),
+            "hit_rate": round(served / lookups, 3) if lookups else 0.0
+        }
+
+    # ===== Wewnętrzne =====
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                    ttl: Optional[float], stale_ttl: Optional[float], tags: Iterable[str]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            task = self._start_load(key, loader, ttl, stale_ttl, tags)
+        # Anulowany czekający (np. rozłączony klient) nie przerywa ładowania pozostałym
+        return await asyncio.shield(task)
+
+    def _start_load(self, key: str, loader: Callable[[], Awaitable[Any]],
+                    ttl: Optional[float], stale_ttl: Optional[float], tags: Iterable[str]) -> asyncio.Task:
+        task = asyncio.create_task(self._run_loader(key, loader, ttl, stale_ttl, tags))
+        # Wynik odczytany przez nikogo nie powinien generować ostrzeżeń
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        self._stats["loads"] += 1
+        return task
+
+    async def _run_loader(self, key: str, loader: Callable[[], Awaitable[Any]],
+                          ttl: Optional[float], stale_ttl: Optional[float], tags: Iterable[str]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+        except Exception:
+            self._stats["load_errors"] += 1
+            raise
+        finally:
+            # Po invalidate() ładowanie nie jest już aktualne i nie zapisuje wyniku
+            current = self._inflight.get(key) is task
+            if current:
+                del self._inflight[key]
+
+        if current:
+            self.set(key, value, ttl=ttl, stale_ttl=stale_ttl, tags=tags)
+        return value
+
+    def _drop(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def _background_done(self, task: asyncio.Task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Cache background refresh failed: {task.exception()}")
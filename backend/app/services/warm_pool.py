@@ -0,0 +1,303 @@
+import asyncio
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .command_runner import command_runner
+from .cluster_inventory import cluster_inventory
+
+# Prefiks nazw klastrów trzymanych w puli (nie są pokazywane na listach)
+POOL_PREFIX = "cmpool-"
+
+# Klucz puli dla klastrów bez podanej wersji (domyślny obraz kind)
+DEFAULT_VERSION = "default"
+
+# Co ile sekund sprawdzać, czy pula jest pełna (oprócz wybudzeń po wydaniu klastra)
+REPLENISH_INTERVAL = 60
+
+
+def parse_pool_config(value: str) -> Dict[str, int]:
+    """
+    Zamień np. "v1.29.2=2,default=1" na {wersja: liczba klastrów}.
+    Pusta wartość = pula wyłączona.
+    """
+    sizes = {}
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        version, _, size = item.partition("=")
+        try:
+            sizes[version.strip() or DEFAULT_VERSION] = max(0, int(size or 1))
+        except ValueError:
+            continue
+    return {version: size for version, size in sizes.items() if size > 0}
+
+
+class WarmPool:
+    """
+    Pula gotowych, bezczynnych klastrów kind (jednowęzłowych) per wersja Kubernetes.
+
+    `create_cluster` dostaje klaster z puli w kilka sekund: kontekst kubeconfig
+    `kind-<pula>` jest przemianowywany na `kind-<nazwa>`, a mapowanie nazw
+    zapisywane w pliku (kontenery i labelki kind zostają pod nazwą z puli).
+    Pula jest uzupełniana w tle, a obrazy węzłów pobierane z wyprzedzeniem.
+
+    k3d nie jest trzymany w puli - każdy klaster k3d używa stałego portu API
+    (127.0.0.1:6550), więc bezczynny klaster blokowałby tworzenie nowych.
+    Obrazy k3s można jednak pobierać z wyprzedzeniem (CLUSTERMASTER_PREPULL_IMAGES).
+    """
+
+    def __init__(self, sizes: Dict[str, int], state_file_path: str = "warm_pool.json",
+                 prepull_images: Optional[List[str]] = None):
+        self.sizes = sizes
+        self.state_file_path = Path(state_file_path)
+        self.prepull_images = prepull_images or []
+        self._state = self._load_state()
+        self._lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.handed_out = 0
+        self.misses = 0
+        self.created = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._apply_to_inventory()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sizes)
+
+    # ===== Nazwy =====
+
+    def resolve(self, cluster_name: str) -> str:
+        """Prawdziwa nazwa klastra kind (z puli) dla nazwy widocznej dla użytkownika"""
+        return self._state["aliases"].get(cluster_name, cluster_name)
+
+    def is_idle(self, real_name: str) -> bool:
+        """Czy klaster czeka w puli (nie powinien być pokazywany)"""
+        return real_name in self._state["idle"]
+
+    def visible_names(self, real_names: List[str]) -> List[str]:
+        """Zamień nazwy z `kind get clusters` na nazwy widoczne dla użytkownika"""
+        displayed = {real: alias for alias, real in self._state["aliases"].items()}
+        return [displayed.get(name, name) for name in real_names if not self.is_idle(name)]
+
+    # ===== Wydawanie klastrów =====
+
+    async def acquire(self, cluster_name: str, k8s_version: Optional[str] = None) -> Optional[Dict]:
+        """
+        Wydaj bezczynny klaster z puli pod nazwą `cluster_name`.
+        Zwraca None, gdy w puli nie ma klastra w tej wersji.
+        """
+        version = k8s_version or DEFAULT_VERSION
+        async with self._lock:
+            real_name = next(
+                (name for name, entry in self._state["idle"].items() if entry["k8s_version"] == version),
+                None
+            )
+            if real_name is None:
+                self.misses += 1
+                self._wakeup()
+                return None
+
+            entry = self._state["idle"].pop(real_name)
+            renamed = await self._rename_context(f"kind-{real_name}", f"kind-{cluster_name}")
+            if not renamed:
+                # Kontekst zniknął (np. ręcznie usunięty) - klaster jest bezużyteczny dla puli
+                self._state["idle"][real_name] = entry
+                await self._discard(real_name)
+                self.misses += 1
+                return None
+
+            self._state["aliases"][cluster_name] = real_name
+            self._save_state()
+            self._apply_to_inventory()
+            self.handed_out += 1
+
+        self._wakeup()
+        return {
+            "pool_cluster": real_name,
+            "k8s_version": version,
+            "pooled_seconds": round(time.time() - entry["created_at"], 1)
+        }
+
+    def release(self, cluster_name: str) -> Optional[str]:
+        """Zapomnij mapowanie nazwy (po usunięciu klastra); zwraca nazwę z puli"""
+        real_name = self._state["aliases"].pop(cluster_name, None)
+        if real_name is not None:
+            self._save_state()
+            self._apply_to_inventory()
+        return real_name
+
+    async def delete_context(self, cluster_name: str):
+        """`kind delete` usuwa tylko kontekst kind-<pula>, więc przemianowany trzeba usunąć osobno"""
+        await command_runner.run(
+            ["kubectl", "config", "delete-context", f"kind-{cluster_name}"], timeout=10
+        )
+
+    # ===== Cykl życia =====
+
+    async def start(self):
+        """Uruchom uzupełnianie puli w tle (tylko gdy pula jest skonfigurowana)"""
+        if not self.enabled and not self.prepull_images:
+            return
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._replenish_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        idle: Dict[str, int] = {}
+        for entry in self._state["idle"].values():
+            idle[entry["k8s_version"]] = idle.get(entry["k8s_version"], 0) + 1
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None and not self._task.done(),
+            "target": self.sizes,
+            "idle": idle,
+            "aliases": dict(self._state["aliases"]),
+            "prepull_images": self.images_to_prepull(),
+            "handed_out": self.handed_out,
+            "misses": self.misses,
+            "created": self.created,
+            "failures": self.failures,
+            "last_error": self.last_error
+        }
+
+    def images_to_prepull(self) -> List[str]:
+        images = [f"kindest/node:{version}" for version in self.sizes if version != DEFAULT_VERSION]
+        return images + [image for image in self.prepull_images if image not in images]
+
+    # ===== Wewnętrzne =====
+
+    async def _replenish_loop(self):
+        await self._prepull()
+        backoff = REPLENISH_INTERVAL
+        while True:
+            try:
+                created = await self._replenish_once()
+                backoff = REPLENISH_INTERVAL
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                created = False
+                backoff = min(backoff * 2, 600)
+
+            if created:
+                # Sprawdź od razu, czy brakuje kolejnych
+                continue
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _prepull(self):
+        """Pobierz obrazy węzłów z wyprzedzeniem (błędy nie zatrzymują puli)"""
+        for image in self.images_to_prepull():
+            result = await command_runner.run(["docker", "pull", image], timeout=900, long_running=True)
+            if result["returncode"] != 0:
+                print(f"Warm pool: nie udało się pobrać obrazu {image}: {result['stderr'].strip()}")
+
+    async def _replenish_once(self) -> bool:
+        """Utwórz jeden brakujący klaster; zwraca True, jeśli coś utworzono"""
+        self._forget_vanished()
+        for version, size in self.sizes.items():
+            idle = [e for e in self._state["idle"].values() if e["k8s_version"] == version]
+            if len(idle) >= size:
+                continue
+
+            real_name = f"{POOL_PREFIX}{uuid.uuid4().hex[:8]}"
+            args = [shutil.which("kind") or "kind", "create", "cluster", "--name", real_name, "--wait", "120s"]
+            if version != DEFAULT_VERSION:
+                args.extend(["--image", f"kindest/node:{version}"])
+
+            result = await command_runner.run(args, timeout=900, cluster=real_name, long_running=True)
+            if result["returncode"] != 0:
+                await command_runner.run(
+                    [shutil.which("kind") or "kind", "delete", "cluster", "--name", real_name], timeout=120,
+                    long_running=True
+                )
+                raise RuntimeError(f"Nie udało się utworzyć klastra puli: {result['stderr'].strip()[-500:]}")
+
+            async with self._lock:
+                self._state["idle"][real_name] = {"k8s_version": version, "created_at": time.time()}
+                self._save_state()
+                self._apply_to_inventory()
+            self.created += 1
+            return True
+        return False
+
+    def _forget_vanished(self):
+        """Usuń z puli klastry, których już nie ma (gdy indeks klastrów działa)"""
+        if not cluster_inventory.ready:
+            return
+        vanished = [name for name in self._state["idle"] if cluster_inventory.get(name) is None]
+        for name in vanished:
+            del self._state["idle"][name]
+        if vanished:
+            self._save_state()
+
+    async def _discard(self, real_name: str):
+        self._state["idle"].pop(real_name, None)
+        self._save_state()
+        self._apply_to_inventory()
+        await command_runner.run(
+            [shutil.which("kind") or "kind", "delete", "cluster", "--name", real_name], timeout=120,
+            long_running=True
+        )
+
+    async def _rename_context(self, old: str, new: str) -> bool:
+        # Pozostałość po klastrze o tej samej nazwie zablokowałaby zmianę nazwy
+        await command_runner.run(["kubectl", "config", "delete-context", new], timeout=10)
+        result = await command_runner.run(["kubectl", "config", "rename-context", old, new], timeout=10)
+        return result["returncode"] == 0
+
+    def _wakeup(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def _apply_to_inventory(self):
+        cluster_inventory.set_aliases(
+            {real: alias for alias, real in self._state["aliases"].items()},
+            hidden=self._state["idle"]
+        )
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_file_path, 'r') as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            state = {}
+        return {"idle": state.get("idle", {}), "aliases": state.get("aliases", {})}
+
+    def _save_state(self):
+        tmp_path = self.state_file_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self._state, f, indent=2)
+        os.replace(tmp_path, self.state_file_path)
+
+
+# Singleton instance
+warm_pool = WarmPool(
+    parse_pool_config(os.environ.get("CLUSTERMASTER_WARM_POOL", "")),
+    prepull_images=[
+        image.strip() for image in os.environ.get("CLUSTERMASTER_PREPULL_IMAGES", "").split(",")
+        if image.strip()
+    ]
+)
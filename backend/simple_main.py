@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 import subprocess
 import os
 import shutil
@@ -11,11 +12,27 @@ from app.services.port_manager import port_manager
 from app.services.backup_service import BackupService
 from app.services.app_service import AppService
 from app.services.k3d_service import k3d_service
+from app.services.kind_service import kind_service
+from app.services.command_runner import command_runner
+from app.services.cluster_inventory import cluster_inventory
+from app.services.provider_cache import provider_cache
+from app.services.ttl_cache import TTLCache
+from app.services.kube_client import kube_clients, kube_get_json
+from app.services.kube_informer import kube_informers
+from app.services.docker_stats import docker_stats
+from app.services.metrics_history import metrics_history
+from app.services.event_hub import event_hub
+from app.services.job_manager import job_manager, no_progress, JobProgress
+from app.services.readiness import wait_for_deployment, wait_for_nodes_ready
+from app.services.warm_pool import warm_pool
+from app.services.scale_planner import (
+    plan_scale_down, cordon_and_drain, wait_for_rescheduling, is_control_plane, uncordon_remaining
+)
+from app.services.autoscaler import autoscaler
 import argparse
 import sys
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timedelta
+import time
 from typing import Optional
 
 # Parse command line arguments
@@ -37,25 +54,68 @@ else:
 # Initialize services
 app_service = AppService()
 
-_cluster_cache = {}
-_cache_ttl_fast = timedelta(seconds=3)  # Szybkie cache dla list (3s)
-_cache_ttl_full = timedelta(seconds=2)  # Pełne cache dla szczegółów (2s)  
-
-def get_from_cache(key: str, use_fast_ttl: bool = False) -> Optional[dict]:
-    """Pobierz wartość z cache jeśli jest aktualna"""
-    if key in _cluster_cache:
-        data, timestamp = _cluster_cache[key]
-        ttl = _cache_ttl_fast if use_fast_ttl else _cache_ttl_full
-        if datetime.now() - timestamp < ttl:
-            return data
-    return None
+_cache_ttl_fast = 3  # Szybkie cache dla list (3s)
+_cache_ttl_full = 2  # Pełne cache dla szczegółów (2s)
+_cache_stale_ttl = 10  # Po wygaśnięciu zwracaj starą wartość i odświeżaj w tle
+
+# Ograniczony cache LRU z łączeniem równoczesnych chybień (single-flight)
+cluster_cache = TTLCache(max_size=256, default_ttl=_cache_ttl_full, stale_ttl=_cache_stale_ttl)
+
+CLUSTERS_LIST_TAG = "clusters"
+
+def cluster_cache_tag(cluster_name: str) -> str:
+    return f"cluster:{cluster_name}"
+
+def invalidate_cluster_cache(cluster_name: str):
+    """Unieważnij wpisy cache jednego klastra oraz listy klastrów"""
+    cluster_cache.invalidate_tag(cluster_cache_tag(cluster_name))
+    cluster_cache.invalidate_tag(CLUSTERS_LIST_TAG)
+
+# Klaster usunięty poza API (np. `kind delete cluster`) nie może zostać w cache
+cluster_inventory.on_removed(provider_cache.invalidate)
+cluster_inventory.on_removed(invalidate_cluster_cache)
+
+def release_cluster_connections(cluster_name: str):
+    """Zatrzymaj informery i zamknij połączenia do API usuniętego klastra"""
+    for provider in ("kind", "k3d"):
+        kube_informers.discard(f"{provider}-{cluster_name}")
+        kube_clients.invalidate(f"{provider}-{cluster_name}")
+
+cluster_inventory.on_removed(release_cluster_connections)
+cluster_inventory.on_removed(command_runner.forget_cluster)
+
+def record_node_metrics(sample: dict):
+    """Zapisuj historię zasobów tylko dla kontenerów węzłów klastrów"""
+    cluster_name = cluster_inventory.find_container(sample["name"])
+    if cluster_name:
+        metrics_history.record(cluster_name, sample["name"], sample)
 
-def set_in_cache(key: str, data: dict):
-    """Zapisz wartość w cache"""
-    _cluster_cache[key] = (data, datetime.now())
+docker_stats.on_sample(record_node_metrics)
+cluster_inventory.on_removed(metrics_history.drop_cluster)
+cluster_inventory.on_removed(autoscaler.drop_cluster)
 
 app = FastAPI(title="ClusterMaster API", version="1.0.0")
 
+@app.on_event("startup")
+async def start_background_services():
+    """Uruchom indeks klastrów oparty o zdarzenia Dockera, strumień docker stats i pulę klastrów"""
+    await cluster_inventory.start()
+    await docker_stats.start()
+    await warm_pool.start()
+    await autoscaler.start()
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    await autoscaler.stop()
+    await warm_pool.stop()
+    await cluster_inventory.stop()
+    await docker_stats.stop()
+    await event_hub.stop()
+    await job_manager.stop()
+    await kube_informers.stop_all()
+    await kube_clients.aclose_all()
+    command_runner.shutdown()
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -86,8 +146,8 @@ def find_kind_executable():
     
     return None
 
-def run_kind_command(args, timeout=30):
-    """Uruchom komendę kind z obsługą błędów"""
+async def run_kind_command(args, timeout=30, input=None, long_running=False, on_line=None):
+    """Uruchom komendę kind z obsługą błędów (bez blokowania event loop)"""
     kind_path = find_kind_executable()
     
     if not kind_path:
@@ -97,34 +157,9 @@ def run_kind_command(args, timeout=30):
             "stderr": "Kind nie został znaleziony. Sprawdź instalację."
         }
     
-    try:
-        cmd = [kind_path] + args
-        result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True, 
-            timeout=timeout,
-            encoding='utf-8',  # DODANE: wymuszenie UTF-8
-            errors='replace',  # DODANE: zastąp problematyczne znaki
-            creationflags=subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-        )
-        return {
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr
-        }
-    except subprocess.TimeoutExpired:
-        return {
-            "returncode": 1,
-            "stdout": "",
-            "stderr": f"Komenda przekroczyła limit czasu ({timeout}s)"
-        }
-    except Exception as e:
-        return {
-            "returncode": 1,
-            "stdout": "",
-            "stderr": str(e)
-        }
+    return await command_runner.run(
+        [kind_path] + args, timeout=timeout, input=input, long_running=long_running, on_line=on_line
+    )
 
 def create_kind_config(cluster_name, node_count, cluster_ports=None):
     """Utwórz plik konfiguracyjny Kind z mapowaniem portów dla monitoringu"""
@@ -217,17 +252,17 @@ def parse_node_metrics(metrics_output: str) -> dict:
         "summary": f"{node_count} wezlow"
     }
 
-def get_basic_node_info(cluster_name: str) -> dict:
+async def get_basic_node_info(cluster_name: str) -> dict:
     """Pobierz podstawowe informacje o węzłach gdy metryki nie są dostępne"""
     try:
-        nodes_result = subprocess.run([
+        nodes_result = await command_runner.run([
             "kubectl", "get", "nodes", "--context", f"kind-{cluster_name}",
             "-o", r"custom-columns=NAME:.metadata.name,STATUS:.status.conditions[-1].type,ROLES:.metadata.labels.node-role\.kubernetes\.io/control-plane",
             "--no-headers"
-        ], capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=5)
+        ], timeout=5)
         
-        if nodes_result.returncode == 0:
-            lines = nodes_result.stdout.strip().split('\n')
+        if nodes_result["returncode"] == 0:
+            lines = nodes_result["stdout"].strip().split('\n')
             nodes_info = []
             for line in lines:
                 if line.strip():
@@ -253,11 +288,64 @@ def get_basic_node_info(cluster_name: str) -> dict:
         "node_count": 0
     }
 
-def detect_cluster_provider(cluster_name: str) -> str:
-    """Wykryj providera klastra (kind lub k3d)"""
+async def list_cluster_names() -> list:
+    """Nazwy wszystkich klastrów Kind i k3d - z indeksu, a gdy nie działa, z CLI"""
+    if cluster_inventory.ready:
+        return cluster_inventory.list_names()
+    
+    cluster_names = []
+    
+    # Pobierz klastry Kind i k3d równolegle
+    kind_result, k3d_clusters = await asyncio.gather(
+        run_kind_command(["get", "clusters"]),
+        command_runner.run_blocking(k3d_service.list_clusters),
+        return_exceptions=True
+    )
+    if not isinstance(kind_result, Exception) and kind_result["returncode"] == 0 and kind_result["stdout"].strip():
+        kind_clusters = [name.strip() for name in kind_result["stdout"].strip().split('\n') if name.strip()]
+        cluster_names.extend(warm_pool.visible_names(kind_clusters))
+    
+    # Pobierz klastry k3d
+    if isinstance(k3d_clusters, Exception):
+        print(f"Error fetching k3d clusters: {k3d_clusters}")
+    else:
+        cluster_names.extend(k3d_clusters)
+    
+    return cluster_names
+
+async def cluster_exists(cluster_name: str, provider: str) -> bool:
+    """Sprawdź czy klaster danego providera istnieje"""
+    if cluster_inventory.ready:
+        cluster = cluster_inventory.get(cluster_name)
+        return cluster is not None and cluster["provider"] == provider
+    
+    if provider == "k3d":
+        return cluster_name in await command_runner.run_blocking(k3d_service.list_clusters)
+    
+    result = await run_kind_command(["get", "clusters"])
+    return result["returncode"] == 0 and cluster_name in warm_pool.visible_names(result["stdout"].split())
+
+async def detect_cluster_provider(cluster_name: str) -> Optional[str]:
+    """Wykryj providera klastra (kind lub k3d) - None jeśli klaster nie istnieje"""
+    provider = provider_cache.get(cluster_name)
+    if provider:
+        return provider
+    
+    if cluster_inventory.ready:
+        cluster = cluster_inventory.get(cluster_name)
+        provider = cluster["provider"] if cluster else None
+    else:
+        provider = await _detect_cluster_provider_cli(cluster_name)
+    
+    if provider:
+        provider_cache.set(cluster_name, provider)
+    return provider
+
+async def _detect_cluster_provider_cli(cluster_name: str) -> Optional[str]:
+    """Wykryj providera przez CLI (gdy indeks klastrów nie działa)"""
     # Sprawdź k3d clusters (z obsługą błędów)
     try:
-        k3d_clusters = k3d_service.list_clusters()
+        k3d_clusters = await command_runner.run_blocking(k3d_service.list_clusters)
         if cluster_name in k3d_clusters:
             return "k3d"
     except Exception as e:
@@ -265,52 +353,29 @@ def detect_cluster_provider(cluster_name: str) -> str:
     
     # Sprawdź kind clusters
     try:
-        kind_result = run_kind_command(["get", "clusters"])
-        if kind_result["returncode"] == 0 and cluster_name in kind_result["stdout"]:
+        kind_result = await run_kind_command(["get", "clusters"])
+        if kind_result["returncode"] == 0 and cluster_name in warm_pool.visible_names(kind_result["stdout"].split()):
             return "kind"
     except Exception as e:
         print(f"Nie można sprawdzić klastrów Kind: {e}")
     
-    # Default to kind if unknown
-    return "kind"
+    return None
 
-def get_enhanced_node_info(cluster_name: str) -> dict:
+async def get_enhanced_node_info(cluster_name: str) -> dict:
     """Pobierz rozszerzone informacje o węzłach używając Docker stats"""
     try:
         # Najpierw pobierz nazwy węzłów
-        nodes_result = subprocess.run([
-            "kubectl", "get", "nodes", "--context", f"kind-{cluster_name}",
-            "-o", "json"
-        ], capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=5)
+        nodes_data = await kube_get_json(
+            f"kind-{cluster_name}", "/api/v1/nodes", ["get", "nodes"], timeout=5
+        )
         
-        if nodes_result.returncode != 0:
-            return get_basic_node_info(cluster_name)
+        if nodes_data is None:
+            return await get_basic_node_info(cluster_name)
         
-        # Parse JSON response
-        import json
-        nodes_data = json.loads(nodes_result.stdout)
         node_names = [item['metadata']['name'] for item in nodes_data['items']]
         
-      
-        if node_names:
-            docker_stats = subprocess.run([
-                "docker", "stats", "--no-stream", "--format", 
-                "{{.Container}}\t{{.CPUPerc}}\t{{.MemUsage}}\t{{.MemPerc}}"
-            ] + node_names, capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=5)
-            
-            # Parse stats
-            stats_map = {}
-            if docker_stats.returncode == 0:
-                lines = docker_stats.stdout.strip().split('\n')
-                for line in lines:
-                    parts = line.split('\t')
-                    if len(parts) >= 4:
-                        container_name = parts[0]
-                        stats_map[container_name] = {
-                            'cpu': parts[1],
-                            'memory': parts[2],
-                            'memory_percent': parts[3]
-                        }
+        # Najnowsze próbki ze strumienia docker stats (kontener węzła = nazwa węzła)
+        stats_map = await docker_stats.latest_many(node_names)
         
         nodes_info = []
         for node_name in node_names:
@@ -322,7 +387,7 @@ def get_enhanced_node_info(cluster_name: str) -> dict:
                 "role": role,
                 "cpu_usage": stats.get('cpu', 'N/A'),
                 "memory_usage": stats.get('memory', 'N/A'),
-                "memory_percent": stats.get('memory_percent', 'N/A'),
+                "memory_percent": stats.get('memory_percent_raw', 'N/A'),
                 "status": "Ready"
             }
             nodes_info.append(node_info)
@@ -336,14 +401,23 @@ def get_enhanced_node_info(cluster_name: str) -> dict:
         }
         
     except Exception as e:
-        return get_basic_node_info(cluster_name)
+        return await get_basic_node_info(cluster_name)
 
 async def get_cluster_details_async(cluster_name: str, include_resources: bool = True) -> dict:
-    """Asynchronicznie pobierz szczegóły klastra (Kind lub k3d)"""
-    loop = asyncio.get_event_loop()
-    
+    """Asynchronicznie pobierz szczegóły klastra (Kind lub k3d) - z cache"""
+    return await cluster_cache.get_or_load(
+        f"cluster_details:{cluster_name}:{include_resources}",
+        lambda: _fetch_cluster_details(cluster_name, include_resources),
+        ttl=_cache_ttl_full,
+        tags=(cluster_cache_tag(cluster_name),)
+    )
+
+async def _fetch_cluster_details(cluster_name: str, include_resources: bool) -> dict:
+    """Pobierz szczegóły klastra bez cache"""
     # Wykryj provider klastra
-    provider = detect_cluster_provider(cluster_name)
+    provider = await detect_cluster_provider(cluster_name)
+    if provider is None:
+        return {"name": cluster_name, "status": "not_found", "provider": None}
     
     cluster_info = {
         "name": cluster_name,
@@ -352,78 +426,60 @@ async def get_cluster_details_async(cluster_name: str, include_resources: bool =
         "provider": provider
     }
     
-    # Użyj ThreadPoolExecutor do wykonania operacji blokujących równolegle
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        # Sprawdź status klastra
-        async def check_status():
-            try:
-                result = await loop.run_in_executor(
-                    executor,
-                    lambda: subprocess.run([
-                        "kubectl", "get", "nodes", "--context", f"{provider}-{cluster_name}"
-                    ], capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=1)
-                )
-                
-                if result.returncode == 0:
-                    cluster_info["status"] = "ready"
-                    # Policz węzły
-                    nodes_lines = result.stdout.strip().split('\n')
-                    cluster_info["node_count"] = len(nodes_lines) - 1 if len(nodes_lines) > 1 else 0
-                else:
-                    cluster_info["status"] = "error"
-            except Exception as e:
+    # Sprawdź status klastra
+    async def check_status():
+        try:
+            nodes = await kube_informers.nodes(f"{provider}-{cluster_name}", wait=0.5, timeout=1)
+            
+            if nodes is not None:
+                cluster_info["status"] = "ready"
+                cluster_info["node_count"] = len(nodes)
+            else:
                 cluster_info["status"] = "error"
-                print(f"Error checking cluster {cluster_name}: {e}")
-        
-        # Sprawdź monitoring
-        async def check_monitoring():
-            try:
-                # Sprawdź oba pody w jednym wywołaniu
-                result = await loop.run_in_executor(
-                    executor,
-                    lambda: subprocess.run([
-                        "kubectl", "get", "pods", "--namespace", "monitoring",
-                        "--context", f"{provider}-{cluster_name}",
-                        "-l", "app.kubernetes.io/name in (prometheus,grafana)",
-                        "--no-headers"
-                    ], capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=1)
-                )
-                
-                # Sprawdź czy są oba pody (Prometheus i Grafana)
-                if result.returncode == 0:
-                    pods = result.stdout.strip().split('\n')
-                    has_prometheus = any('prometheus' in pod.lower() for pod in pods if pod.strip())
-                    has_grafana = any('grafana' in pod.lower() for pod in pods if pod.strip())
-                    cluster_info["monitoring"] = {"installed": bool(has_prometheus and has_grafana)}
-                else:
-                    cluster_info["monitoring"] = {"installed": False}
-            except Exception as e:
+        except Exception as e:
+            cluster_info["status"] = "error"
+            print(f"Error checking cluster {cluster_name}: {e}")
+    
+    # Sprawdź monitoring
+    async def check_monitoring():
+        try:
+            # Sprawdź oba pody w jednym wywołaniu
+            monitoring_pods = await kube_informers.monitoring_pods(f"{provider}-{cluster_name}", wait=0.5, timeout=1)
+            
+            # Sprawdź czy są oba pody (Prometheus i Grafana)
+            if monitoring_pods is not None:
+                pods = [
+                    item["metadata"]["name"] for item in monitoring_pods
+                    if item["metadata"].get("labels", {}).get("app.kubernetes.io/name") in ("prometheus", "grafana")
+                ]
+                has_prometheus = any('prometheus' in pod.lower() for pod in pods)
+                has_grafana = any('grafana' in pod.lower() for pod in pods)
+                cluster_info["monitoring"] = {"installed": bool(has_prometheus and has_grafana)}
+            else:
                 cluster_info["monitoring"] = {"installed": False}
-        
-        # Pobierz porty
-        async def get_ports():
-            cluster_ports = port_manager.get_cluster_ports(cluster_name)
-            if cluster_ports:
-                cluster_info["assigned_ports"] = cluster_ports
-        
-        # Pobierz zasoby (opcjonalnie - najwolniejsze)
-        async def get_resources():
-            if include_resources:
-                try:
-                    resources = await loop.run_in_executor(
-                        executor,
-                        lambda: get_enhanced_node_info(cluster_name)
-                    )
-                    cluster_info["resources"] = resources
-                except:
-                    cluster_info["resources"] = get_basic_node_info(cluster_name)
-        
-        # Uruchom wszystkie operacje równolegle
-        tasks = [check_status(), check_monitoring(), get_ports()]
+        except Exception as e:
+            cluster_info["monitoring"] = {"installed": False}
+    
+    # Pobierz porty
+    async def get_ports():
+        cluster_ports = port_manager.get_cluster_ports(cluster_name)
+        if cluster_ports:
+            cluster_info["assigned_ports"] = cluster_ports
+    
+    # Pobierz zasoby (opcjonalnie - najwolniejsze)
+    async def get_resources():
         if include_resources:
-            tasks.append(get_resources())
-        
-        await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                cluster_info["resources"] = await get_enhanced_node_info(cluster_name)
+            except:
+                cluster_info["resources"] = await get_basic_node_info(cluster_name)
+    
+    # Uruchom wszystkie operacje równolegle
+    tasks = [check_status(), check_monitoring(), get_ports()]
+    if include_resources:
+        tasks.append(get_resources())
+    
+    await asyncio.gather(*tasks, return_exceptions=True)
     
     return cluster_info
 
@@ -436,26 +492,36 @@ async def health():
 @app.post("/api/v1/cache/clear")
 async def clear_cache():
     """Wyczyść cache klastrów (użyj po usunięciu/dodaniu klastra)"""
-    _cluster_cache.clear()
+    cluster_cache.clear()
+    provider_cache.clear()
     return {"message": "Cache cleared successfully", "cleared": True}
 
+@app.get("/api/v1/cache/stats")
+async def cache_stats():
+    """Statystyki cache (trafienia/chybienia)"""
+    return {
+        "cluster_cache": cluster_cache.stats(),
+        "provider_cache": provider_cache.stats()
+    }
+
+@app.get("/api/v1/warm-pool")
+async def get_warm_pool():
+    """Stan puli gotowych klastrów kind (CLUSTERMASTER_WARM_POOL, np. "v1.29.2=2,default=1")"""
+    return warm_pool.stats()
+
+@app.get("/api/v1/debug/commands")
+async def debug_commands():
+    """Debug endpoint - kolejka i limity komend CLI oraz puli wątków"""
+    return command_runner.stats()
+
 @app.get("/api/v1/debug/docker")
 async def debug_docker():
     """Debug endpoint do sprawdzenia Docker"""
     try:
-        result = subprocess.run(["docker", "--version"], capture_output=True, text=True)
-        docker_version = {
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr
-        }
-        
-        result = subprocess.run(["docker", "ps"], capture_output=True, text=True)
-        docker_ps = {
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr
-        }
+        docker_version, docker_ps = await asyncio.gather(
+            command_runner.run(["docker", "--version"]),
+            command_runner.run(["docker", "ps"])
+        )
         
         return {
             "docker_version": docker_version,
@@ -468,6 +534,112 @@ async def debug_docker():
             "docker_available": False
         }
 
+@app.get("/api/v1/debug/inventory")
+async def debug_inventory():
+    """Debug endpoint - stan indeksu klastrów budowanego ze zdarzeń Dockera"""
+    return cluster_inventory.snapshot()
+
+# ===== Push zmian (SSE) =====
+
+async def collect_clusters_event_state() -> Optional[dict]:
+    """Klastry i stan ich kontenerów (tylko dane w pamięci - nic nie wysyłamy, zanim inwentarz się zsynchronizuje)"""
+    if not cluster_inventory.ready:
+        return None
+    state = {}
+    for name in cluster_inventory.list_names():
+        cluster = cluster_inventory.get(name)
+        state[name] = {
+            "provider": cluster["provider"],
+            "containers": {c["name"]: c["state"] for c in cluster["containers"].values()}
+        }
+    return state
+
+async def collect_nodes_event_state() -> dict:
+    """Gotowość węzłów z informerów (tylko dane w pamięci, bez kubectl)"""
+    state = {}
+    for name in cluster_inventory.list_names():
+        context = cluster_inventory.get(name)["context"]
+        nodes = kube_informers.get(context).nodes.items()
+        if nodes is None:
+            continue
+        state[name] = {
+            node["metadata"]["name"]: any(
+                c["type"] == "Ready" and c["status"] == "True"
+                for c in node.get("status", {}).get("conditions", [])
+            )
+            for node in nodes
+        }
+    return state
+
+async def collect_resources_event_state() -> dict:
+    """Najnowsze próbki CPU/RAM kontenerów węzłów"""
+    state = {}
+    for name in docker_stats.container_names():
+        cluster_name = cluster_inventory.find_container(name)
+        if not cluster_name:
+            continue
+        sample = docker_stats.latest(name)
+        state[name] = {
+            "cluster": cluster_name,
+            "cpu_percent": sample["cpu_percent"],
+            "memory_used_mb": sample["memory_used_mb"],
+            "memory_limit_mb": sample["memory_limit_mb"],
+            "memory_percent": sample["memory_percent"]
+        }
+    return state
+
+event_hub.add_source("clusters", collect_clusters_event_state)
+event_hub.add_source("nodes", collect_nodes_event_state)
+event_hub.add_source("resources", collect_resources_event_state)
+
+@app.get("/api/v1/events/stream")
+async def stream_events():
+    """Strumień SSE: snapshot, potem różnice klastrów, gotowości węzłów i zasobów"""
+    return StreamingResponse(
+        event_hub.subscribe(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ===== Zadania w tle =====
+
+@app.get("/api/v1/jobs")
+async def list_jobs(status: Optional[str] = None):
+    """Lista zadań (najnowsze pierwsze)"""
+    return {"jobs": job_manager.list(status), "stats": job_manager.stats()}
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Stan zadania: kroki, logi i wynik"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return {"error": f"Zadanie {job_id} nie istnieje", "job_id": job_id}
+    return job.to_dict()
+
+@app.get("/api/v1/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Strumień SSE postępu zadania (kończy się razem z zadaniem)"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return {"error": f"Zadanie {job_id} nie istnieje", "job_id": job_id}
+    return StreamingResponse(
+        job.events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/api/v1/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Anuluj zadanie oczekujące lub trwające"""
+    if not job_manager.cancel(job_id):
+        return {"error": f"Zadanie {job_id} nie istnieje lub już się zakończyło", "job_id": job_id}
+    return {"message": f"Zadanie {job_id} anulowane", "job_id": job_id}
+
+@app.get("/api/v1/debug/informers")
+async def debug_informers():
+    """Debug endpoint - stan informerów (list + watch) per kontekst"""
+    return kube_informers.stats()
+
 @app.get("/api/v1/debug/kind")
 async def debug_kind():
     """Debug endpoint do sprawdzenia Kind"""
@@ -480,7 +652,7 @@ async def debug_kind():
             "error": "Kind nie został znaleziony"
         }
     
-    result = run_kind_command(["version"])
+    result = await run_kind_command(["version"])
     
     return {
         "kind_found": True,
@@ -495,20 +667,7 @@ async def debug_kind():
 @app.get("/api/v1/local-cluster/list")
 async def list_clusters():
     """Lista klastrów Kind i k3d"""
-    all_clusters = []
-    
-    # Pobierz klastry Kind
-    kind_result = run_kind_command(["get", "clusters"])
-    if kind_result["returncode"] == 0 and kind_result["stdout"].strip():
-        kind_clusters = kind_result["stdout"].strip().split('\n')
-        all_clusters.extend(kind_clusters)
-    
-    # Pobierz klastry k3d
-    try:
-        k3d_clusters = k3d_service.list_clusters()
-        all_clusters.extend(k3d_clusters)
-    except Exception as e:
-        print(f"Error fetching k3d clusters: {e}")
+    all_clusters = await list_cluster_names()
     
     return {"clusters": all_clusters}
 
@@ -521,25 +680,16 @@ async def list_clusters_detailed(include_resources: bool = False):
     """
     
     # Sprawdź cache (osobny klucz dla wersji z/bez zasobów)
-    cache_key = f"clusters_list_resources_{include_resources}"
-    cached_data = get_from_cache(cache_key, use_fast_ttl=not include_resources)
-    if cached_data:
-        return cached_data
-    
-    cluster_names = []
-    
-    # Pobierz klastry Kind
-    kind_result = run_kind_command(["get", "clusters"])
-    if kind_result["returncode"] == 0 and kind_result["stdout"].strip():
-        kind_clusters = [name.strip() for name in kind_result["stdout"].strip().split('\n') if name.strip()]
-        cluster_names.extend(kind_clusters)
-    
-    # Pobierz klastry k3d
-    try:
-        k3d_clusters = k3d_service.list_clusters()
-        cluster_names.extend(k3d_clusters)
-    except Exception as e:
-        print(f"Error fetching k3d clusters: {e}")
+    return await cluster_cache.get_or_load(
+        f"clusters_list_resources_{include_resources}",
+        lambda: _collect_clusters_detailed(include_resources),
+        ttl=_cache_ttl_full if include_resources else _cache_ttl_fast,
+        tags=(CLUSTERS_LIST_TAG,)
+    )
+
+async def _collect_clusters_detailed(include_resources: bool) -> dict:
+    """Zbierz szczegóły wszystkich klastrów (wywoływane tylko przy chybieniu cache)"""
+    cluster_names = await list_cluster_names()
     
     if not cluster_names:
         return {"clusters": []}
@@ -560,16 +710,80 @@ async def list_clusters_detailed(include_resources: bool = False):
         for i, cluster in enumerate(detailed_clusters)
     ]
     
-    response = {"clusters": valid_clusters}
-    
-    # Zapisz w cache
-    set_in_cache(cache_key, response)
-    
-    return response
+    return {"clusters": valid_clusters}
 
 @app.post("/api/v1/local-cluster/create")
 async def create_cluster(cluster_data: dict):
     """Utwórz nowy klaster Kind lub k3d"""
+    return await run_create_cluster(cluster_data)
+
+@app.post("/api/v1/local-cluster/create-async")
+async def create_cluster_async(cluster_data: dict):
+    """Zleć utworzenie klastra w tle - zwraca od razu job_id"""
+    provider = cluster_data.get("provider", "kind")
+    if provider not in ["kind", "k3d"]:
+        return {"error": f"Nieznany provider: {provider}. Użyj 'kind' lub 'k3d'", "status": "error"}
+    
+    job = job_manager.submit(
+        "create_cluster", cluster_data,
+        lambda job: run_create_cluster(cluster_data, progress=job)
+    )
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "cluster_name": cluster_data.get("cluster_name", "test-cluster"),
+        "status_url": f"/api/v1/jobs/{job.id}",
+        "stream_url": f"/api/v1/jobs/{job.id}/stream"
+    }
+
+def enable_requested_autoscaling(cluster_name: str, cluster_data: dict, cluster_result: dict):
+    """Włącz autoskalowanie, jeśli podano enable_autoscaling (min_nodes/max_nodes = liczba workerów)"""
+    if not cluster_data.get("enable_autoscaling"):
+        return
+    try:
+        cluster_result["autoscaling"] = autoscaler.set_policy(cluster_name, {
+            "enabled": True,
+            "min_nodes": cluster_data.get("min_nodes"),
+            "max_nodes": cluster_data.get("max_nodes")
+        })
+    except ValueError as e:
+        cluster_result["autoscaling_error"] = str(e)
+
+async def create_kind_cluster(cluster_name: str, node_count: int, k8s_version: Optional[str],
+                              cluster_ports: dict, progress: JobProgress = no_progress) -> dict:
+    """Utwórz klaster kind (`kind create cluster`) - zwraca wynik komendy"""
+    # Utwórz konfigurację dla wielu węzłów
+    config_file = None
+    
+    args = ["create", "cluster", "--name", cluster_name]
+    
+    if node_count > 1:
+        config_file = create_kind_config(cluster_name, node_count, cluster_ports)
+        args.extend(["--config", config_file])
+    
+    # Dodaj wersję Kubernetes jeśli określona
+    if k8s_version:
+        args.extend(["--image", f"kindest/node:{k8s_version}"])
+    
+    # Utwórz klaster (może potrwać kilka minut dla wielu węzłami)
+    async with progress.step("create_cluster"):
+        progress.log(f"kind {' '.join(args)}")
+        try:
+            # kind wypisuje postęp na stderr - linie trafiają do logu zadania na bieżąco
+            result = await run_kind_command(args, timeout=600, long_running=True,  # 10 minut timeout
+                                            on_line=progress.log)
+        finally:
+            # Usuń plik konfiguracyjny
+            if config_file:
+                try:
+                    os.unlink(config_file)
+                except:
+                    pass
+    
+    return result
+
+async def run_create_cluster(cluster_data: dict, progress: JobProgress = no_progress) -> dict:
+    """Pipeline tworzenia klastra (sprawdzenie, porty, klaster, monitoring) z raportowaniem postępu"""
     cluster_name = cluster_data.get("cluster_name", "test-cluster")
     node_count = cluster_data.get("node_count", 1)
     k8s_version = cluster_data.get("k8s_version")
@@ -583,15 +797,19 @@ async def create_cluster(cluster_data: dict):
     # === K3D IMPLEMENTATION ===
     if provider == "k3d":
         # Sprawdź czy k3d jest zainstalowany
-        if not k3d_service.is_installed():
+        async with progress.step("check"):
+            k3d_installed = await command_runner.run_blocking(k3d_service.is_installed)
+            exists = k3d_installed and await cluster_exists(cluster_name, "k3d")
+        
+        if not k3d_installed:
             return {
                 "error": "k3d nie jest zainstalowany. Zainstaluj k3d: https://k3d.io/",
                 "status": "error"
             }
         
         # Sprawdź czy klaster już istnieje
-        existing_clusters = k3d_service.list_clusters()
-        if cluster_name in existing_clusters:
+        if exists:
+            progress.log(f"Klaster {cluster_name} już istnieje")
             return {
                 "message": f"Klaster {cluster_name} już istnieje",
                 "status": "exists",
@@ -602,7 +820,8 @@ async def create_cluster(cluster_data: dict):
         
         try:
             # Przypisz porty dla klastra
-            cluster_ports = port_manager.assign_ports_for_cluster(cluster_name)
+            async with progress.step("assign_ports"):
+                cluster_ports = port_manager.assign_ports_for_cluster(cluster_name)
             
             # k3d używa agents (worker nodes) i servers (control plane)
             # Dla uproszczenia: 1 server + (node_count - 1) agents
@@ -610,14 +829,20 @@ async def create_cluster(cluster_data: dict):
             agents = max(0, node_count - 1)
             
             # Utwórz klaster k3d
-            result = k3d_service.create_cluster(
-                cluster_name=cluster_name,
-                agents=agents,
-                servers=servers,
-                ports=cluster_ports
-            )
+            async with progress.step("create_cluster"):
+                progress.log(f"Tworzenie klastra k3d {cluster_name}: {servers} server + {agents} agents")
+                create_result = await command_runner.run(
+                    k3d_service.create_cluster_command(cluster_name, agents, servers, cluster_ports),
+                    timeout=600, long_running=True, on_line=progress.log
+                )
+            
+            if create_result["returncode"] == 0:
+                result = {"success": True, "message": f"Cluster {cluster_name} created successfully"}
+            else:
+                result = {"success": False, "error": f"Failed to create k3d cluster: {create_result['stderr']}"}
             
             if not result["success"]:
+                progress.log(f"Nie udało się utworzyć klastra k3d: {result.get('error', 'Unknown error')}")
                 return {
                     "error": f"Nie udało się utworzyć klastra k3d: {result.get('error', 'Unknown error')}",
                     "status": "error",
@@ -638,16 +863,21 @@ async def create_cluster(cluster_data: dict):
             }
             
             # Wyczyść cache
-            _cluster_cache.clear()
+            invalidate_cluster_cache(cluster_name)
+            provider_cache.set(cluster_name, "k3d")
+            cluster_inventory.mark_created(cluster_name, "k3d")
+            enable_requested_autoscaling(cluster_name, cluster_data, cluster_result)
             
             # Instalacja monitoringu jeśli zaznaczone
             if install_monitoring:
                 print(f"Installing monitoring for k3d cluster {cluster_name}...")
-                import time
-                time.sleep(15)
                 
                 try:
-                    monitoring_result = helm_service.install_monitoring_stack(cluster_name)
+                    async with progress.step("wait_nodes_ready"):
+                        if not await wait_for_nodes_ready(f"k3d-{cluster_name}", expected=node_count, timeout=300):
+                            progress.log("Węzły nie są jeszcze Ready - instalacja monitoringu mimo to")
+                    async with progress.step("install_monitoring"):
+                        monitoring_result = await command_runner.run_blocking_long(helm_service.install_monitoring_stack, cluster_name)
                     if monitoring_result.get("success"):
                         cluster_result["monitoring"] = "installed"
                         cluster_result["monitoring_info"] = monitoring_result.get("message", "")
@@ -665,8 +895,11 @@ async def create_cluster(cluster_data: dict):
     
     # === KIND IMPLEMENTATION (ORIGINAL) ===
     # Sprawdź czy klaster już istnieje
-    result = run_kind_command(["get", "clusters"])
-    if result["returncode"] == 0 and cluster_name in result["stdout"]:
+    async with progress.step("check"):
+        exists = await cluster_exists(cluster_name, "kind")
+    
+    if exists:
+        progress.log(f"Klaster {cluster_name} już istnieje")
         return {
             "message": f"Klaster {cluster_name} już istnieje", 
             "status": "exists",
@@ -677,37 +910,25 @@ async def create_cluster(cluster_data: dict):
     
     try:
         # Przypisz porty dla klastra przed utworzeniem
-        cluster_ports = port_manager.assign_ports_for_cluster(cluster_name)
-        
-        # Utwórz konfigurację dla wielu węzłów
-        config_file = None
-        
-        args = ["create", "cluster", "--name", cluster_name]
-        
-        if node_count > 1:
-            config_file = create_kind_config(cluster_name, node_count, cluster_ports)
-            args.extend(["--config", config_file])
-        
-        # Dodaj wersję Kubernetes jeśli określona
-        if k8s_version:
-            args.extend(["--image", f"kindest/node:{k8s_version}"])
+        async with progress.step("assign_ports"):
+            cluster_ports = port_manager.assign_ports_for_cluster(cluster_name)
         
-        # Utwórz klaster (może potrwać kilka minut dla wielu węzłami)
-        result = run_kind_command(args, timeout=600)  # 10 minut timeout
+        # Jednowęzłowy klaster można od razu wziąć z puli gotowych klastrów
+        pooled = None
+        if node_count == 1 and warm_pool.enabled:
+            async with progress.step("warm_pool"):
+                pooled = await warm_pool.acquire(cluster_name, k8s_version)
+            if pooled:
+                progress.log(f"Klaster wydany z puli ({pooled['pool_cluster']})")
         
-        # Usuń plik konfiguracyjny
-        if config_file:
-            import os
-            try:
-                os.unlink(config_file)
-            except:
-                pass
-        
-        if result["returncode"] != 0:
-            return {
-                "error": f"Nie udało się utworzyć klastra: {result['stderr']}",
-                "debug": result
-            }
+        if pooled is None:
+            result = await create_kind_cluster(cluster_name, node_count, k8s_version, cluster_ports, progress)
+            
+            if result["returncode"] != 0:
+                return {
+                    "error": f"Nie udało się utworzyć klastra: {result['stderr']}",
+                    "debug": result
+                }
         
         cluster_result = {
             "message": f"Klaster {cluster_name} został utworzony z {node_count} węzłami",
@@ -718,21 +939,28 @@ async def create_cluster(cluster_data: dict):
             "assigned_ports": cluster_ports,
             "provider": "kind"
         }
+        if pooled:
+            cluster_result["warm_pool"] = pooled
         
         # Wyczyść cache
-        _cluster_cache.clear()
+        invalidate_cluster_cache(cluster_name)
+        provider_cache.set(cluster_name, "kind")
+        cluster_inventory.mark_created(cluster_name, "kind")
+        enable_requested_autoscaling(cluster_name, cluster_data, cluster_result)
         
         # DODAJ INSTALACJĘ MONITORINGU JEŚLI ZAZNACZONE
         if install_monitoring:
             print(f"Installing monitoring for cluster {cluster_name}...")
             
-            # Poczekaj na gotowość klastra
-            import time
-            time.sleep(15)  # 15 sekund na inicjalizację
-            
             try:
-                # Zainstaluj monitoring
-                monitoring_result = helm_service.install_monitoring_stack(cluster_name)
+                async with progress.step("wait_nodes_ready"):
+                    # Poczekaj na gotowość węzłów (zamiast stałego opóźnienia)
+                    if not await wait_for_nodes_ready(f"kind-{cluster_name}", expected=node_count, timeout=300):
+                        progress.log("Węzły nie są jeszcze Ready - instalacja monitoringu mimo to")
+                
+                async with progress.step("install_monitoring"):
+                    # Zainstaluj monitoring
+                    monitoring_result = await command_runner.run_blocking_long(helm_service.install_monitoring_stack, cluster_name)
                 print(f"Monitoring result: {monitoring_result}")
                 
                 if monitoring_result.get("success"):
@@ -761,12 +989,154 @@ async def create_cluster(cluster_data: dict):
             "cluster_name": cluster_name
         }
 
+# ===== Operacje wsadowe =====
+
+# Szacunkowe zasoby zajmowane przez jeden węzeł kind/k3d podczas startu
+BATCH_CPUS_PER_NODE = 1
+BATCH_MEMORY_PER_NODE_MB = 1536
+
+async def get_docker_host_capacity() -> dict:
+    """CPU i pamięć hosta Dockera (z `docker info`, cache 60 s)"""
+    async def load():
+        result = await command_runner.run(["docker", "info", "--format", "{{json .}}"], timeout=15)
+        if result["returncode"] != 0:
+            return {"cpus": os.cpu_count() or 2, "memory_mb": None}
+        info = json.loads(result["stdout"])
+        return {
+            "cpus": info.get("NCPU") or os.cpu_count() or 2,
+            "memory_mb": (info.get("MemTotal") or 0) // (1024 * 1024) or None
+        }
+    
+    return await cluster_cache.get_or_load("docker_host_capacity", load, ttl=60, stale_ttl=0)
+
+async def batch_parallelism(requested: Optional[int], nodes_per_cluster: float) -> int:
+    """Ile operacji naraz: żądana wartość, ograniczona przez CPU/RAM hosta i CLUSTERMASTER_BATCH_PARALLELISM"""
+    capacity = await get_docker_host_capacity()
+    nodes_per_cluster = max(1.0, nodes_per_cluster)
+    
+    limit = max(1, int(capacity["cpus"] // (BATCH_CPUS_PER_NODE * nodes_per_cluster)))
+    if capacity["memory_mb"]:
+        limit = min(limit, max(1, int(capacity["memory_mb"] // (BATCH_MEMORY_PER_NODE_MB * nodes_per_cluster))))
+    
+    configured = os.environ.get("CLUSTERMASTER_BATCH_PARALLELISM")
+    if configured:
+        limit = min(limit, max(1, int(configured)))
+    if requested:
+        limit = min(limit, max(1, requested))
+    return limit
+
+def parse_positive_int(value, field: str) -> int:
+    """Liczba całkowita >= 1 z żądania (JSON może przysłać ją jako tekst) - ValueError z opisem pola"""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"Pole '{field}' musi być liczbą całkowitą")
+    try:
+        number = int(value.strip() if isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Pole '{field}' musi być liczbą całkowitą")
+    if number < 1:
+        raise ValueError(f"Pole '{field}' musi być większe od zera")
+    return number
+
+def parse_batch_parallelism(request: dict) -> Optional[int]:
+    value = request.get("parallelism")
+    return None if value is None else parse_positive_int(value, "parallelism")
+
+async def run_batch(items: list, operation, parallelism: int) -> list:
+    """Wykonaj operację dla każdego elementu równolegle (maks. `parallelism` naraz)"""
+    semaphore = asyncio.Semaphore(parallelism)
+    
+    async def run_one(item):
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                result = await operation(item)
+            except Exception as e:
+                result = {"error": str(e)}
+            return {
+                "success": "error" not in result,
+                "duration_seconds": round(time.monotonic() - started, 2),
+                "result": result
+            }
+    
+    return await asyncio.gather(*[run_one(item) for item in items])
+
+@app.post("/api/v1/local-cluster/batch/create")
+async def batch_create_clusters(request: dict):
+    """Utwórz wiele klastrów równolegle - każdy element zwraca własny wynik"""
+    specs = request.get("clusters")
+    if not isinstance(specs, list) or not specs:
+        return {"error": "Podaj listę klastrów w polu 'clusters'", "status": "error"}
+    try:
+        requested_parallelism = parse_batch_parallelism(request)
+    except ValueError as e:
+        return {"error": str(e), "status": "error"}
+    
+    names = [spec.get("cluster_name") if isinstance(spec, dict) else None for spec in specs]
+    given = [name for name in names if name is not None]
+    if any(not isinstance(name, str) or not name for name in given) or len(set(given)) != len(given):
+        return {"error": "Każdy klaster musi mieć unikalne 'cluster_name'", "status": "error"}
+    
+    # Błędne elementy dostają własny wynik z błędem, pozostałe są tworzone normalnie
+    valid, invalid = {}, {}
+    for index, spec in enumerate(specs):
+        if not isinstance(spec, dict) or not spec.get("cluster_name"):
+            invalid[index] = "Element listy 'clusters' musi być obiektem z 'cluster_name'"
+            continue
+        try:
+            valid[index] = {**spec, "node_count": parse_positive_int(spec.get("node_count", 1), "node_count")}
+        except ValueError as e:
+            invalid[index] = str(e)
+    
+    avg_nodes = sum(spec["node_count"] for spec in valid.values()) / len(valid) if valid else 1
+    parallelism = await batch_parallelism(requested_parallelism, avg_nodes)
+    
+    started = time.monotonic()
+    completed = dict(zip(valid, await run_batch(list(valid.values()), run_create_cluster, parallelism)))
+    for index, error in invalid.items():
+        completed[index] = {"success": False, "duration_seconds": 0.0, "result": {"error": error, "status": "error"}}
+    results = [completed[index] for index in range(len(specs))]
+    
+    return {
+        "results": [{"cluster_name": name, **result} for name, result in zip(names, results)],
+        "succeeded": len([r for r in results if r["success"]]),
+        "failed": len([r for r in results if not r["success"]]),
+        "parallelism": parallelism,
+        "duration_seconds": round(time.monotonic() - started, 2)
+    }
+
+@app.post("/api/v1/local-cluster/batch/delete")
+async def batch_delete_clusters(request: dict):
+    """Usuń wiele klastrów równolegle - każdy element zwraca własny wynik"""
+    names = request.get("cluster_names")
+    if not isinstance(names, list) or not names or not all(isinstance(name, str) and name for name in names):
+        return {"error": "Podaj listę nazw w polu 'cluster_names'", "status": "error"}
+    names = list(dict.fromkeys(names))
+    try:
+        requested_parallelism = parse_batch_parallelism(request)
+    except ValueError as e:
+        return {"error": str(e), "status": "error"}
+    
+    parallelism = await batch_parallelism(requested_parallelism, 1)
+    
+    started = time.monotonic()
+    results = await run_batch(names, delete_cluster, parallelism)
+    
+    return {
+        "results": [{"cluster_name": name, **result} for name, result in zip(names, results)],
+        "succeeded": len([r for r in results if r["success"]]),
+        "failed": len([r for r in results if not r["success"]]),
+        "parallelism": parallelism,
+        "duration_seconds": round(time.monotonic() - started, 2)
+    }
+
 @app.delete("/api/v1/local-cluster/{cluster_name}")
 async def delete_cluster(cluster_name: str):
     """Usuń klaster (Kind lub k3d)"""
     
     # Wykryj provider
-    provider = detect_cluster_provider(cluster_name)
+    provider = await detect_cluster_provider(cluster_name)
+    if provider is None:
+        return {"error": f"Klaster {cluster_name} nie istnieje", "cluster_name": cluster_name}
     
     # Najpierw wyczyść zasoby monitoringu
     cleanup_result = helm_service.cleanup_cluster_resources(cluster_name)
@@ -774,7 +1144,7 @@ async def delete_cluster(cluster_name: str):
     # Usuń klaster w zależności od providera
     if provider == "k3d":
         try:
-            success = k3d_service.delete_cluster(cluster_name)
+            success = await command_runner.run_blocking_long(k3d_service.delete_cluster, cluster_name)
             if not success:
                 return {
                     "error": f"Nie udało się usunąć klastra k3d: {cluster_name}",
@@ -786,7 +1156,10 @@ async def delete_cluster(cluster_name: str):
                 "provider": "k3d"
             }
     else:  # kind
-        result = run_kind_command(["delete", "cluster", "--name", cluster_name])
+        # Klaster wydany z puli ma w kind inną nazwę
+        result = await run_kind_command(
+            ["delete", "cluster", "--name", warm_pool.resolve(cluster_name)], timeout=120, long_running=True
+        )
         
         if result["returncode"] != 0:
             return {
@@ -794,9 +1167,14 @@ async def delete_cluster(cluster_name: str):
                 "debug": result,
                 "provider": "kind"
             }
+        
+        if warm_pool.release(cluster_name):
+            await warm_pool.delete_context(cluster_name)
     
     # Wyczyść cache
-    _cluster_cache.clear()
+    invalidate_cluster_cache(cluster_name)
+    provider_cache.invalidate(cluster_name)
+    cluster_inventory.mark_deleted(cluster_name)
     
     return {
         "message": f"Klaster {cluster_name} został usunięty",
@@ -807,33 +1185,25 @@ async def delete_cluster(cluster_name: str):
 @app.get("/api/v1/local-cluster/{cluster_name}/status")
 async def get_cluster_status(cluster_name: str):
     """Sprawdź status klastra (Kind lub k3d) - ulepszona wersja"""
+    return await cluster_cache.get_or_load(
+        f"cluster_status:{cluster_name}",
+        lambda: _fetch_cluster_status(cluster_name),
+        ttl=_cache_ttl_full,
+        tags=(cluster_cache_tag(cluster_name),)
+    )
+
+async def _fetch_cluster_status(cluster_name: str) -> dict:
+    """Pobierz status klastra bez cache"""
     # Wykryj provider
-    provider = detect_cluster_provider(cluster_name)
+    provider = await detect_cluster_provider(cluster_name)
     
     # Sprawdź czy klaster istnieje
-    if provider == "k3d":
-        try:
-            k3d_clusters = k3d_service.list_clusters()
-            if cluster_name not in k3d_clusters:
-                return {"error": "Klaster k3d nie istnieje", "cluster_name": cluster_name, "provider": "k3d"}
-        except Exception as e:
-            return {"error": f"Nie można sprawdzić listy klastrów k3d: {str(e)}", "provider": "k3d"}
-    else:  # kind
-        result = run_kind_command(["get", "clusters"])
-        
-        if result["returncode"] != 0:
-            return {"error": "Nie można sprawdzić listy klastrów Kind", "debug": result, "provider": "kind"}
-        
-        if cluster_name not in result["stdout"]:
-            return {"error": "Klaster Kind nie istnieje", "cluster_name": cluster_name, "provider": "kind"}
+    if provider is None:
+        return {"error": "Klaster nie istnieje", "cluster_name": cluster_name, "provider": None}
     
     try:
         # Sprawdź węzły
-        kubectl_result = subprocess.run([
-            "kubectl", "get", "nodes", 
-            "--context", f"{provider}-{cluster_name}",
-            "-o", "json"
-        ], capture_output=True, text=True, encoding='utf-8', errors='replace')
+        nodes = await kube_informers.nodes(f"{provider}-{cluster_name}", timeout=30)
         
         nodes_info = {
             "total_nodes": 0,
@@ -843,11 +1213,10 @@ async def get_cluster_status(cluster_name: str):
             "nodes": []
         }
         
-        if kubectl_result.returncode == 0:
-            nodes_data = json.loads(kubectl_result.stdout)
-            nodes_info["total_nodes"] = len(nodes_data.get("items", []))
+        if nodes is not None:
+            nodes_info["total_nodes"] = len(nodes)
             
-            for node in nodes_data.get("items", []):
+            for node in nodes:
                 node_name = node["metadata"]["name"]
                 roles = []
                 
@@ -877,11 +1246,11 @@ async def get_cluster_status(cluster_name: str):
         
         return {
             "cluster_name": cluster_name,
-            "status": "running" if kubectl_result.returncode == 0 else "error",
+            "status": "running" if nodes is not None else "error",
             "context": f"{provider}-{cluster_name}",
             "provider": provider,
             "nodes_info": nodes_info,
-            "kubectl_available": kubectl_result.returncode == 0
+            "kubectl_available": nodes is not None
         }
         
     except Exception as e:
@@ -899,25 +1268,27 @@ async def get_cluster_config(cluster_name: str):
     """Pobierz konfigurację klastra (Kind lub k3d)"""
     try:
         # Wykryj provider
-        provider = detect_cluster_provider(cluster_name)
+        provider = await detect_cluster_provider(cluster_name)
+        if provider is None:
+            return {"cluster_name": cluster_name, "error": "Klaster nie istnieje"}
         
         # Sprawdź kontenery Docker dla klastra
         if provider == "k3d":
             # k3d używa labelki k3d.cluster
-            docker_result = subprocess.run([
+            docker_result = await command_runner.run([
                 "docker", "ps", "--filter", f"label=k3d.cluster.name={cluster_name}",
                 "--format", "json"
-            ], capture_output=True, text=True)
+            ])
         else:  # kind
-            # Kind używa labelki io.x-k8s.kind.cluster
-            docker_result = subprocess.run([
-                "docker", "ps", "--filter", f"label=io.x-k8s.kind.cluster={cluster_name}",
+            # Kind używa labelki io.x-k8s.kind.cluster (z nazwą kind - klaster z warm poola ma inną)
+            docker_result = await command_runner.run([
+                "docker", "ps", "--filter", f"label=io.x-k8s.kind.cluster={warm_pool.resolve(cluster_name)}",
                 "--format", "json"
-            ], capture_output=True, text=True)
+            ])
         
         containers = []
-        if docker_result.returncode == 0:
-            for line in docker_result.stdout.strip().split('\n'):
+        if docker_result["returncode"] == 0:
+            for line in docker_result["stdout"].strip().split('\n'):
                 if line:
                     container = json.loads(line)
                     containers.append({
@@ -943,16 +1314,17 @@ async def get_cluster_config(cluster_name: str):
 @app.get("/api/v1/local-cluster/{cluster_name}/resources")
 async def get_cluster_resources(cluster_name: str):
     """Sprawdź zasoby klastra (Kind lub k3d) - CPU, RAM, storage"""
+    provider = None
     try:
         # Wykryj provider
-        provider = detect_cluster_provider(cluster_name)
+        provider = await detect_cluster_provider(cluster_name)
+        if provider is None:
+            return {"cluster_name": cluster_name, "provider": None, "error": "Klaster nie istnieje"}
         
         # Sprawdź węzły i ich zasoby
-        kubectl_result = subprocess.run([
-            "kubectl", "get", "nodes", 
-            "--context", f"{provider}-{cluster_name}",
-            "-o", "json"
-        ], capture_output=True, text=True, encoding='utf-8', errors='replace')
+        nodes_data = await kube_get_json(
+            f"{provider}-{cluster_name}", "/api/v1/nodes", ["get", "nodes"], timeout=30
+        )
         
         resources_info = {
             "cluster_name": cluster_name,
@@ -970,8 +1342,7 @@ async def get_cluster_resources(cluster_name: str):
             "nodes": []
         }
         
-        if kubectl_result.returncode == 0:
-            nodes_data = json.loads(kubectl_result.stdout)
+        if nodes_data is not None:
             total_cpu = 0
             total_memory_ki = 0
             allocatable_cpu = 0
@@ -1057,14 +1428,14 @@ async def get_cluster_resources(cluster_name: str):
         # Dodatkowo - sprawdź kontenery Docker (pomiń dla uproszczenia, bo nazwy kontenerów się różnią)
         # Można to dodać później jeśli potrzebne
         
-        resources_info["kubectl_available"] = kubectl_result.returncode == 0
+        resources_info["kubectl_available"] = nodes_data is not None
         
         return resources_info
         
     except Exception as e:
         return {
             "cluster_name": cluster_name,
-            "provider": detect_cluster_provider(cluster_name),
+            "provider": provider,
             "error": f"Nie można pobrać zasobów klastra: {str(e)}"
         }
 
@@ -1132,12 +1503,12 @@ async def create_cluster_with_monitoring(cluster_data: dict):
         return cluster_result
     
     try:
-        # Poczekaj chwilę aż klaster będzie gotowy
-        import asyncio
-        await asyncio.sleep(30)  # 30 sekund na inicjalizację
+        # Poczekaj aż węzły klastra będą Ready
+        provider = cluster_result.get("provider", "kind")
+        await wait_for_nodes_ready(f"{provider}-{cluster_name}", timeout=300)
         
         # Zainstaluj monitoring
-        monitoring_result = helm_service.install_monitoring_stack(cluster_name)
+        monitoring_result = await command_runner.run_blocking_long(helm_service.install_monitoring_stack, cluster_name)
         
         return {
             **cluster_result,
@@ -1156,7 +1527,7 @@ async def create_cluster_with_monitoring(cluster_data: dict):
 async def install_monitoring_endpoint(cluster_name: str):
     """Zainstaluj monitoring w istniejącym klastrze"""
     try:
-        result = helm_service.install_monitoring_stack(cluster_name)
+        result = await command_runner.run_blocking_long(helm_service.install_monitoring_stack, cluster_name)
         return {
             "cluster_name": cluster_name,
             **result
@@ -1174,27 +1545,19 @@ async def get_monitoring_status_endpoint(cluster_name: str):
         context = f"kind-{cluster_name}"
         
         # Sprawdź pody monitoringu
-        kubectl_result = subprocess.run([
-            "kubectl", "get", "pods", 
-            "--namespace", "monitoring",
-            "--context", context,
-            "-o", "json"
-        ], capture_output=True, text=True, encoding='utf-8', errors='replace')
+        pods = await kube_informers.monitoring_pods(context, timeout=30)
         
-        if kubectl_result.returncode != 0:
+        if pods is None:
             return {
                 "cluster_name": cluster_name,
                 "monitoring_installed": False,
                 "message": "Monitoring nie jest zainstalowany"
             }
         
-        import json
-        pods_data = json.loads(kubectl_result.stdout)
-        
-        prometheus_pods = len([p for p in pods_data.get("items", []) if "prometheus" in p["metadata"]["name"]])
-        grafana_pods = len([p for p in pods_data.get("items", []) if "grafana" in p["metadata"]["name"]])
-        running_pods = len([p for p in pods_data.get("items", []) if p["status"]["phase"] == "Running"])
-        total_pods = len(pods_data.get("items", []))
+        prometheus_pods = len([p for p in pods if "prometheus" in p["metadata"]["name"]])
+        grafana_pods = len([p for p in pods if "grafana" in p["metadata"]["name"]])
+        running_pods = len([p for p in pods if p["status"]["phase"] == "Running"])
+        total_pods = len(pods)
         
         return {
             "cluster_name": cluster_name,
@@ -1259,31 +1622,40 @@ async def get_cluster_ports_endpoint(cluster_name: str):
         }
 
 @app.post("/api/v1/monitoring/install-metrics-server/{cluster_name}")
-async def install_metrics_server(cluster_name: str):
-    """Zainstaluj metrics-server w klastrze do zbierania metryk CPU/RAM"""
+async def install_metrics_server(cluster_name: str, wait: bool = False):
+    """Zainstaluj metrics-server w klastrze do zbierania metryk CPU/RAM (wait=true czeka na rollout)"""
     try:
         context = f"kind-{cluster_name}"
         
         # Zainstaluj metrics-server
-        kubectl_result = subprocess.run([
+        kubectl_result = await command_runner.run([
             "kubectl", "apply", 
             "-f", "https://github.com/kubernetes-sigs/metrics-server/releases/latest/download/components.yaml",
             "--context", context
-        ], capture_output=True, text=True, encoding='utf-8', errors='replace')
+        ], timeout=120)
         
-        if kubectl_result.returncode != 0:
+        if kubectl_result["returncode"] != 0:
             return {
                 "success": False,
-                "error": f"Błąd instalacji metrics-server: {kubectl_result.stderr}"
+                "error": f"Błąd instalacji metrics-server: {kubectl_result['stderr']}"
             }
         
         # Patch metrics-server dla Kind (wyłącz TLS verification)
-        patch_result = subprocess.run([
+        patch_result = await command_runner.run([
             "kubectl", "patch", "deployment", "metrics-server",
             "-n", "kube-system",
             "--context", context,
             "-p", '{"spec":{"template":{"spec":{"containers":[{"name":"metrics-server","args":["--cert-dir=/tmp","--secure-port=4443","--kubelet-preferred-address-types=InternalIP,ExternalIP,Hostname","--kubelet-use-node-status-port","--metric-resolution=15s","--kubelet-insecure-tls"]}]}}}}'
-        ], capture_output=True, text=True, encoding='utf-8', errors='replace')
+        ])
+        
+        if wait:
+            ready = await wait_for_deployment(context, "kube-system", "metrics-server", timeout=180)
+            return {
+                "success": True,
+                "message": "Metrics-server zainstalowany pomyślnie",
+                "ready": ready,
+                "note": "Metrics-server działa" if ready else "Rollout nie zakończył się w 180 s - odśwież dane później"
+            }
         
         return {
             "success": True,
@@ -1300,9 +1672,12 @@ async def install_metrics_server(cluster_name: str):
 # BACKUP ENDPOINTS
 
 @app.post("/api/v1/backup/create/{cluster_name}")
-async def create_backup(cluster_name: str, backup_name: str = None):
-    """Utwórz backup klastra"""
-    result = backup_service.create_cluster_backup(cluster_name, backup_name)
+async def create_backup(cluster_name: str, backup_name: str = None, codec: str = "deflate",
+                        incremental: bool = False):
+    """Utwórz backup klastra (codec: deflate, gzip, lzma, zstd, store; incremental: tylko zmienione obiekty)"""
+    result = await command_runner.run_blocking_long(
+        backup_service.create_cluster_backup, cluster_name, backup_name, codec, incremental
+    )
     return result
 
 @app.post("/api/v1/backup/change-directory")
@@ -1316,38 +1691,49 @@ async def change_backup_directory(request: dict):
             "message": "Ścieżka do katalogu jest wymagana"
         }
     
-    result = backup_service.change_backup_directory(new_directory)
+    result = await command_runner.run_blocking(backup_service.change_backup_directory, new_directory)
     return result
 
 @app.get("/api/v1/backup/info")
 async def get_backup_info():
     """Pobierz informacje o katalogu backup"""
-    return backup_service.get_backup_directory_info()
+    return await command_runner.run_blocking(backup_service.get_backup_directory_info)
 
 @app.get("/api/v1/backup/list")
-async def list_backups():
-    """Lista wszystkich backupów"""
-    backups = backup_service.list_backups()
+async def list_backups(cluster_name: Optional[str] = None, sort_by: str = "created_at", order: str = "desc",
+                       limit: Optional[int] = None, offset: int = 0):
+    """Lista backupów z katalogu (filtr po klastrze, sortowanie, stronicowanie)"""
+    try:
+        page = await command_runner.run_blocking(
+            backup_service.query_backups, cluster_name, sort_by, order != "asc", limit, offset
+        )
+    except ValueError as e:
+        return {"success": False, "error": str(e)}
     return {
         "success": True,
-        "backups": backups,
-        "total_count": len(backups)
+        "backups": page["backups"],
+        "total_count": page["total_count"]
     }
 
 @app.get("/api/v1/backup/details/{backup_name}")
 async def get_backup_details(backup_name: str):
     """Pobierz szczegóły backupu"""
-    return backup_service.get_backup_details(backup_name)
+    return await command_runner.run_blocking(backup_service.get_backup_details, backup_name)
 
 @app.delete("/api/v1/backup/delete/{backup_name}")
 async def delete_backup(backup_name: str):
     """Usuń backup"""
-    return backup_service.delete_backup(backup_name)
+    return await command_runner.run_blocking(backup_service.delete_backup, backup_name)
 
 @app.post("/api/v1/backup/restore/{backup_name}")
 async def restore_backup(backup_name: str, new_cluster_name: str = None):
     """Przywróć klaster z backupu"""
-    result = backup_service.restore_cluster_backup(backup_name, new_cluster_name)
+    result = await command_runner.run_blocking_long(backup_service.restore_cluster_backup, backup_name, new_cluster_name)
+    if result.get("success") and result.get("cluster_name"):
+        # Przywracanie zawsze tworzy klaster Kind
+        provider_cache.set(result["cluster_name"], "kind")
+        cluster_inventory.mark_created(result["cluster_name"], "kind")
+        invalidate_cluster_cache(result["cluster_name"])
     return result
 
 @app.get("/api/v1/backup/download/{backup_name}")
@@ -1385,7 +1771,7 @@ class AppInstallRequest(BaseModel):
 async def install_app(cluster_name: str, app_data: AppInstallRequest):
     """Install application on cluster"""
     try:
-        result = app_service.install_app(cluster_name, app_data.dict())
+        result = await command_runner.run_blocking_long(app_service.install_app, cluster_name, app_data.dict())
         return result
     except Exception as e:
         return {
@@ -1397,7 +1783,7 @@ async def install_app(cluster_name: str, app_data: AppInstallRequest):
 async def get_installed_apps(cluster_name: str):
     """Get installed applications on cluster"""
     try:
-        result = app_service.get_installed_apps(cluster_name)
+        result = await command_runner.run_blocking(app_service.get_installed_apps, cluster_name)
         return result
     except Exception as e:
         return {
@@ -1409,7 +1795,7 @@ async def get_installed_apps(cluster_name: str):
 async def uninstall_app(cluster_name: str, app_name: str):
     """Uninstall application from cluster"""
     try:
-        result = app_service.uninstall_app(cluster_name, app_name)
+        result = await command_runner.run_blocking(app_service.uninstall_app, cluster_name, app_name)
         return result
     except Exception as e:
         return {
@@ -1428,7 +1814,7 @@ async def search_helm_charts(query: str, max_results: int = 20):
                 "charts": []
             }
         
-        result = app_service.search_helm_charts(query, max_results)
+        result = await command_runner.run_blocking(app_service.search_helm_charts, query, max_results)
         return result
         
     except Exception as e:
@@ -1472,11 +1858,13 @@ async def get_cluster_scaling_config(cluster_name: str):
     """Get current scaling configuration for Kind or k3d cluster"""
     try:
         # Detect provider
-        provider = detect_cluster_provider(cluster_name)
+        provider = await detect_cluster_provider(cluster_name)
+        if provider is None:
+            return {"success": False, "error": f"Cluster {cluster_name} not found"}
         
         # === K3D IMPLEMENTATION ===
         if provider == "k3d":
-            cluster_info = k3d_service.get_cluster_info(cluster_name)
+            cluster_info = await command_runner.run_blocking(k3d_service.get_cluster_info, cluster_name)
             
             if not cluster_info.get("success"):
                 return {
@@ -1503,14 +1891,11 @@ async def get_cluster_scaling_config(cluster_name: str):
         
         # === KIND IMPLEMENTATION (ORIGINAL) ===
         # Get all nodes for this cluster
-        result = subprocess.run(
-            ['kubectl', 'get', 'nodes', '--context', f'kind-{cluster_name}', '-o', 'json'],
-            capture_output=True,
-            text=True,
-            check=True
+        result = await command_runner.run_checked(
+            ['kubectl', 'get', 'nodes', '--context', f'kind-{cluster_name}', '-o', 'json']
         )
         
-        nodes_data = json.loads(result.stdout)
+        nodes_data = json.loads(result)
         nodes = nodes_data.get('items', [])
         
         # Separate control plane and worker nodes
@@ -1524,37 +1909,29 @@ async def get_cluster_scaling_config(cluster_name: str):
             else:
                 worker_count += 1
         
-        # Get Docker container info for a worker node to check resources
-        cpu_per_node = 2  # default
-        ram_per_node = 4096  # default in MB
+        # Limits of a worker container; 0 = unlimited (kind does not set any by default)
+        cpu_per_node = 0
+        ram_per_node = 0
         
         if worker_count > 0:
             # Find a worker node container
-            docker_result = subprocess.run(
-                ['docker', 'ps', '--filter', f'name={cluster_name}-worker', '--format', '{{.Names}}'],
-                capture_output=True,
-                text=True,
-                check=True
+            docker_result = await command_runner.run_checked(
+                ['docker', 'ps', '--filter', f'name={warm_pool.resolve(cluster_name)}-worker', '--format', '{{.Names}}']
             )
             
-            if docker_result.stdout.strip():
-                container_name = docker_result.stdout.strip().split('\n')[0]
+            if docker_result.strip():
+                container_name = docker_result.strip().split('\n')[0]
                 
                 # Get container info
-                inspect_result = subprocess.run(
-                    ['docker', 'inspect', container_name],
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
+                inspect_result = await command_runner.run_checked(['docker', 'inspect', container_name])
                 
-                container_info = json.loads(inspect_result.stdout)[0]
+                container_info = json.loads(inspect_result)[0]
                 host_config = container_info.get('HostConfig', {})
                 
                 # CPU (NanoCpus / 1e9)
                 nano_cpus = host_config.get('NanoCpus', 0)
                 if nano_cpus > 0:
-                    cpu_per_node = int(nano_cpus / 1e9)
+                    cpu_per_node = round(nano_cpus / 1e9, 2)
                 
                 # Memory in MB
                 memory = host_config.get('Memory', 0)
@@ -1571,7 +1948,7 @@ async def get_cluster_scaling_config(cluster_name: str):
                 "cpuPerNode": cpu_per_node,
                 "ramPerNode": ram_per_node
             },
-            "warning": "Kind requires cluster recreation for scaling changes"
+            "info": "Kind supports LIVE worker scaling without cluster recreation"
         }
         
     except subprocess.CalledProcessError as e:
@@ -1590,49 +1967,27 @@ async def get_cluster_scaling_config(cluster_name: str):
 async def get_cluster_resource_usage(cluster_name: str):
     """Get real-time CPU and RAM usage for cluster nodes"""
     try:
-        # Get Docker stats for all containers in this cluster
-        stats_result = subprocess.run(
-            ['docker', 'stats', '--no-stream', '--filter', f'name={cluster_name}', 
-             '--format', '{{.Name}}\t{{.CPUPerc}}\t{{.MemUsage}}\t{{.MemPerc}}'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+        # Latest samples from the shared docker stats stream for this cluster's containers
+        cluster = cluster_inventory.get(cluster_name) if cluster_inventory.ready else None
+        if cluster is not None:
+            samples = await docker_stats.latest_many(sorted(cluster["containers"]))
+        elif docker_stats.ready:
+            samples = {
+                name: docker_stats.latest(name)
+                for name in docker_stats.container_names() if cluster_name in name
+            }
+        else:
+            samples = {
+                name: sample for name, sample in (await docker_stats.read_once()).items()
+                if cluster_name in name
+            }
         
         nodes_usage = []
         total_cpu = 0.0
         total_mem_mb = 0.0
         
-        for line in stats_result.stdout.strip().split('\n'):
-            if not line:
-                continue
-                
-            parts = line.split('\t')
-            if len(parts) < 4:
-                continue
-                
-            name = parts[0]
-            cpu_str = parts[1].replace('%', '')
-            mem_usage = parts[2]  # e.g., "450.5MiB / 8GiB"
-            mem_percent = parts[3].replace('%', '')
-            
-            # Parse memory usage
-            mem_used_mb = 0
-            mem_limit_mb = 0
-            if '/' in mem_usage:
-                used, limit = mem_usage.split('/')
-                
-                # Parse used memory
-                if 'GiB' in used:
-                    mem_used_mb = float(used.replace('GiB', '').strip()) * 1024
-                elif 'MiB' in used:
-                    mem_used_mb = float(used.replace('MiB', '').strip())
-                
-                # Parse limit memory
-                if 'GiB' in limit:
-                    mem_limit_mb = float(limit.replace('GiB', '').strip()) * 1024
-                elif 'MiB' in limit:
-                    mem_limit_mb = float(limit.replace('MiB', '').strip())
+        for name in sorted(samples):
+            sample = samples[name]
             
             # Determine node type
             node_type = 'worker'
@@ -1642,14 +1997,14 @@ async def get_cluster_resource_usage(cluster_name: str):
             nodes_usage.append({
                 "name": name,
                 "type": node_type,
-                "cpu_percent": float(cpu_str) if cpu_str else 0.0,
-                "memory_used_mb": round(mem_used_mb, 2),
-                "memory_limit_mb": round(mem_limit_mb, 2),
-                "memory_percent": float(mem_percent) if mem_percent else 0.0
+                "cpu_percent": sample["cpu_percent"],
+                "memory_used_mb": sample["memory_used_mb"],
+                "memory_limit_mb": sample["memory_limit_mb"],
+                "memory_percent": sample["memory_percent"]
             })
             
-            total_cpu += float(cpu_str) if cpu_str else 0.0
-            total_mem_mb += mem_used_mb
+            total_cpu += sample["cpu_percent"]
+            total_mem_mb += sample["memory_used_mb"]
         
         # Calculate averages
         node_count = len(nodes_usage)
@@ -1666,54 +2021,197 @@ async def get_cluster_resource_usage(cluster_name: str):
             }
         }
         
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         return {
             "success": False,
-            "error": f"Failed to get resource usage: {e.stderr if e.stderr else str(e)}"
+            "error": str(e)
         }
-    except Exception as e:
+
+
+@app.get("/api/v1/clusters/{cluster_name}/autoscaling")
+async def get_cluster_autoscaling(cluster_name: str):
+    """Autoscaling policy of a cluster and its recent decisions"""
+    return {"success": True, "cluster_name": cluster_name, **autoscaler.status(cluster_name)}
+
+@app.put("/api/v1/clusters/{cluster_name}/autoscaling")
+async def update_cluster_autoscaling(cluster_name: str, policy: dict):
+    """
+    Update the autoscaling policy (enabled, min_nodes/max_nodes as worker counts,
+    CPU/memory thresholds, sustain window and cooldowns)
+    """
+    if await detect_cluster_provider(cluster_name) is None:
+        return {"success": False, "error": f"Cluster {cluster_name} not found"}
+    try:
+        updated = autoscaler.set_policy(cluster_name, policy)
+    except (ValueError, TypeError) as e:
+        return {"success": False, "error": str(e)}
+    return {"success": True, "cluster_name": cluster_name, "policy": updated}
+
+# One scaling operation per cluster at a time (manual ScaleView and the autoscaler share it)
+scaling_locks: Dict[str, asyncio.Lock] = {}
+
+def scaling_lock(cluster_name: str) -> asyncio.Lock:
+    lock = scaling_locks.get(cluster_name)
+    if lock is None:
+        lock = scaling_locks[cluster_name] = asyncio.Lock()
+    return lock
+
+def drop_scaling_lock(cluster_name: str):
+    lock = scaling_locks.get(cluster_name)
+    if lock is not None and not lock.locked():
+        del scaling_locks[cluster_name]
+
+cluster_inventory.on_removed(drop_scaling_lock)
+
+async def autoscale_cluster(cluster_name: str, target_workers: int) -> dict:
+    """Scale through the live scaling path without touching CPU/RAM limits"""
+    if scaling_lock(cluster_name).locked():
+        # The decision was made for the current size - let the running operation finish first
+        return {"success": False, "error": "Scaling already in progress"}
+    return await apply_cluster_scaling(cluster_name, {"workerNodes": target_workers})
+
+autoscaler.configure(autoscale_cluster, detect_cluster_provider)
+
+@app.get("/api/v1/clusters/{cluster_name}/scaling/resources/history")
+async def get_cluster_resource_history(cluster_name: str, seconds: int = 600, resolution: Optional[str] = None):
+    """Get CPU and RAM history for cluster nodes (columnar, 1s/10s/1m resolution)"""
+    try:
+        history = metrics_history.query(cluster_name, seconds=seconds, resolution=resolution)
+        return {
+            "success": True,
+            "cluster_name": cluster_name,
+            **history
+        }
+    except ValueError as e:
         return {
             "success": False,
             "error": str(e)
         }
 
 
+# How many k3d agents are created/deleted at the same time
+K3D_SCALE_PARALLELISM = int(os.environ.get("CLUSTERMASTER_K3D_SCALE_PARALLELISM", "4"))
+
+async def drain_for_scale_down(context: str, target_workers: int, operations: list) -> Optional[dict]:
+    """
+    Pick the workers that are cheapest to empty (fewest pods, no local data),
+    cordon them all and drain them in parallel before the provider removes them.
+    Returns None when the scaling does not remove nodes or the API is unreachable.
+    """
+    nodes = await kube_informers.nodes(context)
+    if nodes is None:
+        return None
+    workers = [node for node in nodes if not is_control_plane(node)]
+    if target_workers >= len(workers):
+        return None
+    
+    plan = await plan_scale_down(context, len(workers) - target_workers)
+    if not plan["success"]:
+        operations.append(f"⚠️ Could not plan scale-down: {plan['error']}")
+        return None
+    
+    for candidate in plan["candidates"][:len(plan["nodes"])]:
+        operations.append(
+            f"🧭 Selected {candidate['node']} ({candidate['pods_to_move']} pod(s) to move, cost {candidate['cost']})"
+        )
+    
+    drain = await cordon_and_drain(context, plan["nodes"])
+    for node_name, result in drain["nodes"].items():
+        if not result["drained"]:
+            operations.append(f"⚠️ Drain of {node_name} incomplete: {result['error']}")
+    operations.append(f"🚚 Cordoned and drained {len(plan['nodes'])} node(s) in {drain['drain_seconds']}s")
+    
+    return {"nodes": plan["nodes"], "started": drain["started"], "drain_seconds": drain["drain_seconds"],
+            "evicted_owners": drain["evicted_owners"]}
+
+def log_node_progress(cluster_name: str, event: dict):
+    """Live server log of the parallel k3d node operations (the response lists the results once all finish)"""
+    if event["status"] == "running":
+        print(f"Scaling {cluster_name}: {event['action']} {event['node']}...")
+    else:
+        print(f"Scaling {cluster_name}: {event['action']} {event['node']} {event['status']} in {event['seconds']}s"
+              + (f" ({event['error']})" if event.get("error") else ""))
+
+async def uncordon_leftovers(context: str, drained: Optional[dict], operations: list):
+    """Make drained nodes that the provider did not remove (failure or partial removal) schedulable again"""
+    if drained is None:
+        return
+    restored = await uncordon_remaining(context, drained["nodes"])
+    if restored:
+        operations.append(f"↩️ Uncordoned {len(restored)} drained node(s) that were not removed: {', '.join(restored)}")
+
+async def report_rescheduling(context: str, drained: Optional[dict], operations: list) -> Optional[float]:
+    """Wait until the pods evicted by a drain run elsewhere again and log how long rescheduling took"""
+    if drained is None:
+        return None
+    seconds = await wait_for_rescheduling(context, drained["started"], drained["evicted_owners"], drained["nodes"])
+    if seconds is None:
+        operations.append("⚠️ Some evicted pods were still not running 120s after the drain")
+    else:
+        operations.append(f"♻️ All evicted pods rescheduled {seconds}s after the drain started")
+    return seconds
+
 @app.post("/api/v1/clusters/{cluster_name}/scaling/apply")
 async def apply_cluster_scaling(cluster_name: str, scaling_config: dict):
     """
     Apply scaling changes to cluster.
-    Kind: Recreates cluster (data loss warning).
+    Kind: Live worker join/removal (kubeadm join, drain) plus docker CPU/RAM limits.
     k3d: Live node addition/removal without recreate!
+    Concurrent requests for the same cluster run one after another.
     """
+    async with scaling_lock(cluster_name):
+        return await scale_cluster_locked(cluster_name, scaling_config)
+
+async def scale_cluster_locked(cluster_name: str, scaling_config: dict) -> dict:
+    """Body of apply_cluster_scaling (caller holds the cluster's scaling lock)"""
     try:
         worker_nodes = scaling_config.get('workerNodes', 2)
-        cpu_per_node = scaling_config.get('cpuPerNode', 2)
-        ram_per_node = scaling_config.get('ramPerNode', 4096)
+        # Missing limits stay unchanged (None), an explicit 0 removes the limit
+        cpu_per_node = scaling_config.get('cpuPerNode')
+        ram_per_node = scaling_config.get('ramPerNode')
         
         operations = []
         
         # Detect provider
-        provider = detect_cluster_provider(cluster_name)
+        provider = await detect_cluster_provider(cluster_name)
+        if provider is None:
+            return {"success": False, "error": f"Cluster {cluster_name} not found", "operations": operations}
         
         # === K3D IMPLEMENTATION (LIVE SCALING!) ===
         if provider == "k3d":
             operations.append(f"🎯 Scaling k3d cluster '{cluster_name}' to {worker_nodes} agent nodes...")
             
-            # Use k3d's live scaling
-            scale_result = k3d_service.scale_cluster(cluster_name, worker_nodes)
+            # Move workloads off the cheapest agents first when scaling down
+            drained = await drain_for_scale_down(f"k3d-{cluster_name}", worker_nodes, operations)
+            
+            # Use k3d's live scaling (agents are added/removed in parallel)
+            try:
+                scale_result = await command_runner.run_blocking_long(
+                    k3d_service.scale_cluster, cluster_name, worker_nodes,
+                    max_parallel=K3D_SCALE_PARALLELISM,
+                    on_progress=lambda event: log_node_progress(cluster_name, event),
+                    nodes_to_remove=drained["nodes"] if drained else None
+                )
+            finally:
+                await uncordon_leftovers(f"k3d-{cluster_name}", drained, operations)
+            
+            # Add k3d operations to our log
+            operations.extend(scale_result.get("operations", []))
+            provider_cache.invalidate(cluster_name)
+            invalidate_cluster_cache(cluster_name)
             
             if not scale_result.get("success"):
                 return {
                     "success": False,
                     "error": scale_result.get("error", "Failed to scale k3d cluster"),
-                    "operations": operations
+                    "operations": operations,
+                    "nodes": scale_result.get("nodes", [])
                 }
             
-            # Add k3d operations to our log
-            operations.extend(scale_result.get("operations", []))
+            rescheduling_seconds = await report_rescheduling(f"k3d-{cluster_name}", drained, operations)
             
             # Get updated cluster info
-            cluster_info = k3d_service.get_cluster_info(cluster_name)
+            cluster_info = await command_runner.run_blocking(k3d_service.get_cluster_info, cluster_name)
             nodes = cluster_info.get("nodes", [])
             agent_count = sum(1 for n in nodes if n.get("role") == "agent")
             
@@ -1721,84 +2219,53 @@ async def apply_cluster_scaling(cluster_name: str, scaling_config: dict):
                 "success": True,
                 "message": f"✅ k3d cluster scaled to {agent_count} agent nodes (LIVE - no recreate!)",
                 "operations": operations,
+                "nodes": scale_result.get("nodes", []),
+                "rescheduling_seconds": rescheduling_seconds,
                 "provider": "k3d",
                 "info": "✨ k3d supports live scaling - your deployments are preserved!"
             }
         
-        # === KIND IMPLEMENTATION (RECREATE) ===
-        # Create new cluster configuration
-        config_data = {
-            "kind": "Cluster",
-            "apiVersion": "kind.x-k8s.io/v1alpha4",
-            "nodes": [
-                {"role": "control-plane"}
-            ]
-        }
+        # === KIND IMPLEMENTATION (LIVE SCALING) ===
+        operations.append(f"🎯 Scaling Kind cluster '{cluster_name}' to {worker_nodes} worker node(s)...")
         
-        # Add worker nodes
-        for i in range(worker_nodes):
-            config_data["nodes"].append({"role": "worker"})
-        
-        # Write config to temp file
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            config_path = f.name
+        # Move workloads off the cheapest workers first when scaling down
+        drained = await drain_for_scale_down(f"kind-{cluster_name}", worker_nodes, operations)
         
+        # Join new workers / remove surplus ones, then apply CPU/RAM limits
         try:
-            # Delete old cluster
-            operations.append("🗑️ Deleting old cluster...")
-            subprocess.run(
-                ['kind', 'delete', 'cluster', '--name', cluster_name],
-                capture_output=True,
-                text=True,
-                check=False  # Don't fail if cluster doesn't exist
-            )
-            
-            # Small delay to ensure cleanup
-            import time
-            time.sleep(2)
-            
-            # Invalidate cache
-            _cluster_cache.clear()
-            
-            # Create new cluster with updated config
-            operations.append(f"🚀 Creating cluster with {worker_nodes} worker node(s)...")
-            create_result = subprocess.run(
-                ['kind', 'create', 'cluster', '--name', cluster_name, '--config', config_path, '--wait', '60s'],
-                capture_output=True,
-                text=True,
-                check=True
+            scale_result = await command_runner.run_blocking_long(
+                kind_service.scale_workers, cluster_name, worker_nodes,
+                kind_name=warm_pool.resolve(cluster_name),
+                cpus=cpu_per_node,
+                memory_mb=ram_per_node,
+                nodes_to_remove=drained["nodes"] if drained else None
             )
-            
-            operations.append("✅ Cluster recreated successfully")
-            
-            # Wait for nodes to be fully ready
-            operations.append("⏳ Waiting for nodes to become ready...")
-            time.sleep(5)
-            
-            # Verify nodes
-            verify_result = subprocess.run(
-                ['kubectl', 'get', 'nodes', '--context', f'kind-{cluster_name}', '--no-headers'],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            node_count = len(verify_result.stdout.strip().split('\n'))
-            operations.append(f"📊 Cluster now has {node_count} total nodes (1 control-plane + {worker_nodes} workers)")
-            
         finally:
-            # Clean up temp file
-            if os.path.exists(config_path):
-                os.unlink(config_path)
+            await uncordon_leftovers(f"kind-{cluster_name}", drained, operations)
+        operations.extend(scale_result.get("operations", []))
+        provider_cache.invalidate(cluster_name)
+        invalidate_cluster_cache(cluster_name)
+        
+        if not scale_result.get("success"):
+            return {
+                "success": False,
+                "error": scale_result.get("error", "Failed to scale Kind cluster"),
+                "operations": operations
+            }
+        
+        # Wait for the joined nodes to become ready
+        operations.append("⏳ Waiting for nodes to become ready...")
+        if not await wait_for_nodes_ready(f"kind-{cluster_name}", expected=1 + worker_nodes, timeout=120):
+            operations.append("⚠️ Not all nodes reported Ready within 120s")
+        rescheduling_seconds = await report_rescheduling(f"kind-{cluster_name}", drained, operations)
         
         return {
             "success": True,
-            "message": f"Cluster successfully scaled to {worker_nodes} worker nodes",
+            "message": f"✅ Kind cluster scaled to {scale_result.get('current_workers')} worker nodes (LIVE - no recreate!)",
             "operations": operations,
             "provider": "kind",
-            "warning": "⚠️ Cluster was recreated - all previous deployments and data were reset"
+            "rescheduling_seconds": rescheduling_seconds,
+            "info": "✨ Workers are joined/removed in place - your deployments are preserved!"
         }
         
     except subprocess.CalledProcessError as e:
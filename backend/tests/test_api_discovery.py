@@ -0,0 +1,69 @@
+"""
+Testy odkrywania typów zasobów (CRD, podzasoby, cache per wersja serwera)
+"""
+from app.services import api_discovery as discovery_module
+from app.services.api_discovery import ApiDiscovery, parse_resources
+
+API_V1 = {"resources": [
+    {"name": "configmaps", "namespaced": True, "kind": "ConfigMap", "verbs": ["get", "list"]},
+    {"name": "pods/log", "namespaced": True, "kind": "Pod", "verbs": ["get"]},
+    {"name": "bindings", "namespaced": True, "kind": "Binding", "verbs": ["create"]},
+    {"name": "persistentvolumes", "namespaced": False, "kind": "PersistentVolume", "verbs": ["list"]},
+]}
+WIDGETS = {"resources": [
+    {"name": "widgets", "namespaced": True, "kind": "Widget", "verbs": ["list", "watch"]},
+]}
+
+
+def test_parse_resources_keeps_only_listable_types():
+    """Podzasoby i typy bez 'list' są pomijane, ścieżki zależą od grupy"""
+    resources = parse_resources("", "v1", API_V1)
+
+    assert [r["name"] for r in resources] == ["configmaps", "persistentvolumes"]
+    assert resources[1]["api_path"] == "/api/v1/persistentvolumes"
+    assert not resources[1]["namespaced"]
+    assert parse_resources("example.com", "v1alpha1", WIDGETS)[0]["api_path"] == "/apis/example.com/v1alpha1/widgets"
+
+
+APPS = {"resources": [
+    {"name": "deployments", "namespaced": True, "kind": "Deployment", "verbs": ["list"]},
+]}
+
+
+def test_group_resources_are_cached_per_server_version(monkeypatch):
+    """Grupy wbudowane są pobierane raz, grupy CRD przy każdym wywołaniu, nowa wersja serwera czyści cache"""
+    server = {"version": "v1.29.2"}
+    calls = []
+    responses = {
+        "/apis": {"groups": [
+            {"name": "apps", "preferredVersion": {"version": "v1"}},
+            {"name": "example.com", "preferredVersion": {"version": "v1alpha1"}},
+        ]},
+        "/api/v1": API_V1,
+        "/apis/apps/v1": APPS,
+        "/apis/example.com/v1alpha1": WIDGETS,
+    }
+
+    def fake_get(context, path, kubectl_args, timeout=60):
+        calls.append(path)
+        return {"gitVersion": server["version"]} if path == "/version" else responses[path]
+
+    monkeypatch.setattr(discovery_module, "kube_get_json_sync", fake_get)
+    discovery = ApiDiscovery()
+
+    first = discovery.listable_resources("kind-test")
+    calls.clear()
+    assert discovery.listable_resources("kind-test") == first
+    assert sorted(calls) == ["/apis", "/apis/example.com/v1alpha1", "/version"]
+
+    # Nowy CRD w już znanej grupie/wersji
+    responses["/apis/example.com/v1alpha1"] = {"resources": WIDGETS["resources"] + [
+        {"name": "gadgets", "namespaced": False, "kind": "Gadget", "verbs": ["list"]},
+    ]}
+    assert [r["name"] for r in discovery.listable_resources("kind-test")][-2:] == ["widgets", "gadgets"]
+
+    server["version"] = "v1.30.0"
+    calls.clear()
+    assert [r["name"] for r in discovery.listable_resources("kind-test")] == \
+        ["configmaps", "persistentvolumes", "deployments", "widgets", "gadgets"]
+    assert "/api/v1" in calls
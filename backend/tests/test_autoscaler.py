@@ -0,0 +1,40 @@
+"""
+Testy decyzji autoskalera (progi, histereza, okresy wyciszenia)
+"""
+import pytest
+
+from app.services.autoscaler import DEFAULT_POLICY, decide, normalize_policy
+
+
+def policy(**overrides):
+    return {**DEFAULT_POLICY, "enabled": True, "min_nodes": 1, "max_nodes": 4, **overrides}
+
+
+def test_scales_up_on_pending_pods_or_high_load():
+    """Niemożliwe do umieszczenia pody lub wysokie CPU dodają jeden węzeł"""
+    assert decide(policy(), 2, 3, 10.0, 10.0, 1000)[0] == 3
+    assert decide(policy(), 2, 0, 90.0, 10.0, 1000)[0] == 3
+    assert decide(policy(), 4, 3, 90.0, 10.0, 1000) == (None, "at max_nodes")
+
+
+def test_hysteresis_and_cooldowns():
+    """Między progami nic się nie dzieje, a po skalowaniu obowiązuje wyciszenie"""
+    assert decide(policy(), 2, 0, 50.0, 50.0, 1000) == (None, "within thresholds")
+    assert decide(policy(), 2, 0, 10.0, 10.0, 1000)[0] == 1
+    assert decide(policy(), 2, 0, 10.0, 10.0, 120) == (None, "scale-down cooldown")
+    assert decide(policy(), 2, 0, 90.0, 10.0, 30) == (None, "scale-up cooldown")
+    # Brak danych o pamięci - bez zmniejszania
+    assert decide(policy(), 2, 0, 10.0, None, 1000)[0] is None
+
+
+def test_policy_validation():
+    """Niepoprawne zakresy są odrzucane"""
+    with pytest.raises(ValueError):
+        normalize_policy({"min_nodes": 3, "max_nodes": 2})
+    with pytest.raises(ValueError):
+        normalize_policy({"scale_down_cpu_percent": 80})
+    assert normalize_policy({"max_nodes": "5"})["max_nodes"] == 5
+    assert normalize_policy({"enabled": "false"})["enabled"] is False
+    assert normalize_policy({"enabled": "true"})["enabled"] is True
+    with pytest.raises(ValueError):
+        normalize_policy({"enabled": "maybe"})
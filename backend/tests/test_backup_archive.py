@@ -0,0 +1,105 @@
+"""
+Testy strumieniowego zapisu archiwum backupu
+"""
+import io
+import zipfile
+
+import pytest
+
+from app.services.backup_archive import CHUNK_SIZE, CODECS, ZipStreamSink, extract_archive
+
+
+def test_entries_are_streamed_into_archive(tmp_path):
+    """Wpisy (także większe niż jeden fragment) trafiają do ZIP dopiero po commit"""
+    payload = bytes(range(256)) * (CHUNK_SIZE // 128)
+    output = tmp_path / "backup.zip"
+
+    with ZipStreamSink(output, "store") as sink:
+        sink.write_text("a.yaml", "kind: ConfigMap\n")
+        assert sink.write_stream("etcd.db", io.BytesIO(payload)) == len(payload)
+        sink.write_text("empty.json", "")
+        assert not output.exists()
+
+    with zipfile.ZipFile(output) as zipf:
+        assert zipf.namelist() == ["a.yaml", "etcd.db", "empty.json"]
+        assert zipf.read("etcd.db") == payload
+        assert zipf.testzip() is None
+    assert list(tmp_path.iterdir()) == [output]
+
+
+@pytest.mark.parametrize("codec", sorted(CODECS))
+def test_codecs_round_trip_through_extract(tmp_path, codec):
+    """Fragmenty kompresowane niezależnie rozpakowują się do oryginalnej treści"""
+    payload = b"apiVersion: v1\nkind: ConfigMap\n" * (CHUNK_SIZE // 10)
+    output = tmp_path / "backup.zip"
+
+    with ZipStreamSink(output, codec, workers=4) as sink:
+        sink.write_bytes("big.yaml", payload)
+        sink.write_text("empty.yaml", "")
+        sink.write_text("backup_manifest.json", "{}", compress=False)
+
+    with zipfile.ZipFile(output) as zipf:
+        assert "backup_manifest.json" in zipf.namelist()
+        if codec != "store":
+            assert zipf.getinfo("big.yaml" + CODECS[codec].suffix).compress_size < len(payload)
+
+    target = tmp_path / "out"
+    target.mkdir()
+    extract_archive(output, target, codec)
+    assert (target / "big.yaml").read_bytes() == payload
+    assert (target / "empty.yaml").read_bytes() == b""
+    assert (target / "backup_manifest.json").read_text() == "{}"
+
+
+def test_default_codec_writes_plain_zip_entries(tmp_path):
+    """Domyślny deflate to zwykłe wpisy ZIP_DEFLATED - archiwum otworzy każdy unzip"""
+    payload = b"kind: ConfigMap\n" * 1000
+    output = tmp_path / "backup.zip"
+
+    with ZipStreamSink(output) as sink:
+        sink.write_bytes("a.yaml", payload)
+        sink.write_text("backup_manifest.json", "{}", compress=False)
+
+    with zipfile.ZipFile(output) as zipf:
+        assert zipf.namelist() == ["a.yaml", "backup_manifest.json"]
+        assert zipf.getinfo("a.yaml").compress_type == zipfile.ZIP_DEFLATED
+        assert zipf.getinfo("backup_manifest.json").compress_type == zipfile.ZIP_STORED
+        assert zipf.read("a.yaml") == payload
+
+
+def test_legacy_deflate_archives_still_extract(tmp_path):
+    """Archiwa w wersji 1 trzymały deflate jako ramki .gz"""
+    payload = b"kind: Secret\n" * 1000
+    output = tmp_path / "backup.zip"
+    with ZipStreamSink(output, "gzip") as sink:
+        sink.write_bytes("a.yaml", payload)
+
+    target = tmp_path / "out"
+    target.mkdir()
+    extract_archive(output, target, "deflate", archive_version=1)
+    assert (target / "a.yaml").read_bytes() == payload
+
+
+def test_failed_backup_leaves_no_archive(tmp_path):
+    """Błąd w trakcie eksportu usuwa częściowy plik"""
+    with pytest.raises(RuntimeError):
+        with ZipStreamSink(tmp_path / "backup.zip") as sink:
+            sink.write_text("a.yaml", "kind: ConfigMap\n")
+            raise RuntimeError("export failed")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rejected_stream_is_dropped_from_archive(tmp_path):
+    """Strumień odrzucony po zakończeniu (np. błąd procesu) nie zostawia uciętego wpisu"""
+    output = tmp_path / "backup.zip"
+
+    with ZipStreamSink(output, "store") as sink:
+        sink.write_text("a.yaml", "kind: ConfigMap\n")
+        assert sink.write_stream("etcd.db", io.BytesIO(b"x" * (CHUNK_SIZE * 2)), keep=lambda total: False) == 0
+        sink.write_text("b.yaml", "kind: Secret\n")
+
+    with zipfile.ZipFile(output) as zipf:
+        assert zipf.namelist() == ["a.yaml", "b.yaml"]
+        assert zipf.testzip() is None
+    assert output.stat().st_size < CHUNK_SIZE
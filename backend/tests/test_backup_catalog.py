@@ -0,0 +1,79 @@
+"""
+Testy katalogu backupów (indeks SQLite zamiast otwierania każdego archiwum)
+"""
+import os
+
+from app.services.backup_catalog import BackupCatalog
+
+
+def write_backup(directory, name, cluster):
+    (directory / f"{name}.zip").write_bytes(b"zip")
+    return {"backup_name": name, "cluster_name": cluster, "created_at": f"2026-01-01T00:00:0{name[-1]}"}
+
+
+def test_reconcile_reads_only_new_archives(tmp_path):
+    """Manifesty są czytane tylko dla nowych plików, zniknięte pliki wypadają z indeksu"""
+    infos = {name: write_backup(tmp_path, name, cluster) for name, cluster in
+             [("b1", "alpha"), ("b2", "beta"), ("b3", "alpha")]}
+    read = []
+
+    def read_info(path):
+        read.append(path.stem)
+        return infos[path.stem]
+
+    catalog = BackupCatalog(tmp_path)
+    assert catalog.reconcile(read_info)
+    assert sorted(read) == ["b1", "b2", "b3"]
+    assert not catalog.reconcile(read_info)
+
+    read.clear()
+    infos["b4"] = write_backup(tmp_path, "b4", "beta")
+    os.remove(tmp_path / "b1.zip")
+    catalog.reconcile(read_info)
+    assert read == ["b4"]
+    assert catalog.summary()["total_backups"] == 3
+
+
+def test_query_filters_sorts_and_pages(tmp_path):
+    """Filtr po klastrze, sortowanie i stronicowanie z całkowitą liczbą wyników"""
+    infos = {name: write_backup(tmp_path, name, cluster) for name, cluster in
+             [("b1", "alpha"), ("b2", "beta"), ("b3", "alpha"), ("b4", "alpha")]}
+    catalog = BackupCatalog(tmp_path)
+    catalog.reconcile(lambda path: infos[path.stem])
+
+    page = catalog.query("alpha", limit=2, offset=1)
+    assert page["total_count"] == 3
+    assert [b["backup_name"] for b in page["backups"]] == ["b3", "b1"]
+    assert [b["backup_name"] for b in catalog.query(sort_by="backup_name", descending=False)["backups"]] == \
+        ["b1", "b2", "b3", "b4"]
+
+
+def test_remove_returns_chunks_no_longer_referenced(tmp_path):
+    """Usunięcie backupu zwraca tylko fragmenty, których nie używa żaden inny"""
+    catalog = BackupCatalog(tmp_path)
+    for name, chunks in [("b1", ["a", "b"]), ("b2", ["b", "c"]), ("b3", [])]:
+        info = write_backup(tmp_path, name, "alpha")
+        catalog.upsert(tmp_path / f"{name}.zip", {**info, "chunks": chunks})
+
+    assert catalog.remove("b3") == []
+    assert catalog.remove("b1") == ["a"]
+    assert sorted(catalog.remove("b2")) == ["b", "c"]
+
+
+def test_remove_keeps_chunks_when_an_archive_is_unreadable(tmp_path):
+    """Archiwum bez znanych odwołań (np. uszkodzony manifest) blokuje usuwanie fragmentów"""
+    catalog = BackupCatalog(tmp_path)
+    catalog.upsert(tmp_path / "b1.zip", {**write_backup(tmp_path, "b1", "alpha"), "chunks": ["a"]})
+    catalog.upsert(tmp_path / "b2.zip", {**write_backup(tmp_path, "b2", "alpha"), "error": "Could not read manifest"})
+
+    assert catalog.remove("b1") is None
+
+
+def test_unreferenced_skips_chunks_indexed_meanwhile(tmp_path):
+    """Ponowne sprawdzenie pomija fragmenty, do których odwołuje się nowo zindeksowane archiwum"""
+    catalog = BackupCatalog(tmp_path)
+    catalog.upsert(tmp_path / "b1.zip", {**write_backup(tmp_path, "b1", "alpha"), "chunks": ["a", "b"]})
+    orphaned = catalog.remove("b1")
+    catalog.upsert(tmp_path / "b2.zip", {**write_backup(tmp_path, "b2", "alpha"), "chunks": ["b"]})
+
+    assert catalog.unreferenced(orphaned) == ["a"]
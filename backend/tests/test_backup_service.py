@@ -0,0 +1,29 @@
+"""
+Testy usuwania backupów przyrostowych i sprzątania fragmentów
+"""
+import json
+import zipfile
+
+from app.services.backup_service import BackupService
+
+
+def write_incremental_backup(service, name, chunks):
+    manifest = {"backup_name": name, "cluster_name": "alpha", "backup_mode": "incremental",
+                "resources": [{"type": "configmaps", "namespace": "default", "chunks": chunks}]}
+    with zipfile.ZipFile(service.backup_dir / f"{name}.zip", "w") as zipf:
+        zipf.writestr("backup_manifest.json", json.dumps(manifest))
+
+
+def test_delete_keeps_chunks_of_backups_in_progress(tmp_path):
+    """Fragmenty backupu, który jeszcze nie trafił do katalogu, nie są usuwane"""
+    service = BackupService(str(tmp_path))
+    shared, _ = service.chunk_store.put(b"kind: ConfigMap\n")
+    own, _ = service.chunk_store.put(b"kind: Secret\n")
+    write_incremental_backup(service, "b1", [shared, own])
+    service._pending_chunks["b2"] = {shared}
+
+    result = service.delete_backup("b1")
+
+    assert result["chunk_gc"]["removed_chunks"] == 1
+    assert service.chunk_store.path(shared).exists()
+    assert not service.chunk_store.path(own).exists()
@@ -0,0 +1,30 @@
+"""
+Testy magazynu fragmentów dla backupów przyrostowych
+"""
+from app.services.chunk_store import ChunkStore
+
+
+def test_identical_objects_are_stored_once(tmp_path):
+    """Ten sam obiekt daje ten sam skrót i nie zajmuje miejsca drugi raz"""
+    store = ChunkStore(tmp_path / "chunks")
+
+    digest, added = store.put(b"kind: ConfigMap\n")
+    assert added > 0
+    assert store.put(b"kind: ConfigMap\n") == (digest, 0)
+    assert store.get(digest) == b"kind: ConfigMap\n"
+    assert store.stats()["chunks"] == 1
+
+
+def test_stats_are_kept_without_rescanning(tmp_path):
+    """Statystyki liczone raz (bez plików tymczasowych), potem aktualizowane przy put/remove"""
+    ChunkStore(tmp_path / "chunks").put(b"a")
+    (tmp_path / "chunks" / "ab").mkdir()
+    (tmp_path / "chunks" / "ab" / "ab12.1.2.tmp").write_bytes(b"partial")
+
+    store = ChunkStore(tmp_path / "chunks")
+    assert store.stats()["chunks"] == 1
+
+    digest, _ = store.put(b"b")
+    assert store.stats()["chunks"] == 2
+    store.remove([digest])
+    assert store.stats()["chunks"] == 1
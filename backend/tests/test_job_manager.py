@@ -0,0 +1,83 @@
+"""
+Testy kolejki zadań w tle (tworzenie klastrów)
+"""
+import asyncio
+
+from app.services.job_manager import JobManager
+
+
+def test_job_reports_steps_and_result():
+    """Zadanie przechodzi przez kroki i kończy się wynikiem pipeline'u"""
+    manager = JobManager(max_workers=1)
+
+    async def pipeline(job):
+        async with job.step("create_cluster"):
+            job.log("tworzenie")
+            await asyncio.sleep(0)
+        return {"status": "success"}
+
+    async def run():
+        job = manager.submit("create_cluster", {"cluster_name": "dev"}, pipeline)
+        assert job.status == "queued"
+        while not job.finished:
+            await asyncio.sleep(0.01)
+        await manager.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job.status == "succeeded"
+    assert job.result == {"status": "success"}
+    assert [step["status"] for step in job.steps] == ["succeeded"]
+    assert any(entry["message"] == "tworzenie" for entry in job.logs)
+
+
+def test_error_result_marks_job_failed():
+    """Słownik z kluczem "error" (konwencja endpointów) oznacza niepowodzenie"""
+    manager = JobManager(max_workers=1)
+
+    async def pipeline(job):
+        return {"error": "kind nie jest zainstalowany"}
+
+    async def run():
+        job = manager.submit("create_cluster", {}, pipeline)
+        while not job.finished:
+            await asyncio.sleep(0.01)
+        await manager.stop()
+        return job
+
+    job = asyncio.run(run())
+
+    assert job.status == "failed"
+    assert job.error == "kind nie jest zainstalowany"
+
+
+def test_workers_limit_concurrency_and_queued_jobs_can_be_cancelled():
+    """Przy jednym workerze drugie zadanie czeka w kolejce i można je anulować"""
+    manager = JobManager(max_workers=1)
+    release = None
+
+    async def slow(job):
+        await release.wait()
+        return {"status": "success"}
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        first = manager.submit("create_cluster", {}, slow)
+        second = manager.submit("create_cluster", {}, slow)
+        await asyncio.sleep(0.05)
+        assert first.status == "running"
+        assert second.status == "queued"
+
+        assert manager.cancel(second.id)
+        release.set()
+        while not first.finished:
+            await asyncio.sleep(0.01)
+        await manager.stop()
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first.status == "succeeded"
+    assert second.status == "cancelled"
@@ -0,0 +1,69 @@
+"""
+Testy limitów CPU/RAM workerów kind (None - bez zmian, 0 - zdjęcie limitu)
+"""
+import json
+import subprocess
+
+from app.services import kind_service as kind_module
+from app.services.kind_service import KindService
+
+WORKERS = ["test-worker", "test-worker2"]
+LIMITED = {"NanoCpus": 2_000_000_000, "Memory": 4096 * 1024 * 1024}
+
+
+def fake_docker(calls):
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        if cmd[:2] == ["docker", "ps"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="\n".join(WORKERS), stderr="")
+        if cmd[:2] == ["docker", "inspect"]:
+            info = [{"Name": f"/{name}", "HostConfig": LIMITED} for name in cmd[2:]]
+            return subprocess.CompletedProcess(cmd, 0, stdout=json.dumps(info), stderr="")
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+    return run
+
+
+def test_missing_limits_leave_workers_unchanged(monkeypatch):
+    """Brak cpus/memory_mb nie uruchamia żadnego `docker update`"""
+    calls = []
+    monkeypatch.setattr(kind_module.subprocess, "run", fake_docker(calls))
+
+    result = KindService().update_resources("test")
+
+    assert result == {"success": True, "updated": [], "unchanged": [], "failed": {}}
+    assert calls == []
+
+
+def test_zero_limits_are_cleared(monkeypatch):
+    """Jawne 0 zdejmuje limity CPU i pamięci (razem ze swapem)"""
+    calls = []
+    monkeypatch.setattr(kind_module.subprocess, "run", fake_docker(calls))
+
+    result = KindService().update_resources("test", cpus=0, memory_mb=0)
+
+    assert result["updated"] == WORKERS
+    updates = [cmd for cmd in calls if cmd[:2] == ["docker", "update"]]
+    assert updates == [
+        ["docker", "update", "--cpus", "0", "--memory", "0", "--memory-swap", "-1", name] for name in WORKERS
+    ]
+
+
+def test_failed_node_delete_is_reported(monkeypatch):
+    """Błąd `kubectl delete node` trafia do operacji, a kontener i tak jest usuwany"""
+    calls = []
+
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        if cmd[:3] == ["kubectl", "delete", "node"]:
+            return subprocess.CompletedProcess(cmd, 1, stdout="", stderr="Unable to connect to the server")
+        return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(kind_module.subprocess, "run", run)
+
+    result = KindService().remove_worker("test", "test-worker2", drain=False)
+
+    assert result["success"]
+    assert result["operations"] == [
+        "⚠️ Could not delete node test-worker2 from the API: Unable to connect to the server"
+    ]
+    assert calls[-1][:3] == ["docker", "rm", "-f"]
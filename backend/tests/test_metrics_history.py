@@ -0,0 +1,50 @@
+"""
+Testy historii zasobów węzłów (bufory cykliczne z downsamplingiem)
+"""
+from app.services.metrics_history import MetricsHistory, RingSeries
+
+
+def sample(timestamp, cpu, mem=100.0):
+    return {"timestamp": timestamp, "cpu_percent": cpu, "memory_used_mb": mem, "memory_limit_mb": 2048.0}
+
+
+def test_samples_in_one_bucket_are_averaged():
+    """Próbki z tego samego przedziału 10 s dają jeden punkt ze średnią"""
+    history = MetricsHistory()
+    for offset, cpu in enumerate([10.0, 20.0, 30.0]):
+        history.record("dev", "dev-control-plane", sample(1000 + offset, cpu))
+
+    fine = history.query("dev", seconds=60, resolution="1s", until=1010)["nodes"]["dev-control-plane"]
+    coarse = history.query("dev", seconds=60, resolution="10s", until=1010)["nodes"]["dev-control-plane"]
+
+    assert fine["cpu_percent"] == [10.0, 20.0, 30.0]
+    assert coarse["timestamps"] == [1000.0]
+    assert coarse["cpu_percent"] == [20.0]
+    assert coarse["memory_limit_mb"] == [2048.0]
+
+
+def test_ring_buffer_keeps_only_newest_buckets():
+    """Po zapełnieniu bufora najstarsze przedziały są nadpisywane"""
+    ring = RingSeries(step=1, capacity=3)
+    for t in range(5):
+        ring.add(float(t), {"cpu_percent": float(t), "memory_used_mb": 0.0, "memory_limit_mb": 0.0})
+
+    result = ring.range(0, 10)
+    assert result["timestamps"] == [2.0, 3.0, 4.0]
+    assert result["cpu_percent"] == [2.0, 3.0, 4.0]
+
+
+def test_resolution_is_picked_from_range():
+    """Dłuższy zakres wybiera rzadszą rozdzielczość"""
+    history = MetricsHistory()
+    assert history.pick_resolution(300) == "1s"
+    assert history.pick_resolution(3600) == "10s"
+    assert history.pick_resolution(6 * 3600) == "1m"
+
+
+def test_drop_cluster_removes_history():
+    history = MetricsHistory()
+    history.record("dev", "dev-worker", sample(1000, 5.0))
+    history.drop_cluster("dev")
+
+    assert history.query("dev", until=1001)["nodes"] == {}
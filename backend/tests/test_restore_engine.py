@@ -0,0 +1,76 @@
+"""
+Testy kolejności i równoległości przywracania zasobów z backupu
+"""
+import threading
+import time
+
+from app.services.restore_engine import RestoreEngine, load_objects, order_objects
+
+
+def obj(kind, name, namespace=None, owned=False):
+    metadata = {"name": name}
+    if namespace:
+        metadata["namespace"] = namespace
+    if owned:
+        metadata["ownerReferences"] = [{"kind": "CronJob", "name": "nightly", "controller": True}]
+    return {"apiVersion": "v1", "kind": kind, "metadata": metadata}
+
+
+def test_objects_are_loaded_and_split_into_tiers(tmp_path):
+    """Przestrzenie nazw/CRD -> RBAC -> konfiguracja -> reszta; obiekty kontrolerów są pomijane"""
+    (tmp_path / "app_deployments.yaml").write_text(
+        "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: web\n  namespace: app\n"
+    )
+    (tmp_path / "cluster_namespaces.yaml").write_text(
+        "apiVersion: v1\nkind: Namespace\nmetadata:\n  name: app\n---\n"
+        "apiVersion: v1\nkind: Namespace\nmetadata:\n  name: other\n"
+    )
+    (tmp_path / "cluster_info.yaml").write_text("cluster_name: test\n")
+    objects = load_objects(tmp_path) + [
+        ("app_secrets.yaml", obj("Secret", "token", "app")),
+        ("app_rolebindings.yaml", obj("RoleBinding", "read", "app")),
+        ("app_jobs.yaml", obj("Job", "nightly-123", "app", owned=True)),
+    ]
+
+    tiers = order_objects(objects)
+
+    assert [[o["metadata"]["name"] for _, o in tier] for tier in tiers] == [
+        ["app", "other"], ["read"], ["token"], ["web"]
+    ]
+
+
+def test_tiers_are_applied_in_order_and_concurrently_within(monkeypatch):
+    """Kolejny poziom startuje po zakończeniu poprzedniego, obiekty poziomu idą równolegle"""
+    events = []
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def fake_apply(self, o):
+        with lock:
+            events.append(("start", o["kind"]))
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+            events.append(("end", o["kind"]))
+        return "conflict" if o["metadata"]["name"] == "broken" else None
+
+    monkeypatch.setattr(RestoreEngine, "_apply", fake_apply)
+    monkeypatch.setattr(RestoreEngine, "_refresh_resources", lambda self: None)
+
+    objects = [("ns.yaml", obj("Namespace", f"ns{i}")) for i in range(8)] + \
+        [("cm.yaml", obj("ConfigMap", f"cm{i}", "ns0")) for i in range(8)] + \
+        [("cm.yaml", obj("ConfigMap", "broken", "ns0"))]
+
+    result = RestoreEngine("kind-test", workers=8).restore(objects)
+
+    # Objects of a tier overlap, but never more than the worker count
+    assert 1 < active["peak"] <= 8
+    last_namespace_end = max(i for i, event in enumerate(events) if event == ("end", "Namespace"))
+    first_config_start = events.index(("start", "ConfigMap"))
+    assert last_namespace_end < first_config_start
+    assert result["objects_applied"] == 16
+    assert result["objects_failed"] == 1
+    assert result["restored_files"] == ["ns.yaml"]
+    assert [tier["tier"] for tier in result["tiers"]] == ["namespaces", "config"]
@@ -0,0 +1,96 @@
+"""
+Testy wyboru węzłów do usunięcia przy zmniejszaniu klastra
+"""
+import asyncio
+
+from app.services import scale_planner
+from app.services.scale_planner import (
+    evicted_owners, pod_move_cost, rank_nodes_for_removal, rescheduled_owners, uncordon_remaining
+)
+
+
+def node(name, created, ready=True, control_plane=False):
+    labels = {"node-role.kubernetes.io/control-plane": ""} if control_plane else {}
+    return {
+        "metadata": {"name": name, "labels": labels, "creationTimestamp": created},
+        "status": {"conditions": [{"type": "Ready", "status": "True" if ready else "False"}]}
+    }
+
+
+def pod(node_name, owner="ReplicaSet", volumes=(), phase="Running", owner_uid="rs-1"):
+    owners = [{"kind": owner, "controller": True, "uid": owner_uid}] if owner else []
+    return {
+        "metadata": {"name": f"pod-{node_name}", "namespace": "default", "ownerReferences": owners},
+        "spec": {"nodeName": node_name, "volumes": list(volumes)},
+        "status": {"phase": phase}
+    }
+
+
+def test_pod_move_cost_depends_on_owner_and_volumes():
+    """DaemonSety i zakończone pody są darmowe, gołe pody i dane lokalne drogie"""
+    assert pod_move_cost(pod("w", owner="DaemonSet")) == 0
+    assert pod_move_cost(pod("w", phase="Succeeded")) == 0
+    assert pod_move_cost(pod("w")) == 1
+    assert pod_move_cost(pod("w", owner=None)) == 10
+    assert pod_move_cost(pod("w", owner="StatefulSet", volumes=[{"persistentVolumeClaim": {}}])) == 8
+
+
+def test_cheapest_workers_are_removed_first():
+    """Najpierw niegotowe węzły, potem najniższy koszt, przy remisie najnowszy"""
+    nodes = [
+        node("cp", "2024-01-01T00:00:00Z", control_plane=True),
+        node("w1", "2024-01-01T00:00:00Z"),
+        node("w2", "2024-01-02T00:00:00Z"),
+        node("w3", "2024-01-03T00:00:00Z"),
+        node("w4", "2024-01-01T00:00:00Z", ready=False),
+    ]
+    pods = [
+        pod("w1"), pod("w1", owner="DaemonSet"),
+        pod("w2", owner="StatefulSet"),
+        pod("w3"),
+        pod("w4", owner=None),
+    ]
+
+    ranked = rank_nodes_for_removal(nodes, pods)
+
+    assert [c["node"] for c in ranked] == ["w4", "w3", "w1", "w2"]
+    assert ranked[1]["pods_to_move"] == 1
+
+
+def test_rescheduling_waits_only_for_evicted_pods():
+    """Liczą się tylko kontrolery podów z opróżnionych węzłów, nie obce Pending pody"""
+    before = [
+        pod("w1", owner_uid="web"), pod("w2", owner_uid="web"),
+        pod("w1", owner="DaemonSet", owner_uid="ds"),
+        pod("w2", owner_uid="db"),
+        pod(None, owner_uid="other", phase="Pending")
+    ]
+    owners = evicted_owners(before, ["w1"])
+    assert owners == {"web": 2}
+
+    # Zastępczy pod jeszcze czeka na węzeł
+    after = [pod("w2", owner_uid="web"), pod(None, owner_uid="web", phase="Pending"), before[-1]]
+    assert rescheduled_owners(after, owners, ["w1"]) == ["web"]
+
+    # Pending pod innego kontrolera nie blokuje
+    after[1] = pod("w3", owner_uid="web")
+    assert rescheduled_owners(after, owners, ["w1"]) == []
+
+
+def test_nodes_left_after_failed_scale_down_are_uncordoned(monkeypatch):
+    """Po nieudanym usunięciu odcięte węzły, które wciąż istnieją, wracają do harmonogramu"""
+    existing = {"worker2"}
+    calls = []
+
+    async def fake_run(args, timeout=None, **kwargs):
+        calls.append(args)
+        if args[2] in existing:
+            return {"returncode": 0, "stdout": f"node/{args[2]} uncordoned", "stderr": ""}
+        return {"returncode": 1, "stdout": "", "stderr": f'nodes "{args[2]}" not found'}
+
+    monkeypatch.setattr(scale_planner.command_runner, "run", fake_run)
+
+    restored = asyncio.run(uncordon_remaining("kind-test", ["worker1", "worker2"]))
+
+    assert restored == ["worker2"]
+    assert [args[:3] for args in calls] == [["kubectl", "uncordon", "worker1"], ["kubectl", "uncordon", "worker2"]]
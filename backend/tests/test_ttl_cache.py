@@ -0,0 +1,93 @@
+"""
+Testy cache TTL używanego przez endpointy klastrów
+"""
+import asyncio
+
+from app.services.ttl_cache import TTLCache
+
+
+def test_lru_eviction():
+    """Najdawniej używany wpis jest usuwany po przekroczeniu max_size"""
+    cache = TTLCache(max_size=2, default_ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_misses_are_coalesced():
+    """Równoczesne chybienia wywołują loader tylko raz"""
+    cache = TTLCache(default_ttl=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"clusters": []}
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_load("list", loader) for _ in range(20)])
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result == {"clusters": []} for result in results)
+    assert cache.stats()["coalesced"] == 19
+
+
+def test_stale_value_served_while_revalidating():
+    """Po wygaśnięciu TTL zwracana jest stara wartość, a odświeżenie idzie w tle"""
+    cache = TTLCache(default_ttl=0, stale_ttl=60)
+    values = iter([1, 2])
+
+    async def loader():
+        return next(values)
+
+    async def run():
+        first = await cache.get_or_load("key", loader)
+        stale = await cache.get_or_load("key", loader)
+        await asyncio.sleep(0)
+        return first, stale, cache._entries["key"].value
+
+    first, stale, refreshed = asyncio.run(run())
+
+    assert (first, stale, refreshed) == (1, 1, 2)
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_invalidate_tag_is_targeted():
+    """Unieważnienie tagu usuwa tylko wpisy danego klastra"""
+    cache = TTLCache(default_ttl=60)
+    cache.set("status:a", "a", tags=("cluster:a",))
+    cache.set("status:b", "b", tags=("cluster:b",))
+
+    cache.invalidate_tag("cluster:a")
+
+    assert cache.get("status:a") is None
+    assert cache.get("status:b") == "b"
+
+
+def test_cancelled_caller_does_not_cancel_coalesced_load():
+    """Anulowanie pierwszego czekającego nie przerywa ładowania pozostałym"""
+    cache = TTLCache(default_ttl=60)
+
+    async def loader():
+        await asyncio.sleep(0.02)
+        return "value"
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(run()) == ("value", True)
+    assert cache.get("k") == "value"
+    assert cache.stats()["loads"] == 1